@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
+import argparse
 import csv
+import json
 import os
+import queue
 import re
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 INVOCATIONS = 30
 ITERATIONS = 100
@@ -41,13 +47,41 @@ ARGS = [
 ]
 
 
-def enable_shielding():
-    command = ["cset", "shield", "-k", "on", "-c", "4-7"]
+RESULT_FIELDS = [
+    "kind",
+    "vm",
+    "benchmark",
+    "invocation",
+    "core",
+    "exit_code",
+    "seconds",
+    "output",
+]
+
+
+def enable_shielding(cores):
+    command = ["cset", "shield", "-k", "on", "-c", ",".join(map(str, cores))]
     subprocess.run(command)
 
 
 def with_shielding():
-    return ["cset", "shield", "-e"]
+    return ["cset", "shield", "-e", "--"]
+
+
+def with_affinity(core):
+    return ["taskset", "-c", str(core)]
+
+
+def parse_cores(spec):
+    """Parse a core list like 4-7,10 as used by taskset and cset."""
+    cores = []
+    for part in spec.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cores.extend(range(int(first), int(last) + 1))
+        else:
+            cores.append(int(part))
+    return cores
 
 
 def mkdir(path):
@@ -78,7 +112,23 @@ def parse_bin(bin_name):
         raise Exception
 
 
-def measure_rss():
+class Job:
+    """One invocation of a VM, which runs in its own process."""
+
+    def __init__(self, kind, binary, bm, inv, command, stdout_path=None, env=None):
+        self.kind = kind
+        self.binary = binary
+        self.bm = bm
+        self.inv = inv
+        self.command = command
+        self.stdout_path = stdout_path
+        self.env = env
+
+    def key(self):
+        return (self.kind, parse_bin(self.binary), self.bm, str(self.inv))
+
+
+def rss_jobs():
     def gnu_time(bm, inv, bin_name, output_dir):
         gnu_time = [
             "/usr/bin/time",
@@ -92,6 +142,7 @@ def measure_rss():
     output_dir = "logs-rss"
     mkdir(output_dir)
 
+    jobs = []
     for binary in BINS:
         for bm in BENCHS:
             for inv in range(INVOCATIONS):
@@ -103,13 +154,15 @@ def measure_rss():
                     + ARGS
                     + [bm, "100", str(extra_args)]
                 )
-                subprocess.run(command)
+                jobs.append(Job("rss", binary, bm, inv, command))
+    return jobs
 
 
-def measure_gc_time():
+def gc_time_jobs():
     output_dir = "logs-gc"
     mkdir(output_dir)
 
+    jobs = []
     for binary in BINS:
         for bm in BENCHS:
             for inv in range(INVOCATIONS):
@@ -127,14 +180,15 @@ def measure_gc_time():
                     + ARGS
                     + [bm, "100", str(extra_args)]
                 )
-                with open(output_path, "w") as outfile:
-                    subprocess.run(command, stdout=outfile)
+                jobs.append(Job("gc", binary, bm, inv, command, output_path))
+    return jobs
 
 
-def measure_jit_time():
+def jit_time_jobs():
     output_dir = "logs-pypy"
     mkdir(output_dir)
 
+    jobs = []
     for binary in ["./som-bc-jit-tier1", "./som-bc-jit-tier2"]:
         for bm in BENCHS:
             for inv in range(INVOCATIONS):
@@ -153,10 +207,11 @@ def measure_jit_time():
                 )
                 env = os.environ.copy()
                 env["PYPYLOG"] = "jit-summary:%s" % output_path
-                subprocess.run(command, env=env)
+                jobs.append(Job("jit", binary, bm, inv, command, env=env))
+    return jobs
 
 
-def measure_jit_time_exp():
+def jit_time_exp_jobs():
     output_dir = "logs-exp-pypy"
     mkdir(output_dir)
 
@@ -165,6 +220,7 @@ def measure_jit_time_exp():
         "Smalltalk:Examples/Benchmarks/Json:Examples/Benchmarks/GraphSearch:Examples/Benchmarks/NBody:Examples/Benchmarks/DeltaBlue:Examples/Benchmarks/CD",
     ]
 
+    jobs = []
     for binary in ["./som-bc-jit-hybrid"]:
         for bm in ["Experiment2", "Experiment3", "Experiment4"]:
             for inv in range(10):
@@ -181,7 +237,82 @@ def measure_jit_time_exp():
                 )
                 env = os.environ.copy()
                 env["PYPYLOG"] = "jit:%s" % output_path
-                subprocess.run(command, env=env)
+                jobs.append(Job("jit-exp", binary, bm, inv, command, env=env))
+    return jobs
+
+
+def finished_jobs(results_path):
+    """The keys of the jobs that completed successfully in an earlier run."""
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["exit_code"] == "0":
+                done.add((row["kind"], row["vm"], row["benchmark"], row["invocation"]))
+    return done
+
+
+def run_job(job, core, shield):
+    command = with_affinity(core) + job.command
+    if shield:
+        command = with_shielding() + command
+
+    start = time.time()
+    if job.stdout_path:
+        with open(job.stdout_path, "w") as outfile:
+            process = subprocess.run(command, stdout=outfile, env=job.env)
+    else:
+        process = subprocess.run(command, env=job.env)
+    return process.returncode, time.time() - start
+
+
+def run_jobs(jobs, cores, results_name, resume=False, shield=True):
+    """Run the jobs in parallel, each VM process pinned to one of the cores.
+
+    Results are appended to <results_name>.csv and <results_name>.jsonl as
+    soon as a job finishes. With resume, jobs that already succeeded
+    according to the CSV file are skipped."""
+    csv_path = results_name + ".csv"
+    json_path = results_name + ".jsonl"
+
+    done = finished_jobs(csv_path) if resume else set()
+    pending = [job for job in jobs if job.key() not in done]
+    print("%d jobs to run, %d done before" % (len(pending), len(jobs) - len(pending)))
+
+    free_cores = queue.Queue()
+    for core in cores:
+        free_cores.put(core)
+    lock = threading.Lock()
+
+    write_header = not resume or not os.path.exists(csv_path)
+    mode = "a" if resume else "w"
+    with open(csv_path, mode, newline="") as csv_file, open(json_path, mode) as json_file:
+        writer = csv.writer(csv_file)
+        if write_header:
+            writer.writerow(RESULT_FIELDS)
+            csv_file.flush()
+
+        def run(job):
+            core = free_cores.get()
+            try:
+                exit_code, seconds = run_job(job, core, shield)
+            finally:
+                free_cores.put(core)
+
+            kind, vm, bm, inv = job.key()
+            row = [kind, vm, bm, inv, core, exit_code, "%.3f" % seconds, job.stdout_path or ""]
+            record = dict(zip(RESULT_FIELDS, row))
+            record["seconds"] = round(seconds, 3)
+            with lock:
+                writer.writerow(row)
+                csv_file.flush()
+                json_file.write(json.dumps(record) + "\n")
+                json_file.flush()
+
+        with ThreadPoolExecutor(max_workers=len(cores)) as pool:
+            for future in as_completed([pool.submit(run, job) for job in pending]):
+                future.result()
 
 
 def measure_bytecode_size():
@@ -229,9 +360,31 @@ def measure_bytecode_size():
 
 
 def main():
-    enable_shielding()
-    measure_rss()
-    measure_gc_time()
+    parser = argparse.ArgumentParser(description="Run the benchmark matrix.")
+    parser.add_argument(
+        "--cores",
+        default="4-7",
+        help="cores to run the VMs on, one invocation per core at a time",
+    )
+    parser.add_argument(
+        "--results", default="runme-results", help="base name of the result files"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the invocations that succeeded according to the results",
+    )
+    parser.add_argument(
+        "--no-shield", action="store_true", help="do not shield the cores with cset"
+    )
+    options = parser.parse_args()
+
+    cores = parse_cores(options.cores)
+    shield = not options.no_shield
+    if shield:
+        enable_shielding(cores)
+
+    run_jobs(rss_jobs() + gc_time_jobs(), cores, options.results, options.resume, shield)
     measure_bytecode_size()
 
 
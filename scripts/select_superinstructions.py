@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Ranks the bytecode pairs of --bytecode-ngrams profiles as candidates
+for superinstructions.
+
+Usage, with one profile per benchmark:
+
+    ./som.sh --bytecode-ngrams Bounce.ngrams \\
+        Examples/Benchmarks/BenchmarkHarness.som Bounce 10 0
+    ./scripts/select_superinstructions.py *.ngrams
+
+Each profile is normalized to the number of pairs executed in it, so that
+long-running benchmarks do not dominate the ranking. A pair is only a
+candidate if the second bytecode always follows the first one, and if the
+first one is not rewritten on first execution. Pairs that are already
+superinstructions are marked with a *.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+# pylint: disable=wrong-import-position
+from som.interpreter.bc.bytecodes import (
+    Bytecodes,
+    SUPERINSTRUCTIONS,
+    bytecode_as_str,
+)
+
+# bytecodes that leave the sequence, or are rewritten on first execution
+NOT_FUSIBLE = {
+    bytecode_as_str(bc)
+    for bc in [
+        Bytecodes.halt,
+        Bytecodes.push_block,
+        Bytecodes.push_block_no_ctx,
+        Bytecodes.super_send,
+        Bytecodes.return_local,
+        Bytecodes.return_non_local,
+        Bytecodes.return_self,
+        Bytecodes.push_local,
+        Bytecodes.push_argument,
+        Bytecodes.pop_local,
+        Bytecodes.pop_argument,
+        Bytecodes.nil_local,
+    ]
+}
+
+FUSED = {
+    (bytecode_as_str(first), bytecode_as_str(second))
+    for _, first, second in SUPERINSTRUCTIONS
+}
+
+
+def read_pairs(file_name):
+    pairs = {}
+    with open(file_name, "r") as profile:
+        for line in profile:
+            count, _, names = line.rstrip("\n").partition("\t")
+            names = names.split(" ")
+            if len(names) == 2:
+                pairs[tuple(names)] = int(count)
+    return pairs
+
+
+def is_candidate(first, _second):
+    return first not in NOT_FUSIBLE and not first.startswith("JUMP")
+
+
+def rank(profiles):
+    shares = {}
+    for pairs in profiles:
+        total = sum(pairs.values())
+        if total == 0:
+            continue
+        for pair, count in pairs.items():
+            shares[pair] = shares.get(pair, 0.0) + count / total
+    return sorted(shares.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("profiles", nargs="+", help="--bytecode-ngrams files")
+    parser.add_argument(
+        "-n", "--top", type=int, default=20, help="number of candidates to show"
+    )
+    args = parser.parse_args()
+
+    profiles = [read_pairs(file_name) for file_name in args.profiles]
+    shown = 0
+    for (first, second), share in rank(profiles):
+        if not is_candidate(first, second):
+            continue
+        marker = "*" if (first, second) in FUSED else " "
+        average = 100.0 * share / len(profiles)
+        print("%s %6.2f%%  %s %s" % (marker, average, first, second))
+        shown += 1
+        if shown == args.top:
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -9,40 +9,30 @@ from rpython.rlib.rsre import rsre_re as re
 from rpython.memory.gc.base import GCBase
 from rpython.memory.gc.hook import GcHooks
 
+from rlib import rgc
+from rlib.streamio import open_file_as_stream
+
 from som.compiler.parse_error import ParseError
 from som.interp_type import is_ast_interpreter, is_bytecode_interpreter
 from som.tier_type import is_hybrid, is_tier1, is_tier2
+from som.interpreter.bc.jit_event_log import EVENT_BRIDGE, EVENT_LOOP, jit_event_log
+from som.interpreter.bc.sample_profile import TIER_1, TIER_2
 from som.interpreter.bc.tier_shifting import tier_manager
+from som.interpreter.bc.traverse_stack import memoization as tstack_memoization
+from som.vm.gc_stats import GcHooksStats, gc_stats
+from som.vm.startup_profile import startup_profile
 from som.vm.universe import main, Exit
 
 try:
     import rpython.rlib  # pylint: disable=unused-import
     from rpython.rlib import jit
+    from rpython.rlib.objectmodel import compute_unique_id
 except ImportError:
     "NOT_RPYTHON"
     print("Failed to load RPython library. Please make sure it is on PYTHONPATH")
     sys.exit(1)
 
 
-class GcHooksStats(object):
-    minors = 0
-    steps = 0
-    collects = 0
-    duration_major = 0.0
-    duration_minor = 0.0
-
-    def reset(self):
-        # the NonConstant are needed so that the annotator annotates the
-        # fields as a generic SomeInteger(), instead of a constant 0. A call
-        # to this method MUST be seen during normal annotation, else the class
-        # is annotated only during GC transform, when it's too late
-        self.minors = NonConstant(0)
-        self.steps = NonConstant(0)
-        self.collects = NonConstant(0)
-        self.duration_major = NonConstant(0.0)
-        self.duration_minor = NonConstant(0.0)
-
-
 class MyHooks(GcHooks):
 
     def __init__(self, stats=None):
@@ -58,27 +48,92 @@ class MyHooks(GcHooks):
         return True
 
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
-        self.stats.minors += 1
-        self.stats.duration_minor += duration
+        self.stats.record_minor(duration, total_memory_used)
 
     def on_gc_collect_step(self, duration, oldstate, newstate):
-        self.stats.steps += 1
-        self.stats.duration_major += duration
+        self.stats.record_collect_step(duration)
 
     def on_gc_collect(self, num_major_collects,
                       arenas_count_before, arenas_count_after,
                       arenas_bytes, rawmalloc_bytes_before,
                       rawmalloc_bytes_after, pinned_objects):
-        self.stats.collects += 1
+        self.stats.record_collect(arenas_bytes + rawmalloc_bytes_after)
+
+
+GC_HOOKS_STATS = gc_stats
 
 
-GC_HOOKS_STATS = GcHooksStats()
+def reset_gc_stats():
+    # the NonConstant are needed so that the annotator annotates the
+    # fields as a generic SomeInteger(), instead of a constant 0. A call
+    # to this function MUST be seen during normal annotation, else the class
+    # is annotated only during GC transform, when it's too late
+    GC_HOOKS_STATS.reset(NonConstant(0), NonConstant(0.0))
+    GC_HOOKS_STATS.nursery_size = rgc.get_stats(rgc.NURSERY_SIZE)
 
 
 def get_gchooks():
     return MyHooks(GC_HOOKS_STATS)
 
 
+class SomJitHooks(jit.JitHookInterface):
+    """Feeds bridges and aborted traces of tier 2 to the tier manager,
+    which demotes methods whose traces keep failing back to tier 1.
+    Also writes compilations and aborts to the JIT event log."""
+
+    def on_abort(self, reason, jitdriver, greenkey, greenkey_repr, logops, operations):
+        tier = _tier_of(jitdriver)
+        if is_hybrid() and tier == TIER_2:
+            tier_manager.record_trace_failure(greenkey_repr)
+        if jit_event_log.enabled:
+            jit_event_log.log_abort(
+                tier, greenkey_repr, jit.Counters.counter_names[reason]
+            )
+
+    def before_compile(self, debug_info):
+        if jit_event_log.enabled:
+            jit_event_log.start_compile()
+
+    def before_compile_bridge(self, debug_info):
+        if jit_event_log.enabled:
+            jit_event_log.start_compile()
+
+    def after_compile(self, debug_info):
+        tier = _tier_of(debug_info.get_jitdriver())
+        loop_id = compute_unique_id(debug_info.looptoken)
+        if is_hybrid() and tier == TIER_2:
+            tier_manager.record_tier2_trace(loop_id, debug_info.get_greenkey_repr())
+        if jit_event_log.enabled:
+            _log_compile(EVENT_LOOP, tier, loop_id, debug_info)
+
+    def after_compile_bridge(self, debug_info):
+        tier = _tier_of(debug_info.get_jitdriver())
+        loop_id = compute_unique_id(debug_info.looptoken)
+        if is_hybrid() and tier == TIER_2:
+            tier_manager.record_tier2_bridge(loop_id)
+        if jit_event_log.enabled:
+            _log_compile(EVENT_BRIDGE, tier, loop_id, debug_info)
+
+
+def _tier_of(jitdriver):
+    from som.interpreter.bc.interpreter_tier2 import jitdriver as tier2_driver
+
+    if jitdriver is tier2_driver:
+        return TIER_2
+    return TIER_1
+
+
+def _log_compile(event, tier, loop_id, debug_info):
+    jit_event_log.log_compile(
+        event,
+        tier,
+        debug_info.get_greenkey_repr(),
+        loop_id,
+        len(debug_info.operations),
+        debug_info.asminfo.asmlen,
+    )
+
+
 # __________  Entry points  __________
 
 
@@ -86,19 +141,49 @@ def report_gc_stats():
     minors = GC_HOOKS_STATS.minors
     steps = GC_HOOKS_STATS.steps
     collects = GC_HOOKS_STATS.collects
-    duration_minor = GC_HOOKS_STATS.duration_minor
-    duration_major = GC_HOOKS_STATS.duration_major
+    duration_minor = GC_HOOKS_STATS.minor_time_us()
+    duration_major = GC_HOOKS_STATS.major_time_us()
     print('GC hooks statistics')
     print('    gc-minor:          %d' % minors)
     print('    gc-collect-step:   %d' % steps)
     print('    gc-collect:        %d' % collects)
-    print('    gc-duration-minor: %f us' % (duration_minor * 100000))
-    print('    gc-duration-major: %f us' % (duration_major * 100000))
+    print('    gc-duration-minor: %d us' % duration_minor)
+    print('    gc-duration-major: %d us' % duration_major)
+
+
+def write_gc_stats_json(file_name):
+    try:
+        stream = open_file_as_stream(file_name, "w")
+        try:
+            stream.write(GC_HOOKS_STATS.format_json())
+        finally:
+            stream.close()
+    except (IOError, OSError):
+        os.write(2, "Could not write " + file_name + "\n")
+
+
+def report_tstack_stats():
+    print('Trace stack memoization statistics')
+    print('    size:      %d' % tstack_memoization.size())
+    print('    max-size:  %d' % tstack_memoization.get_max_size())
+    print('    hits:      %d' % tstack_memoization.hits)
+    print('    misses:    %d' % tstack_memoization.misses)
+    print('    evictions: %d' % tstack_memoization.evictions)
+
+
+def report_startup_profile(as_json):
+    if as_json:
+        os.write(1, startup_profile.format_json())
+    else:
+        os.write(1, startup_profile.format_table())
 
 
 def entry_point(argv):
     from som.interpreter.bc.tier_shifting import tier_manager
     is_gc_stats = False
+    gc_stats_json_file = None
+    is_tstack_stats = False
+    is_startup_profile_json = False
 
     i = 0
     while True:
@@ -122,13 +207,95 @@ def entry_point(argv):
             tier_manager.set_threshold(int(jitvalue))
             del argv[i : i + 2]
             continue
+        elif (
+            argv[i] == '--hybrid_send_threshold'
+            or argv[i] == '--hybrid_back_edge_threshold'
+            or argv[i] == '--hybrid_return_threshold'
+        ):
+            if len(argv) == i + 1:
+                print("missing argument after " + argv[i])
+                return 2
+            try:
+                threshold = int(argv[i + 1])
+            except ValueError:
+                print("expected a number after " + argv[i])
+                return 2
+            if argv[i] == '--hybrid_send_threshold':
+                tier_manager.set_send_threshold(threshold)
+            elif argv[i] == '--hybrid_back_edge_threshold':
+                tier_manager.set_back_edge_threshold(threshold)
+            else:
+                tier_manager.set_return_threshold(threshold)
+            del argv[i : i + 2]
+            continue
+        elif argv[i] == '--hybrid_method_threshold':
+            # e.g., --hybrid_method_threshold Queens>>queens=5
+            if len(argv) == i + 1:
+                print("missing argument after --hybrid_method_threshold")
+                return 2
+            jitarg = argv[i + 1]
+            sep = jitarg.rfind('=')
+            if sep < 0:
+                print("expected Class>>selector=N after --hybrid_method_threshold")
+                return 2
+            try:
+                threshold = int(jitarg[sep + 1 :])
+            except ValueError:
+                print("expected Class>>selector=N after --hybrid_method_threshold")
+                return 2
+            tier_manager.set_method_threshold(jitarg[:sep], threshold)
+            del argv[i : i + 2]
+            continue
         elif argv[i] == '--gc-stats':
             is_gc_stats = True
             del argv[i]
+        elif argv[i] == '--gc-stats-json':
+            if len(argv) == i + 1:
+                print("missing file after --gc-stats-json")
+                return 2
+            gc_stats_json_file = argv[i + 1]
+            del argv[i : i + 2]
+            continue
+        elif argv[i] == '--jit-event-log':
+            if len(argv) == i + 1:
+                print("missing file after --jit-event-log")
+                return 2
+            try:
+                jit_event_log.open(argv[i + 1])
+            except (IOError, OSError):
+                print("could not open " + argv[i + 1])
+                return 2
+            del argv[i : i + 2]
+            continue
+        elif argv[i] == '--tstack-memo-size':
+            if len(argv) == i + 1:
+                print("missing argument after --tstack-memo-size")
+                return 2
+            try:
+                memo_size = int(argv[i + 1])
+            except ValueError:
+                print("expected a number after --tstack-memo-size")
+                return 2
+            tstack_memoization.set_max_size(memo_size)
+            del argv[i : i + 2]
+            continue
+        elif argv[i] == '--tstack-stats':
+            is_tstack_stats = True
+            del argv[i]
+            continue
+        elif argv[i] == '--startup-profile':
+            startup_profile.enable()
+            del argv[i]
+            continue
+        elif argv[i] == '--startup-profile-json':
+            startup_profile.enable()
+            is_startup_profile_json = True
+            del argv[i]
+            continue
         i += 1
 
     try:
-        GC_HOOKS_STATS.reset()
+        reset_gc_stats()
         main(argv)
     except Exit as ex:
         return ex.code
@@ -141,6 +308,13 @@ def entry_point(argv):
     finally:
         if is_gc_stats:
             report_gc_stats()
+        if gc_stats_json_file is not None:
+            write_gc_stats_json(gc_stats_json_file)
+        if is_tstack_stats:
+            report_tstack_stats()
+        jit_event_log.close()
+        if startup_profile.enabled:
+            report_startup_profile(is_startup_profile_json)
 
     return 1
 
@@ -173,7 +347,7 @@ def target(driver, _args):
 def jitpolicy(_driver):
     from rpython.jit.codewriter.policy import JitPolicy  # pylint: disable=import-error
 
-    return JitPolicy()
+    return JitPolicy(SomJitHooks())
 
 
 if __name__ == "__main__":
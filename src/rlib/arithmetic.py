@@ -7,6 +7,10 @@ try:
 
     bigint_from_int = rbigint.fromint
     bigint_from_str = rbigint.fromstr
+
+    def bigint_to_str(value):
+        return value.str()
+
     IntType = int
 except ImportError:
     "NOT_RPYTHON"
@@ -20,6 +24,9 @@ except ImportError:
     def bigint_from_str(value):
         return int(value)
 
+    def bigint_to_str(value):
+        return str(value)
+
     def divrem(x, y):
         raise Exception("not yet implemented")
 
@@ -39,3 +46,15 @@ except ImportError:
     else:
         IntType = int
         BigIntType = int
+
+try:
+    from rpython.rlib.rarithmetic import r_int32, intmask  # pylint: disable=W
+except ImportError:
+    "NOT_RPYTHON"
+
+    def r_int32(value):
+        assert -0x80000000 <= value <= 0x7FFFFFFF
+        return value
+
+    def intmask(value):
+        return value
@@ -0,0 +1,25 @@
+try:
+    from rpython.rlib.listsort import make_timsort_class  # pylint: disable=W
+except ImportError:
+    "NOT_RPYTHON"
+    import functools
+
+    def make_timsort_class():
+        class TimSort(object):
+            def __init__(self, lst, listlength=None):
+                self.list = lst
+
+            def lt(self, a, b):
+                return a < b
+
+            def sort(self):
+                def compare(a, b):
+                    if self.lt(a, b):
+                        return -1
+                    if self.lt(b, a):
+                        return 1
+                    return 0
+
+                self.list.sort(key=functools.cmp_to_key(compare))
+
+        return TimSort
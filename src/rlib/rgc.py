@@ -13,3 +13,15 @@ except ImportError:
 
     def isenabled():
         return 1
+
+
+try:
+    from rpython.rlib.rgc import get_stats  # pylint: disable=unused-import
+    from rpython.rlib.rgc import NURSERY_SIZE  # pylint: disable=unused-import
+except ImportError:
+    "NOT_RPYTHON"
+
+    NURSERY_SIZE = 0
+
+    def get_stats(_stat_no):
+        return 0
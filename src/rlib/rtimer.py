@@ -0,0 +1,15 @@
+try:
+    from rpython.rlib.rtimer import read_timestamp  # pylint: disable=unused-import
+    from rpython.rlib.rtimer import get_timestamp_unit  # pylint: disable=W
+    from rpython.rlib.rtimer import UNIT_NS  # pylint: disable=unused-import
+except ImportError:
+    "NOT_RPYTHON"
+    import time
+
+    UNIT_NS = 1
+
+    def read_timestamp():
+        return int(time.time() * 1000000000.0)
+
+    def get_timestamp_unit():
+        return UNIT_NS
@@ -0,0 +1,18 @@
+try:
+    from rpython.rlib.rweakref import RWeakValueDictionary  # pylint: disable=W
+except ImportError:
+    "NOT_RPYTHON"
+    import weakref
+
+    class RWeakValueDictionary(object):
+        def __init__(self, _keyclass, _valueclass):
+            self._dict = weakref.WeakValueDictionary()
+
+        def get(self, key):
+            return self._dict.get(key, None)
+
+        def set(self, key, value):
+            if value is None:
+                self._dict.pop(key, None)
+            else:
+                self._dict[key] = value
@@ -25,4 +25,7 @@ def readall_from_stream(stream):
         result.append(data)
         if bufsize < 4194304:  # 4 Megs
             bufsize <<= 1
-    return "".join(result)
+    if not result:
+        return ""
+    # on Python 3, a stream opened in binary mode answers bytes
+    return result[0][:0].join(result)
@@ -4,6 +4,8 @@ try:
     def encode_to_bytes(str_value):
         return str_value
 
+    def decode_from_bytes(bytes_value):
+        return bytes_value
 
 except ImportError:
     "NOT_RPYTHON"
@@ -21,11 +23,17 @@ except ImportError:
         def encode_to_bytes(str_value):
             return str_value.encode("utf-8")
 
+        def decode_from_bytes(bytes_value):
+            return bytes_value.decode("utf-8")
+
     else:
 
         def encode_to_bytes(str_value):
             return str_value
 
+        def decode_from_bytes(bytes_value):
+            return bytes_value
+
 
 class StringStream(Stream):
     def __init__(self, string):
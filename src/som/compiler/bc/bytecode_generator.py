@@ -201,6 +201,22 @@ def emit_jump_if_greater_with_dummy_offset(mgenc):
     return idx
 
 
+def emit_jump_if_less_with_dummy_offset(mgenc):
+    emit1(mgenc, BC.jump_if_less)
+    idx = mgenc.add_bytecode_argument_and_get_index(0)
+    mgenc.add_bytecode_argument(0)
+    return idx
+
+
+def emit_jump_on_nil_with_dummy_offset(mgenc, is_if_nil):
+    # as for the booleans, the jump skips the inlined block,
+    # so an #ifNil: needs a jump_on_not_nil
+    emit1(mgenc, BC.jump_on_not_nil if is_if_nil else BC.jump_on_nil)
+    idx = mgenc.add_bytecode_argument_and_get_index(0)
+    mgenc.add_bytecode_argument(0)
+    return idx
+
+
 def emit_jump_backward_with_offset(mgenc, offset):
     emit3(
         mgenc,
@@ -0,0 +1,689 @@
+"""
+On-disk cache of compiled classes for the bytecode interpreter.
+
+A cache file holds the content of the ClassGenerationContext after parsing,
+i.e., the fields and the assembled methods of a class, including their
+bytecodes, literals, lexical scopes, and inlined-loop tables.
+It is only used if the source path, its modification time, its length,
+the hash of its content, and the compiler options are still the same as
+when the file was written.
+
+An image bundles the same records for all classes loaded while the universe
+is initialized. It is a snapshot, and not checked against the sources,
+but only loaded with the compiler options it was recorded with.
+"""
+
+# the cache works on the internals of the compiler and the method objects
+# pylint: disable=protected-access
+
+import os
+
+from rlib.arithmetic import bigint_from_str, bigint_to_str
+from rlib.streamio import open_file_as_stream, readall_from_stream
+from rlib.string_stream import decode_from_bytes, encode_to_bytes
+from rtruffle.source_section import SourceCoordinate, SourceSection
+
+from som.compiler.ast.variable import Argument, Local
+from som.compiler.bc.method_generation_context import _Loop
+from som.compiler.class_generation_context import ClassGenerationContext
+from som.compiler.lexical_scope import LexicalScope
+from som.interpreter.bc.bytecodes import Bytecodes
+from som.vm.globals import nilObject, trueObject, falseObject
+from som.vmobjects.biginteger import BigInteger
+from som.vmobjects.double import Double
+from som.vmobjects.integer import Integer
+from som.vmobjects.method_bc import BcMethod, BcMethodNLR
+from som.vmobjects.method_trivial import (
+    LiteralReturn,
+    GlobalRead,
+    FieldRead,
+    FieldWrite,
+)
+from som.vmobjects.primitive import empty_primitive
+from som.vmobjects.string import String
+from som.vmobjects.symbol import Symbol
+
+_MAGIC = "SOMC"
+_IMAGE_MAGIC = "SOMI"
+
+# to be incremented whenever the format or the compiler output changes
+_FORMAT_VERSION = 2
+
+# the options that change the bytecodes the compiler produces
+_OPTION_SUPERINSTRUCTIONS = 1
+_OPTION_CONSTANT_FOLDING = 2
+
+_METHOD_BC = 0
+_METHOD_BC_NLR = 1
+_METHOD_LITERAL_RETURN = 2
+_METHOD_GLOBAL_READ = 3
+_METHOD_FIELD_READ = 4
+_METHOD_FIELD_WRITE = 5
+_METHOD_PRIMITIVE = 6
+
+_LITERAL_NIL = 0
+_LITERAL_TRUE = 1
+_LITERAL_FALSE = 2
+_LITERAL_SYMBOL = 3
+_LITERAL_STRING = 4
+_LITERAL_INTEGER = 5
+_LITERAL_BIG_INTEGER = 6
+_LITERAL_DOUBLE = 7
+_LITERAL_METHOD = 8
+
+_SCOPE_NONE = -1
+_SCOPE_NEW = -2
+
+_VAR_ARGUMENT = 0
+_VAR_LOCAL = 1
+
+
+class InvalidClassCache(Exception):
+    """Raised when a cache file is corrupt or does not match the source."""
+
+
+def content_hash(data):
+    """32-bit FNV-1a hash, stable across runs."""
+    result = 0x811C9DC5
+    for c in data:
+        result = ((result ^ ord(c)) * 0x01000193) & 0xFFFFFFFF
+    return result
+
+
+def compiler_options(universe):
+    options = 0
+    if universe.superinstructions:
+        options |= _OPTION_SUPERINSTRUCTIONS
+    if universe.constant_folding:
+        options |= _OPTION_CONSTANT_FOLDING
+    return options
+
+
+class ClassCacheKey(object):
+    def __init__(self, source_path, mtime, source, options):
+        self.source_path = source_path
+        self.mtime = mtime
+        self.source_length = len(source)
+        self.source_hash = content_hash(source)
+        self.options = options
+
+
+def cache_file_name(cache_dir, source_path, class_name):
+    return (
+        cache_dir + os.sep + class_name + "-" + str(content_hash(source_path)) + ".somc"
+    )
+
+
+def load_cached_class(cache_file, key, universe):
+    """Return a ClassGenerationContext restored from the cache file,
+    or None if there is no valid cache entry."""
+    try:
+        data = _read_file(cache_file)
+    except (IOError, OSError, InvalidClassCache):
+        return None
+
+    try:
+        return _ClassCacheReader(data, universe).read_class(key)
+    except InvalidClassCache:
+        return None
+
+
+def store_cached_class(cache_file, key, cgenc):
+    writer = _ClassCacheWriter()
+    writer.write_class(key, cgenc)
+
+    # the cache is only an optimization, failing to write it is not an error
+    tmp_file = cache_file + ".tmp"
+    try:
+        _make_dir(cache_file)
+        _write_file(tmp_file, writer.get_data())
+        os.rename(tmp_file, cache_file)
+    except (IOError, OSError):
+        pass
+
+
+class ImageRecorder(object):
+    """Records the classes compiled while the universe is initialized,
+    to save them as an image that can be loaded instead of the sources."""
+
+    def __init__(self, universe):
+        self._universe = universe
+        self._records = []
+
+    def add_class(self, cgenc):
+        writer = _ClassCacheWriter()
+        writer.write_class_body(cgenc)
+        self._records.append(writer.get_data())
+
+    def save(self, file_name):
+        writer = _ClassCacheWriter()
+        writer.write_image(compiler_options(self._universe), self._records)
+        _write_file(file_name, writer.get_data())
+
+
+def load_image(file_name, universe):
+    """Return a dict from class names to the classes' records in the image.
+    Raises InvalidClassCache if the image was not written by this VM."""
+    return _ClassCacheReader(_read_file(file_name), universe).read_image()
+
+
+def class_from_image_record(record, universe):
+    return _ClassCacheReader(record, universe).read_class_body()
+
+
+def _read_file(file_name):
+    stream = open_file_as_stream(file_name, "rb")
+    try:
+        data = readall_from_stream(stream)
+    finally:
+        stream.close()
+    try:
+        return decode_from_bytes(data)
+    except ValueError:
+        # a truncated or otherwise corrupt file
+        raise InvalidClassCache()
+
+
+def _write_file(file_name, data):
+    stream = open_file_as_stream(file_name, "wb")
+    try:
+        stream.write(encode_to_bytes(data))
+    finally:
+        stream.close()
+
+
+def _make_dir(cache_file):
+    cache_dir = cache_file[: max(0, cache_file.rfind(os.sep))]
+    if cache_dir:
+        try:
+            os.mkdir(cache_dir)
+        except OSError:
+            pass
+
+
+class _ClassCacheWriter(object):
+    def __init__(self):
+        self._data = []
+        self._scope_ids = {}
+
+    def get_data(self):
+        return "".join(self._data)
+
+    def _write_int(self, value):
+        # zigzag encoding, followed by 7 bits per byte
+        if value >= 0:
+            value = value << 1
+        else:
+            value = ((-value) << 1) - 1
+        while value >= 0x80:
+            self._data.append(chr((value & 0x7F) | 0x80))
+            value = value >> 7
+        self._data.append(chr(value))
+
+    def _write_bool(self, value):
+        self._write_int(1 if value else 0)
+
+    def _write_str(self, value):
+        self._write_int(len(value))
+        self._data.append(value)
+
+    def _write_symbols(self, symbols):
+        self._write_int(len(symbols))
+        for symbol in symbols:
+            self._write_str(symbol.get_embedded_string())
+
+    def _write_format(self, magic, options):
+        self._data.append(magic)
+        self._write_int(_FORMAT_VERSION)
+        self._write_int(Bytecodes.invalid)
+        self._write_int(options)
+
+    def write_class(self, key, cgenc):
+        self._write_format(_MAGIC, key.options)
+
+        self._write_str(key.source_path)
+        self._write_str(repr(key.mtime))
+        self._write_int(key.source_length)
+        self._write_int(key.source_hash)
+
+        self.write_class_body(cgenc)
+
+    def write_image(self, options, records):
+        self._write_format(_IMAGE_MAGIC, options)
+        self._write_int(len(records))
+        for record in records:
+            self._write_str(record)
+
+    def write_class_body(self, cgenc):
+        self._write_str(cgenc.name.get_embedded_string())
+        super_class = cgenc._super_class
+        if super_class is None:
+            self._write_str("nil")
+            self._write_int(0)
+            self._write_int(0)
+        else:
+            self._write_str(super_class.get_name().get_embedded_string())
+            self._write_int(
+                super_class.get_instance_fields().get_number_of_indexable_fields()
+            )
+            self._write_int(
+                super_class.get_class(cgenc.universe)
+                .get_instance_fields()
+                .get_number_of_indexable_fields()
+            )
+
+        self._write_symbols(cgenc._instance_fields)
+        self._write_symbols(cgenc._class_fields)
+        self._write_methods(cgenc._instance_methods.values())
+        self._write_methods(cgenc._class_methods.values())
+
+    def _write_methods(self, methods):
+        self._write_int(len(methods))
+        for method in methods:
+            self._write_method(method)
+
+    def _write_method(self, method):
+        if isinstance(method, BcMethod):
+            self._write_bc_method(method)
+        elif isinstance(method, LiteralReturn):
+            self._write_int(_METHOD_LITERAL_RETURN)
+            self._write_str(method.get_signature().get_embedded_string())
+            self._write_literal(method._value)
+        elif isinstance(method, GlobalRead):
+            self._write_int(_METHOD_GLOBAL_READ)
+            self._write_str(method.get_signature().get_embedded_string())
+            self._write_str(method._global_name.get_embedded_string())
+            self._write_int(method._context_level)
+        elif isinstance(method, FieldRead):
+            self._write_int(_METHOD_FIELD_READ)
+            self._write_str(method.get_signature().get_embedded_string())
+            self._write_int(method._field_idx)
+            self._write_int(method._context_level)
+        elif isinstance(method, FieldWrite):
+            self._write_int(_METHOD_FIELD_WRITE)
+            self._write_str(method.get_signature().get_embedded_string())
+            self._write_int(method._field_idx)
+            self._write_int(method._arg_idx)
+        else:
+            assert method.is_primitive()
+            self._write_int(_METHOD_PRIMITIVE)
+            self._write_str(method.get_signature().get_embedded_string())
+
+    def _write_bc_method(self, method):
+        if isinstance(method, BcMethodNLR):
+            self._write_int(_METHOD_BC_NLR)
+        else:
+            self._write_int(_METHOD_BC)
+
+        self._write_str(method.get_signature().get_embedded_string())
+        self._write_int(method._number_of_locals)
+        # the constructor adds the buffer again
+        self._write_int(method._maximum_number_of_stack_elements - 2)
+
+        self._write_int(len(method._arg_inner_access))
+        for inner_access in method._arg_inner_access:
+            self._write_bool(inner_access)
+        self._write_int(method._size_frame)
+        self._write_int(method._size_inner)
+
+        self._write_scope(method._lexical_scope)
+
+        self._write_int(len(method._inlined_loops))
+        for loop in method._inlined_loops:
+            self._write_int(loop.loop_begin_idx)
+            self._write_int(loop.backward_jump_idx)
+
+        self._write_int(len(method._call_sites))
+        for call_site in method._call_sites:
+            self._write_int(call_site)
+        self._write_int(method.get_number_of_call_sites())
+
+        self._write_int(len(method._literals))
+        for literal in method._literals:
+            self._write_literal(literal)
+
+        self._write_str("".join(method._bytecodes))
+
+    def _write_scope(self, scope):
+        if scope is None:
+            self._write_int(_SCOPE_NONE)
+            return
+
+        scope_id = self._scope_ids.get(scope, -1)
+        if scope_id >= 0:
+            self._write_int(scope_id)
+            return
+
+        # the outer scope is written first, the reader does the same
+        self._write_int(_SCOPE_NEW)
+        self._write_scope(scope.outer)
+        self._scope_ids[scope] = len(self._scope_ids)
+
+        self._write_int(len(scope.arguments))
+        for var in scope.arguments:
+            self._write_variable(var)
+        self._write_int(len(scope.locals))
+        for var in scope.locals:
+            self._write_variable(var)
+
+    def _write_variable(self, var):
+        if isinstance(var, Argument):
+            self._write_int(_VAR_ARGUMENT)
+        else:
+            self._write_int(_VAR_LOCAL)
+        self._write_str(var._name)
+        self._write_int(var.idx)
+        self._write_int(var.access_idx)
+        self._write_bool(var.is_accessed())
+        self._write_bool(var.is_accessed_out_of_context())
+
+        source = var.source
+        if source is None or source.coord is None:
+            self._write_bool(False)
+        else:
+            self._write_bool(True)
+            self._write_int(source.coord.start_line)
+            self._write_int(source.coord.start_column)
+            self._write_int(source.coord.char_idx)
+            self._write_int(source.char_length)
+
+    def _write_literal(self, literal):
+        if literal is nilObject:
+            self._write_int(_LITERAL_NIL)
+        elif literal is trueObject:
+            self._write_int(_LITERAL_TRUE)
+        elif literal is falseObject:
+            self._write_int(_LITERAL_FALSE)
+        elif isinstance(literal, Symbol):
+            self._write_int(_LITERAL_SYMBOL)
+            self._write_str(literal.get_embedded_string())
+        elif isinstance(literal, String):
+            self._write_int(_LITERAL_STRING)
+            self._write_str(literal.get_embedded_string())
+        elif isinstance(literal, Integer):
+            self._write_int(_LITERAL_INTEGER)
+            # as string, to avoid overflows in the zigzag encoding
+            self._write_str(str(literal.get_embedded_integer()))
+        elif isinstance(literal, BigInteger):
+            self._write_int(_LITERAL_BIG_INTEGER)
+            self._write_str(bigint_to_str(literal.get_embedded_biginteger()))
+        elif isinstance(literal, Double):
+            self._write_int(_LITERAL_DOUBLE)
+            self._write_str(repr(literal.get_embedded_double()))
+        else:
+            assert literal.is_invokable()
+            self._write_int(_LITERAL_METHOD)
+            self._write_method(literal)
+
+
+class _ClassCacheReader(object):
+    def __init__(self, data, universe):
+        self._data = data
+        self._pos = 0
+        self._universe = universe
+        self._scopes = []
+        self._source_path = None
+
+    def _read_byte(self):
+        if self._pos >= len(self._data):
+            raise InvalidClassCache()
+        value = ord(self._data[self._pos])
+        self._pos += 1
+        return value
+
+    def _read_int(self):
+        value = 0
+        shift = 0
+        byte = self._read_byte()
+        while byte >= 0x80:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if shift > 63:
+                raise InvalidClassCache()
+            byte = self._read_byte()
+        value |= byte << shift
+
+        if value & 1 == 0:
+            return value >> 1
+        return -((value + 1) >> 1)
+
+    def _read_bool(self):
+        return self._read_int() != 0
+
+    def _read_str(self):
+        length = self._read_int()
+        start = self._pos
+        end = start + length
+        if length < 0 or end > len(self._data):
+            raise InvalidClassCache()
+        self._pos = end
+        return self._data[start:end]
+
+    def _read_symbol(self):
+        return self._universe.symbol_for(self._read_str())
+
+    def _read_symbols(self):
+        num_symbols = self._read_int()
+        return [self._read_symbol() for _ in range(num_symbols)]
+
+    def _check(self, condition):
+        if not condition:
+            raise InvalidClassCache()
+
+    def _read_format(self, magic, options):
+        self._check(self._read_str_of_length(len(magic)) == magic)
+        self._check(self._read_int() == _FORMAT_VERSION)
+        self._check(self._read_int() == Bytecodes.invalid)
+        self._check(self._read_int() == options)
+
+    def read_class(self, key):
+        self._read_format(_MAGIC, key.options)
+
+        self._check(self._read_str() == key.source_path)
+        self._check(self._read_str() == repr(key.mtime))
+        self._check(self._read_int() == key.source_length)
+        self._check(self._read_int() == key.source_hash)
+        self._source_path = key.source_path
+
+        return self.read_class_body()
+
+    def read_image(self):
+        self._read_format(_IMAGE_MAGIC, compiler_options(self._universe))
+        records = {}
+        for _ in range(self._read_int()):
+            record = self._read_str()
+            # the record starts with the class name
+            name = _ClassCacheReader(record, self._universe)._read_str()
+            records[name] = record
+        self._check(self._pos == len(self._data))
+        return records
+
+    def read_class_body(self):
+        cgenc = ClassGenerationContext(self._universe)
+        cgenc.name = self._read_symbol()
+
+        super_name = self._read_symbol()
+        num_super_instance_fields = self._read_int()
+        num_super_class_fields = self._read_int()
+        if super_name.get_embedded_string() != "nil":
+            super_class = self._universe.load_class(super_name)
+            self._check(super_class is not None)
+            cgenc.set_super_class(super_class)
+
+        self._read_fields(cgenc._instance_fields, num_super_instance_fields)
+        self._read_fields(cgenc._class_fields, num_super_class_fields)
+
+        for _ in range(self._read_int()):
+            cgenc.add_instance_method(self._read_method())
+
+        cgenc.switch_to_class_side()
+        for _ in range(self._read_int()):
+            cgenc.add_class_method(self._read_method())
+
+        self._check(self._pos == len(self._data))
+        return cgenc
+
+    def _read_str_of_length(self, length):
+        start = self._pos
+        end = start + length
+        self._check(end <= len(self._data))
+        self._pos = end
+        return self._data[start:end]
+
+    def _read_fields(self, fields, num_super_fields):
+        """Check that the fields inherited from the super class did not change,
+        because the field indexes in the bytecodes depend on them,
+        and add the fields of the class itself."""
+        cached_fields = self._read_symbols()
+        self._check(len(fields) == num_super_fields)
+        self._check(len(cached_fields) >= num_super_fields)
+        for i in range(num_super_fields):
+            self._check(fields[i] is cached_fields[i])
+        for i in range(num_super_fields, len(cached_fields)):
+            fields.append(cached_fields[i])
+
+    def _read_method(self):
+        kind = self._read_int()
+        if kind == _METHOD_BC or kind == _METHOD_BC_NLR:
+            return self._read_bc_method(kind)
+
+        signature = self._read_symbol()
+        if kind == _METHOD_LITERAL_RETURN:
+            return LiteralReturn(signature, self._read_literal())
+        if kind == _METHOD_GLOBAL_READ:
+            global_name = self._read_symbol()
+            return GlobalRead(signature, global_name, self._read_int(), self._universe)
+        if kind == _METHOD_FIELD_READ:
+            field_idx = self._read_int()
+            return FieldRead(signature, field_idx, self._read_int())
+        if kind == _METHOD_FIELD_WRITE:
+            field_idx = self._read_int()
+            return FieldWrite(signature, field_idx, self._read_int())
+        if kind == _METHOD_PRIMITIVE:
+            return empty_primitive(signature.get_embedded_string(), self._universe)
+        raise InvalidClassCache()
+
+    def _read_bc_method(self, kind):
+        signature = self._read_symbol()
+        num_locals = self._read_int()
+        max_stack_elements = self._read_int()
+
+        arg_inner_access = [False] * self._read_int()
+        for i in range(len(arg_inner_access)):
+            arg_inner_access[i] = self._read_bool()
+        size_frame = self._read_int()
+        size_inner = self._read_int()
+
+        lexical_scope = self._read_scope()
+
+        inlined_loops = []
+        for _ in range(self._read_int()):
+            loop_begin_idx = self._read_int()
+            inlined_loops.append(_Loop(loop_begin_idx, self._read_int()))
+
+        call_sites = [-1] * self._read_int()
+        for i in range(len(call_sites)):
+            call_sites[i] = self._read_int()
+        num_call_sites = self._read_int()
+
+        literals = [None] * self._read_int()
+        for i in range(len(literals)):
+            literals[i] = self._read_literal()
+
+        bytecodes = self._read_str()
+        self._check(len(bytecodes) == len(call_sites))
+
+        if kind == _METHOD_BC_NLR:
+            bc_method_class = BcMethodNLR
+        else:
+            bc_method_class = BcMethod
+
+        method = bc_method_class(
+            literals,
+            num_locals,
+            max_stack_elements,
+            len(bytecodes),
+            signature,
+            arg_inner_access,
+            size_frame,
+            size_inner,
+            lexical_scope,
+            inlined_loops,
+            call_sites,
+            num_call_sites,
+        )
+        for i in range(len(bytecodes)):
+            method.set_bytecode(i, ord(bytecodes[i]))
+        return method
+
+    def _read_scope(self):
+        scope_id = self._read_int()
+        if scope_id == _SCOPE_NONE:
+            return None
+        if scope_id != _SCOPE_NEW:
+            self._check(0 <= scope_id < len(self._scopes))
+            return self._scopes[scope_id]
+
+        outer = self._read_scope()
+        arguments = [self._read_variable() for _ in range(self._read_int())]
+        local_vars = [self._read_variable() for _ in range(self._read_int())]
+        scope = LexicalScope(outer, arguments, local_vars)
+        self._scopes.append(scope)
+        return scope
+
+    def _read_variable(self):
+        kind = self._read_int()
+        name = self._read_str()
+        idx = self._read_int()
+        access_idx = self._read_int()
+        is_accessed = self._read_bool()
+        is_accessed_out_of_context = self._read_bool()
+
+        source = None
+        if self._read_bool():
+            start_line = self._read_int()
+            start_column = self._read_int()
+            char_idx = self._read_int()
+            source = SourceSection(
+                None,
+                "method",
+                SourceCoordinate(start_line, start_column, char_idx),
+                self._read_int(),
+                self._source_path,
+            )
+
+        self._check(idx >= 0)
+        if kind == _VAR_ARGUMENT:
+            var = Argument(name, idx, source)
+        else:
+            var = Local(name, idx, source)
+
+        if access_idx >= 0:
+            var.set_access_index(access_idx)
+        if is_accessed_out_of_context:
+            var.mark_accessed(1)
+        elif is_accessed:
+            var.mark_accessed(0)
+        return var
+
+    def _read_literal(self):
+        kind = self._read_int()
+        if kind == _LITERAL_NIL:
+            return nilObject
+        if kind == _LITERAL_TRUE:
+            return trueObject
+        if kind == _LITERAL_FALSE:
+            return falseObject
+        if kind == _LITERAL_SYMBOL:
+            return self._read_symbol()
+        if kind == _LITERAL_STRING:
+            return String(self._read_str())
+        if kind == _LITERAL_INTEGER:
+            return Integer(int(self._read_str()))
+        if kind == _LITERAL_BIG_INTEGER:
+            return BigInteger(bigint_from_str(self._read_str()))
+        if kind == _LITERAL_DOUBLE:
+            return Double(float(self._read_str()))
+        if kind == _LITERAL_METHOD:
+            return self._read_method()
+        raise InvalidClassCache()
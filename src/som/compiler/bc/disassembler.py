@@ -4,6 +4,7 @@ from som.interpreter.bc.bytecodes import (
     bytecode_as_str,
     bytecode_length,
     Bytecodes,
+    first_bytecode_of,
     is_one_of,
     JUMP_BYTECODES,
 )
@@ -41,7 +42,8 @@ def dump_method(m, indent):
     while b < m.get_number_of_bytecodes():
         error_print(indent)
         dump_bytecode(m, b, indent)
-        b += bytecode_length(m.get_bytecode(b))
+        # the second bytecode of a superinstruction is shown on its own line
+        b += bytecode_length(first_bytecode_of(m.get_bytecode(b)))
 
     error_println(indent + ")")
 
@@ -57,6 +59,7 @@ def dump_bytecode(m, b, indent=""):
     # mnemonic
     bytecode = m.get_bytecode(b)
     error_print(bytecode_as_str(bytecode) + "  ")
+    bytecode = first_bytecode_of(bytecode)
 
     # parameters (if any)
     if bytecode_length(bytecode) == 1:
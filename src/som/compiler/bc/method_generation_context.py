@@ -1,16 +1,20 @@
 from rlib.debug import make_sure_not_resized
 from som.compiler.bc.bytecode_generator import (
     emit_jump_on_bool_with_dummy_offset,
+    emit_jump_on_nil_with_dummy_offset,
     emit_jump_with_dummy_offset,
     emit_pop,
     emit_push_constant,
     emit_jump_backward_with_offset,
     emit_dup,
     emit_inc,
+    emit_dec,
     emit_dup_second,
     emit_jump_if_greater_with_dummy_offset,
+    emit_jump_if_less_with_dummy_offset,
     emit_pop_local,
     emit_nil_local,
+    emit_send,
 )
 
 from som.compiler.method_generation_context import MethodGenerationContextBase
@@ -30,9 +34,12 @@ from som.interpreter.bc.bytecodes import (
     JUMP_BYTECODES,
     NUM_SINGLE_BYTE_JUMP_BYTECODES,
     FIRST_DOUBLE_BYTE_JUMP_BYTECODE,
+    CALL_SITE_BYTECODES,
+    superinstruction_for,
 )
-from som.vm.globals import trueObject, falseObject
-from som.vmobjects.integer import int_0, int_1
+from som.vm.globals import nilObject, trueObject, falseObject
+from som.vmobjects.double import Double
+from som.vmobjects.integer import Integer, int_0, int_1
 from som.vmobjects.method_trivial import (
     LiteralReturn,
     GlobalRead,
@@ -40,6 +47,7 @@ from som.vmobjects.method_trivial import (
     FieldWrite,
 )
 from som.vmobjects.primitive import empty_primitive
+from som.vmobjects.symbol import Symbol
 from som.vmobjects.method_bc import (
     BcMethodNLR,
     BcMethod,
@@ -47,6 +55,22 @@ from som.vmobjects.method_bc import (
 
 _NUM_LAST_BYTECODES = 4
 
+_int_minus_1 = Integer(-1)
+
+# bytecodes whose first operand is the index of a literal
+_LITERAL_OPERAND_BYTECODES = [
+    Bytecodes.push_block,
+    Bytecodes.push_block_no_ctx,
+    Bytecodes.push_constant,
+    Bytecodes.push_global,
+    Bytecodes.send_1,
+    Bytecodes.send_2,
+    Bytecodes.send_3,
+    Bytecodes.send_4,
+    Bytecodes.send_n,
+    Bytecodes.super_send,
+]
+
 
 class MethodGenerationContext(MethodGenerationContextBase):
     def __init__(self, universe, holder, outer):
@@ -147,6 +171,8 @@ class MethodGenerationContext(MethodGenerationContextBase):
             # this map
             make_sure_not_resized(arg_inner_access)
 
+        call_sites, num_call_sites = self._compute_call_sites()
+
         if self.needs_to_catch_non_local_returns:
             bc_method_class = BcMethodNLR
         else:
@@ -163,6 +189,8 @@ class MethodGenerationContext(MethodGenerationContextBase):
             size_inner,
             self.lexical_scope,
             self.inlined_loops[:],
+            call_sites,
+            num_call_sites,
         )
 
         # copy bytecodes into method
@@ -171,6 +199,11 @@ class MethodGenerationContext(MethodGenerationContextBase):
             meth.set_bytecode(i, bytecode)
             i += 1
 
+        # blocks can still be inlined until the method is complete,
+        # so their superinstructions are created with the method's
+        if not self.is_block_method and self.universe.superinstructions:
+            fuse_superinstructions(meth)
+
         # return the method - the holder field is to be set later on!
         return meth
 
@@ -218,6 +251,25 @@ class MethodGenerationContext(MethodGenerationContextBase):
 
         return max_depth
 
+    def _compute_call_sites(self):
+        """
+        Number the bytecodes that need inline caches or counters.
+        Returns a list mapping each bytecode index to its call site, or -1,
+        and the number of call sites.
+        """
+        call_sites = [-1] * len(self._bytecode)
+        num_call_sites = 0
+        i = 0
+
+        while i < len(self._bytecode):
+            bc = self._bytecode[i]
+            if is_one_of(bc, CALL_SITE_BYTECODES):
+                call_sites[i] = num_call_sites
+                num_call_sites += 1
+            i += bytecode_length(bc)
+
+        return call_sites, num_call_sites
+
     def is_finished(self):
         return self._finished
 
@@ -414,9 +466,10 @@ class MethodGenerationContext(MethodGenerationContextBase):
         if self._bytecode[0] == Bytecodes.push_1:
             return LiteralReturn(self.signature, int_1)
         if self._bytecode[0] == Bytecodes.push_nil:
-            from som.vm.globals import nilObject
-
             return LiteralReturn(self.signature, nilObject)
+        if self._bytecode[0] in PUSH_CONST_BYTECODES:
+            # constant folding can leave literals of the operands behind
+            return LiteralReturn(self.signature, self._literal_pushed_by(1))
         raise NotImplementedError(
             "Not sure what's going on. Perhaps some new bytecode or unexpected literal?"
         )
@@ -428,8 +481,6 @@ class MethodGenerationContext(MethodGenerationContextBase):
             return None
 
         if len(self._literals) == 1:
-            from som.vmobjects.symbol import Symbol
-
             global_name = self._literals[0]
             assert isinstance(global_name, Symbol)
 
@@ -505,6 +556,148 @@ class MethodGenerationContext(MethodGenerationContextBase):
         arg_idx = self._bytecode[-(pop_len + return_len + 2)]
         return FieldWrite(self.signature, field_idx, arg_idx)
 
+    def _literal_pushed_by(self, idx_from_end):
+        """Return the literal pushed by one of the last bytecodes,
+        or None if the bytecode does not push a literal, true, false, or nil."""
+        for i in range(idx_from_end + 1):
+            if self._last_4_bytecodes[_NUM_LAST_BYTECODES - 1 - i] == (
+                Bytecodes.invalid
+            ):
+                return None
+
+        push_candidate = self._last_bytecode_is_one_of(
+            idx_from_end, PUSH_CONST_BYTECODES
+        )
+        if push_candidate == Bytecodes.push_0:
+            return int_0
+        if push_candidate == Bytecodes.push_1:
+            return int_1
+        if push_candidate == Bytecodes.push_nil:
+            return nilObject
+        if push_candidate == Bytecodes.push_constant_0:
+            return self._literals[0]
+        if push_candidate == Bytecodes.push_constant_1:
+            return self._literals[1]
+        if push_candidate == Bytecodes.push_constant_2:
+            return self._literals[2]
+
+        if push_candidate == Bytecodes.push_constant:
+            offset = self._get_offset_of_last_bytecode(idx_from_end)
+            return self._literals[self._bytecode[offset + 1]]
+
+        if self._last_bytecode_is(idx_from_end, Bytecodes.push_global) == (
+            Bytecodes.invalid
+        ):
+            return None
+        offset = self._get_offset_of_last_bytecode(idx_from_end)
+        glob = self._literals[self._bytecode[offset + 1]].get_embedded_string()
+        if glob == "true":
+            return trueObject
+        if glob == "false":
+            return falseObject
+        if glob == "nil":
+            return nilObject
+        return None
+
+    def _literal_index_pushed_by(self, idx_from_end):
+        """Return the index of the literal pushed by one of the last bytecodes,
+        or -1 if the bytecode does not push from the literals."""
+        bytecode = self._last_4_bytecodes[_NUM_LAST_BYTECODES - 1 - idx_from_end]
+        if bytecode == Bytecodes.push_constant_0:
+            return 0
+        if bytecode == Bytecodes.push_constant_1:
+            return 1
+        if bytecode == Bytecodes.push_constant_2:
+            return 2
+        if bytecode == Bytecodes.push_constant or bytecode == Bytecodes.push_global:
+            offset = self._get_offset_of_last_bytecode(idx_from_end)
+            return self._bytecode[offset + 1]
+        return -1
+
+    def _remove_literal_if_unused(self, literal_idx):
+        """Remove the last literal if no bytecode refers to it anymore.
+
+        Other literals are kept, because removing them would renumber the
+        literals that follow them."""
+        if literal_idx < 0 or literal_idx != len(self._literals) - 1:
+            return
+        if self._refers_to_literal(literal_idx):
+            return
+        self._literals.pop()
+
+    def _refers_to_literal(self, literal_idx):
+        i = 0
+        while i < len(self._bytecode):
+            bytecode = self._bytecode[i]
+            if bytecode == Bytecodes.push_constant_0:
+                idx = 0
+            elif bytecode == Bytecodes.push_constant_1:
+                idx = 1
+            elif bytecode == Bytecodes.push_constant_2:
+                idx = 2
+            elif is_one_of(bytecode, _LITERAL_OPERAND_BYTECODES):
+                idx = self._bytecode[i + 1]
+            else:
+                idx = -1
+
+            if idx == literal_idx:
+                return True
+            i += bytecode_length(bytecode)
+        return False
+
+    def _boolean_pushed_by(self, idx_from_end):
+        if not self.universe.constant_folding:
+            return None
+        lit = self._literal_pushed_by(idx_from_end)
+        if lit is trueObject or lit is falseObject:
+            return lit
+        return None
+
+    def pushes_foldable_literal(self):
+        """Whether the last bytecode pushes a literal,
+        which makes it a candidate for constant folding."""
+        if not self.universe.constant_folding:
+            return False
+        return self._literal_pushed_by(0) is not None
+
+    def fold_binary_send(self, selector):
+        # HACK: Like the inlining of control structures, we assume that
+        # HACK: the core classes are not changed, i.e., that 1 + 2 is 3.
+        if not self.pushes_foldable_literal():
+            return False
+
+        rcvr = self._literal_pushed_by(1)
+        if rcvr is None:
+            return False
+
+        result = fold_binary_operation(
+            rcvr, selector.get_embedded_string(), self._literal_pushed_by(0)
+        )
+        if result is None:
+            return False
+
+        rcvr_idx = self._literal_index_pushed_by(1)
+        arg_idx = self._literal_index_pushed_by(0)
+        self._remove_last_bytecodes(2)  # remove the pushes of the operands
+
+        # the later literal first, so that the other one may become the last
+        self._remove_literal_if_unused(max(rcvr_idx, arg_idx))
+        self._remove_literal_if_unused(min(rcvr_idx, arg_idx))
+
+        # adapt last 4 bytecodes
+        self._last_4_bytecodes[3] = self._last_4_bytecodes[1]
+        self._last_4_bytecodes[2] = self._last_4_bytecodes[0]
+        self._last_4_bytecodes[1] = Bytecodes.invalid
+        self._last_4_bytecodes[0] = Bytecodes.invalid
+
+        emit_push_constant(self, result)
+        return True
+
+    def _inline_block(self, block_method):
+        self._is_currently_inlining_a_block = True
+        block_method.inline(self)
+        self._is_currently_inlining_a_block = False
+
     def inline_if_true_or_if_false(self, parser, is_if_true):
         # HACK: We do assume that the receiver on the stack is a boolean,
         # HACK: similar to the IfTrueIfFalseNode.
@@ -516,6 +709,17 @@ class MethodGenerationContext(MethodGenerationContextBase):
         assert bytecode_length(push_block_candidate) == 2
         block_literal_idx = self._bytecode[-1]
 
+        receiver = self._boolean_pushed_by(1)
+        if receiver is not None:
+            # the receiver is a literal, so only one branch remains
+            self._remove_last_bytecodes(2)  # remove receiver and push_block*
+            if (receiver is trueObject) == is_if_true:
+                self._inline_block(self._literals[block_literal_idx])
+            else:
+                emit_push_constant(self, nilObject)
+            self._reset_last_bytecode_buffer()
+            return True
+
         self._remove_last_bytecodes(1)  # remove push_block*
 
         jump_offset_idx_to_skip_true_branch = emit_jump_on_bool_with_dummy_offset(
@@ -559,6 +763,18 @@ class MethodGenerationContext(MethodGenerationContextBase):
             and bytecode_length(Bytecodes.push_block_no_ctx) == 2
         )
 
+        receiver = self._boolean_pushed_by(2)
+        if receiver is not None:
+            # the receiver is a literal, so only one branch remains
+            if (receiver is trueObject) == is_if_true:
+                block_literal_idx = self._bytecode[-3]
+            else:
+                block_literal_idx = self._bytecode[-1]
+            self._remove_last_bytecodes(3)  # remove receiver and push_block*s
+            self._inline_block(self._literals[block_literal_idx])
+            self._reset_last_bytecode_buffer()
+            return True
+
         (
             to_be_inlined_1,
             to_be_inlined_2,
@@ -645,6 +861,18 @@ class MethodGenerationContext(MethodGenerationContextBase):
         assert bytecode_length(push_block_candidate) == 2
         block_literal_idx = self._bytecode[-1]
 
+        receiver = self._boolean_pushed_by(1)
+        if receiver is not None:
+            # the receiver is a literal, so the result is either the receiver
+            # or the value of the block
+            if (receiver is trueObject) == is_or:
+                self._remove_last_bytecodes(1)  # remove push_block*
+            else:
+                self._remove_last_bytecodes(2)  # remove receiver and push_block*
+                self._inline_block(self._literals[block_literal_idx])
+            self._reset_last_bytecode_buffer()
+            return True
+
         self._remove_last_bytecodes(1)  # remove push_block*
 
         jump_offset_idx_to_skip_branch = emit_jump_on_bool_with_dummy_offset(
@@ -673,6 +901,124 @@ class MethodGenerationContext(MethodGenerationContextBase):
 
         return True
 
+    def inline_if_nil_or_if_not_nil(self, parser, is_if_nil):
+        # the receiver stays on the stack, because it is the result
+        # of an #ifNil: on a non-nil object, and the argument of #ifNotNil:
+        push_block_candidate = self._last_bytecode_is_one_of(0, PUSH_BLOCK_BYTECODES)
+        if push_block_candidate == Bytecodes.invalid:
+            return False
+
+        assert bytecode_length(push_block_candidate) == 2
+        to_be_inlined = self._literals[self._bytecode[-1]]
+        if not _can_inline_nil_branch(to_be_inlined, is_if_nil):
+            return False
+
+        self._remove_last_bytecodes(1)  # remove push_block*
+
+        jump_offset_idx_to_skip_branch = emit_jump_on_nil_with_dummy_offset(
+            self, is_if_nil
+        )
+        self._inline_nil_branch(to_be_inlined)
+
+        self.patch_jump_offset_to_point_to_next_instruction(
+            jump_offset_idx_to_skip_branch, parser
+        )
+
+        # prevent optimizations messing with the final jump target
+        self._reset_last_bytecode_buffer()
+
+        return True
+
+    def inline_if_nil_if_not_nil(self, parser, is_if_nil):
+        if not self._has_two_literal_block_arguments():
+            return False
+
+        to_be_inlined_1 = self._literals[self._bytecode[-3]]
+        to_be_inlined_2 = self._literals[self._bytecode[-1]]
+        if not _can_inline_nil_branch(
+            to_be_inlined_1, is_if_nil
+        ) or not _can_inline_nil_branch(to_be_inlined_2, not is_if_nil):
+            return False
+
+        self._remove_last_bytecodes(2)  # remove push_block*s
+
+        jump_offset_idx_to_skip_first_branch = emit_jump_on_nil_with_dummy_offset(
+            self, is_if_nil
+        )
+        self._inline_nil_branch(to_be_inlined_1)
+
+        jump_offset_idx_to_skip_second_branch = emit_jump_with_dummy_offset(self)
+
+        self.patch_jump_offset_to_point_to_next_instruction(
+            jump_offset_idx_to_skip_first_branch, parser
+        )
+
+        # prevent optimizations between blocks to avoid issues with jump targets
+        self._reset_last_bytecode_buffer()
+
+        self._inline_nil_branch(to_be_inlined_2)
+
+        self.patch_jump_offset_to_point_to_next_instruction(
+            jump_offset_idx_to_skip_second_branch, parser
+        )
+
+        # prevent optimizations messing with the final jump target
+        self._reset_last_bytecode_buffer()
+
+        return True
+
+    def _inline_nil_branch(self, to_be_inlined):
+        # the receiver is on the stack, and becomes the block's argument,
+        # if it has one
+        self._is_currently_inlining_a_block = True
+        if to_be_inlined.get_number_of_arguments() == 2 and isinstance(
+            to_be_inlined, BcMethod
+        ):
+            to_be_inlined.merge_scope_into(self)
+            block_arg = to_be_inlined.get_argument(1, 0)
+            emit_pop_local(self, self.get_inlined_local_idx(block_arg, 0), 0)
+            to_be_inlined.inline(self, False)
+        else:
+            emit_pop(self)
+            to_be_inlined.inline(self)
+        self._is_currently_inlining_a_block = False
+
+    def inline_times_repeat(self, parser):
+        # HACK: We do assume that the receiver on the stack is a integer,
+        # HACK: similar to the other inlined messages.
+        push_block_candidate = self._last_bytecode_is_one_of(0, PUSH_BLOCK_BYTECODES)
+        if push_block_candidate == Bytecodes.invalid:
+            return False
+
+        assert bytecode_length(push_block_candidate) == 2
+        to_be_inlined = self._literals[self._bytecode[-1]]
+        if to_be_inlined.get_number_of_arguments() != 1:
+            return False
+
+        self._remove_last_bytecodes(1)  # remove push_block*
+
+        self._is_currently_inlining_a_block = True
+        emit_dup(self)  # the receiver is the limit
+        emit_push_constant(self, int_1)  # stack: Top[n, n, 1]
+
+        loop_begin_idx = self.offset_of_next_instruction()
+        jump_offset_idx_to_end = emit_jump_if_greater_with_dummy_offset(self)
+
+        to_be_inlined.inline(self)
+
+        emit_pop(self)
+        emit_inc(self)
+
+        self.emit_backwards_jump_offset_to_target(loop_begin_idx, parser)
+
+        self.patch_jump_offset_to_point_to_next_instruction(
+            jump_offset_idx_to_end, parser
+        )
+
+        self._is_currently_inlining_a_block = False
+        self._reset_last_bytecode_buffer()
+        return True
+
     def inline_to_do(self, parser):
         # HACK: We do assume that the receiver on the stack is a integer,
         # HACK: similar to the other inlined messages.
@@ -684,13 +1030,50 @@ class MethodGenerationContext(MethodGenerationContextBase):
         assert bytecode_length(push_block_candidate) == 2
         block_literal_idx = self._bytecode[-1]
 
+        return self._inline_counting_loop(parser, block_literal_idx, 1, int_1, False)
+
+    def inline_down_to_do(self, parser):
+        push_block_candidate = self._last_bytecode_is_one_of(0, PUSH_BLOCK_BYTECODES)
+        if push_block_candidate == Bytecodes.invalid:
+            return False
+
+        assert bytecode_length(push_block_candidate) == 2
+        block_literal_idx = self._bytecode[-1]
+
+        return self._inline_counting_loop(
+            parser, block_literal_idx, 1, _int_minus_1, True
+        )
+
+    def inline_to_by_do(self, parser):
+        # the step is added in the loop body, so it has to be a literal.
+        # Like the primitive, the loop ends once the index is greater than
+        # the limit, even with a negative step
+        push_block_candidate = self._last_bytecode_is_one_of(0, PUSH_BLOCK_BYTECODES)
+        if push_block_candidate == Bytecodes.invalid:
+            return False
+
+        step = self._literal_pushed_by(1)
+        if not isinstance(step, Integer):
+            return False
+
+        assert bytecode_length(push_block_candidate) == 2
+        block_literal_idx = self._bytecode[-1]
+
+        return self._inline_counting_loop(parser, block_literal_idx, 2, step, False)
+
+    def _inline_counting_loop(
+        self, parser, block_literal_idx, num_to_remove, step, is_down_to
+    ):
         to_be_inlined = self._literals[block_literal_idx]
+        if not isinstance(to_be_inlined, BcMethod):
+            # trivial blocks have no scope to take the loop variable
+            return False
         to_be_inlined.merge_scope_into(self)
 
         block_arg = to_be_inlined.get_argument(1, 0)
         i_var_idx = self.get_inlined_local_idx(block_arg, 0)
 
-        self._remove_last_bytecodes(1)  # remove push_block*
+        self._remove_last_bytecodes(num_to_remove)  # remove push_block* and the step
 
         self._is_currently_inlining_a_block = True
         emit_dup_second(self)
@@ -698,7 +1081,10 @@ class MethodGenerationContext(MethodGenerationContextBase):
         emit_nil_local(self, i_var_idx)
 
         loop_begin_idx = self.offset_of_next_instruction()
-        jump_offset_idx_to_end = emit_jump_if_greater_with_dummy_offset(self)
+        if is_down_to:
+            jump_offset_idx_to_end = emit_jump_if_less_with_dummy_offset(self)
+        else:
+            jump_offset_idx_to_end = emit_jump_if_greater_with_dummy_offset(self)
 
         emit_dup(self)
 
@@ -707,7 +1093,13 @@ class MethodGenerationContext(MethodGenerationContextBase):
         to_be_inlined.inline(self, False)
 
         emit_pop(self)
-        emit_inc(self)
+        if step.get_embedded_integer() == 1:
+            emit_inc(self)
+        elif step.get_embedded_integer() == -1:
+            emit_dec(self)
+        else:
+            emit_push_constant(self, step)
+            emit_send(self, self.universe.sym_plus)
 
         emit_nil_local(self, i_var_idx)
         self.emit_backwards_jump_offset_to_target(loop_begin_idx, parser)
@@ -786,6 +1178,100 @@ class MethodGenerationContext(MethodGenerationContextBase):
             )
 
 
+def fold_binary_operation(rcvr, selector, arg):
+    """Return the result of sending the binary selector to the literal receiver
+    with the literal argument, or None if it is not known at compile time."""
+    if selector == "==" and _is_identity_literal(rcvr) and _is_identity_literal(arg):
+        return _as_boolean(rcvr is arg)
+
+    if not (isinstance(rcvr, Integer) or isinstance(rcvr, Double)):
+        return None
+    if not (isinstance(arg, Integer) or isinstance(arg, Double)):
+        return None
+
+    if selector == "+":
+        return rcvr.prim_add(arg)
+    if selector == "-":
+        return rcvr.prim_subtract(arg)
+    if selector == "*":
+        return rcvr.prim_multiply(arg)
+    if selector == "=":
+        return rcvr.prim_equals(arg)
+    if selector == "<>" or selector == "~=":
+        return rcvr.prim_unequals(arg)
+    if selector == "<":
+        return _as_boolean(rcvr.prim_less_than(arg))
+    if selector == "<=":
+        return rcvr.prim_less_than_or_equal(arg)
+    if selector == ">":
+        return rcvr.prim_greater_than(arg)
+    if selector == ">=":
+        return rcvr.prim_greater_than_or_equal(arg)
+
+    if not isinstance(rcvr, Integer):
+        return None
+    if selector == "==":
+        if not isinstance(arg, Integer):
+            return falseObject
+        return rcvr.prim_equals(arg)
+
+    # division by zero is left to the run time
+    if isinstance(arg, Integer) and arg.get_embedded_integer() == 0:
+        return None
+    if isinstance(arg, Double) and arg.get_embedded_double() == 0.0:
+        return None
+    if selector == "/":
+        return rcvr.prim_int_div(arg)
+    if selector == "//":
+        return rcvr.prim_double_div(arg)
+    if selector == "%":
+        return rcvr.prim_modulo(arg)
+    return None
+
+
+def _can_inline_nil_branch(block_method, is_if_nil):
+    # the #ifNil: block has no arguments, the #ifNotNil: block
+    # can take the receiver as argument
+    num_args = block_method.get_number_of_arguments()
+    if is_if_nil:
+        return num_args == 1
+    return num_args == 1 or num_args == 2
+
+
+def _is_identity_literal(lit):
+    return (
+        isinstance(lit, Symbol)
+        or lit is nilObject
+        or lit is trueObject
+        or lit is falseObject
+    )
+
+
+def _as_boolean(value):
+    if value:
+        return trueObject
+    return falseObject
+
+
+def fuse_superinstructions(method):
+    """Replace pairs of bytecodes by superinstructions,
+    in the method and in the blocks it contains."""
+    num_bytecodes = method.get_number_of_bytecodes()
+    i = 0
+    while i < num_bytecodes:
+        bytecode = method.get_bytecode(i)
+        length = bytecode_length(bytecode)
+
+        if bytecode == Bytecodes.push_block or bytecode == Bytecodes.push_block_no_ctx:
+            fuse_superinstructions(method.get_constant(i))
+        elif i + length < num_bytecodes:
+            fused = superinstruction_for(bytecode, method.get_bytecode(i + length))
+            if fused != Bytecodes.invalid:
+                method.set_bytecode(i, fused)
+                length = bytecode_length(fused)
+        i += length
+
+
 class _Loop(object):
     _immutable_fields_ = ["loop_begin_idx", "backward_jump_idx"]
 
@@ -20,15 +20,63 @@ from som.compiler.bc.bytecode_generator import (
     emit_return_non_local,
 )
 from som.compiler.bc.method_generation_context import MethodGenerationContext
+from som.compiler.parse_error import ParseError
 from som.compiler.parser import ParserBase
 from som.compiler.symbol import Symbol
 from som.vmobjects.integer import Integer
+from som.vmobjects.method_lazy import LazyMethod
 from som.vmobjects.string import String
 
 
 class Parser(ParserBase):
-    def __init__(self, reader, file_name, universe):
-        ParserBase.__init__(self, reader, file_name, universe)
+    def __init__(self, reader, file_name, universe, start_coord=None):
+        ParserBase.__init__(self, reader, file_name, universe, start_coord)
+        self._lazy_method_source = None
+
+    def compile_methods_lazily(self, source):
+        """Instead of compiling method bodies, install LazyMethods,
+        which compile their part of the source on first use.
+        The source needs to be the whole input of the parser."""
+        self._lazy_method_source = source
+
+    def _assemble_method(self, mgenc):
+        if self._lazy_method_source is None:
+            return ParserBase._assemble_method(self, mgenc)
+
+        start = self._lexer.get_sym_start_coordinate()
+        self._pattern(mgenc)
+        self._expect(Symbol.Equal)
+        if self._sym == Symbol.Primitive:
+            mgenc.set_primitive()
+            self._primitive_block()
+            return mgenc.assemble(None)
+
+        self._skip_method_block()
+        end = self._lexer.get_sym_start_coordinate().char_idx
+        assert 0 <= start.char_idx <= end
+
+        return LazyMethod(
+            mgenc.signature,
+            self._lazy_method_source[start.char_idx : end],
+            start,
+            self._file_name,
+            mgenc.holder,
+            self.universe,
+        )
+
+    def _skip_method_block(self):
+        self._expect(Symbol.NewTerm)
+        depth = 1
+        while depth > 0:
+            if self._sym == Symbol.NewTerm:
+                depth += 1
+            elif self._sym == Symbol.EndTerm:
+                depth -= 1
+            elif self._sym == Symbol.NONE and self._text == "\0":
+                raise ParseError(
+                    "Unexpected end of input in method body", Symbol.EndTerm, self
+                )
+            self._get_symbol_from_lexer()
 
     def _method_block(self, mgenc):
         self._expect(Symbol.NewTerm)
@@ -203,7 +251,8 @@ class Parser(ParserBase):
 
     def _try_inc_or_dec_bytecodes(self, msg, is_super_send, mgenc):
         is_inc_or_dec = msg is self.universe.sym_plus or msg is self.universe.sym_minus
-        if is_inc_or_dec and not is_super_send:
+        # a literal receiver is left to constant folding
+        if is_inc_or_dec and not is_super_send and not mgenc.pushes_foldable_literal():
             if self._sym == Symbol.Integer and self._text == "1":
                 self._expect(Symbol.Integer)
                 if msg is self.universe.sym_plus:
@@ -234,7 +283,7 @@ class Parser(ParserBase):
 
         if is_super_send:
             emit_super_send(mgenc, msg)
-        else:
+        elif not mgenc.fold_binary_send(msg):
             emit_send(mgenc, msg)
 
     def _binary_operand(self, mgenc):
@@ -269,6 +318,15 @@ class Parser(ParserBase):
                 or (keyword == "whileFalse:" and mgenc.inline_while(self, False))
                 or (keyword == "or:" and mgenc.inline_andor(self, True))
                 or (keyword == "and:" and mgenc.inline_andor(self, False))
+                or (
+                    keyword == "ifNil:"
+                    and mgenc.inline_if_nil_or_if_not_nil(self, True)
+                )
+                or (
+                    keyword == "ifNotNil:"
+                    and mgenc.inline_if_nil_or_if_not_nil(self, False)
+                )
+                or (keyword == "timesRepeat:" and mgenc.inline_times_repeat(self))
             ):
                 return
 
@@ -282,9 +340,21 @@ class Parser(ParserBase):
                     and mgenc.inline_if_true_false(self, False)
                 )
                 or (keyword == "to:do:" and mgenc.inline_to_do(self))
+                or (keyword == "downTo:do:" and mgenc.inline_down_to_do(self))
+                or (
+                    keyword == "ifNil:ifNotNil:"
+                    and mgenc.inline_if_nil_if_not_nil(self, True)
+                )
+                or (
+                    keyword == "ifNotNil:ifNil:"
+                    and mgenc.inline_if_nil_if_not_nil(self, False)
+                )
             ):
                 return
 
+            if num_args == 3 and keyword == "to:by:do:" and mgenc.inline_to_by_do(self):
+                return
+
         msg = self.universe.symbol_for(keyword)
 
         if is_super_send:
@@ -55,6 +55,9 @@ class ClassGenerationContext(object):
     def switch_to_class_side(self):
         self._class_side = True
 
+    def set_class_side(self, value):
+        self._class_side = value
+
     def add_class_method(self, method):
         self._class_methods[method.get_signature()] = method
         if method.is_primitive():
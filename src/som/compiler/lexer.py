@@ -7,9 +7,14 @@ class Lexer(object):
     _SEPARATOR = "----"
     _PRIMITIVE = "primitive"
 
-    def __init__(self, input_file):
+    def __init__(self, input_file, start_coord=None):
         self.line_number = 0
         self._chars_read = 0  # all characters read, excluding the current line
+        if start_coord is not None:
+            # the input is a part of a file, indented to its start column
+            self.line_number = start_coord.start_line - 1
+            self._chars_read = start_coord.char_idx - (start_coord.start_column - 1)
+
         self._infile = input_file
         self._sym = Symbol.NONE
         self._symc = "\0"
@@ -21,11 +26,27 @@ class Lexer(object):
         self._buf = ""
         self._bufp = 0
 
+        # where the current and the peeked symbol start
+        self._sym_line = 0
+        self._sym_column = 0
+        self._sym_char_idx = 0
+        self._next_sym_line = 0
+        self._next_sym_column = 0
+        self._next_sym_char_idx = 0
+
     def get_source_coordinate(self):
         return SourceCoordinate(
             self.line_number, self._bufp + 1, self._chars_read + self._bufp
         )
 
+    def get_sym_start_coordinate(self):
+        return SourceCoordinate(self._sym_line, self._sym_column, self._sym_char_idx)
+
+    def _mark_sym_start(self):
+        self._sym_line = self.line_number
+        self._sym_column = self._bufp + 1
+        self._sym_char_idx = self._chars_read + self._bufp
+
     def _lex_number(self):
         self._sym = Symbol.Integer
         self._symc = "\0"
@@ -136,10 +157,14 @@ class Lexer(object):
             self._sym = self._next_sym
             self._symc = self._next_symc
             self.text = self._next_text
+            self._sym_line = self._next_sym_line
+            self._sym_column = self._next_sym_column
+            self._sym_char_idx = self._next_sym_char_idx
             return self._sym
 
         while True:
             if not self._has_more_input():
+                self._mark_sym_start()
                 self._sym = Symbol.NONE
                 self._symc = "\0"
                 self.text = self._symc
@@ -154,6 +179,8 @@ class Lexer(object):
             ):
                 break
 
+        self._mark_sym_start()
+
         if self._current_char() == "'":
             self._lex_string()
         elif self._current_char() == "[":
@@ -235,6 +262,9 @@ class Lexer(object):
         save_sym = self._sym
         save_symc = self._symc
         save_text = self.text
+        save_line = self._sym_line
+        save_column = self._sym_column
+        save_char_idx = self._sym_char_idx
 
         if self.peek_done:
             raise ValueError("SOM lexer: cannot peek twice!")
@@ -243,10 +273,16 @@ class Lexer(object):
         self._next_sym = self._sym
         self._next_symc = self._symc
         self._next_text = self.text
+        self._next_sym_line = self._sym_line
+        self._next_sym_column = self._sym_column
+        self._next_sym_char_idx = self._sym_char_idx
 
         self._sym = save_sym
         self._symc = save_symc
         self.text = save_text
+        self._sym_line = save_line
+        self._sym_column = save_column
+        self._sym_char_idx = save_char_idx
 
         self.peek_done = True
 
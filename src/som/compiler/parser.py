@@ -54,11 +54,11 @@ class ParserBase(object):
 
     _keyword_selector_syms = [Symbol.Keyword, Symbol.KeywordSequence]
 
-    def __init__(self, reader, file_name, universe):
+    def __init__(self, reader, file_name, universe, start_coord=None):
         self.universe = universe
         self._file_name = file_name
 
-        self._lexer = Lexer(reader)
+        self._lexer = Lexer(reader, start_coord)
         self._source_reader = reader
 
         self._sym = Symbol.NONE
@@ -92,11 +92,7 @@ class ParserBase(object):
             or self._sym == Symbol.OperatorSequence
             or self._sym_in(self._binary_op_syms)
         ):
-            coord = self._lexer.get_source_coordinate()
-            mgenc = MethodGenerationContext(self.universe, cgenc, None)
-            mgenc.add_argument("self", self._get_source_section(coord), self)
-
-            cgenc.add_instance_method(mgenc.assemble(self.method(mgenc)))
+            cgenc.add_instance_method(self.method_definition(cgenc))
 
         if self._accept(Symbol.Separator):
             cgenc.switch_to_class_side()
@@ -108,14 +104,19 @@ class ParserBase(object):
                 or self._sym == Symbol.OperatorSequence
                 or self._sym_in(self._binary_op_syms)
             ):
-                coord = self._lexer.get_source_coordinate()
-                mgenc = MethodGenerationContext(self.universe, cgenc, None)
-                mgenc.add_argument("self", self._get_source_section(coord), self)
-
-                cgenc.add_class_method(mgenc.assemble(self.method(mgenc)))
+                cgenc.add_class_method(self.method_definition(cgenc))
 
         self._expect(Symbol.EndTerm)
 
+    def method_definition(self, cgenc):
+        coord = self._lexer.get_source_coordinate()
+        mgenc = MethodGenerationContext(self.universe, cgenc, None)
+        mgenc.add_argument("self", self._get_source_section(coord), self)
+        return self._assemble_method(mgenc)
+
+    def _assemble_method(self, mgenc):
+        return mgenc.assemble(self.method(mgenc))
+
     def _superclass(self, cgenc):
         if self._sym == Symbol.Identifier:
             super_name = self.universe.symbol_for(self._text)
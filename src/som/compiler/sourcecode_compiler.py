@@ -1,28 +1,142 @@
 import os
-from rlib.streamio import open_file_as_stream
+from rlib.streamio import open_file_as_stream, readall_from_stream
 from rlib.string_stream import StringStream
 
 from som.compiler.class_generation_context import ClassGenerationContext
 from som.interp_type import is_ast_interpreter
+from som.vm.startup_profile import (
+    PHASE_ASSEMBLE,
+    PHASE_PARSE,
+    startup_profile,
+)
 
 if is_ast_interpreter():
     from som.compiler.ast.parser import Parser
+
+    # compiled classes are only cached for the bytecode interpreter
+
+    def _parse_file_with_cache(fname, _filename, universe):
+        return _parse_file(fname, universe)
+
+    def _parse_file_lazily(fname, universe):
+        return _parse_file(fname, universe)
+
+    def new_image_recorder(_universe):
+        return None
+
+    def load_image(_file_name, _universe):
+        return None
+
+    def compile_class_from_image(_image, _name, _system_class, _universe):
+        return None
+
 else:
     from som.compiler.bc.parser import Parser
+    from som.compiler.bc.class_cache import (
+        ClassCacheKey,
+        ImageRecorder,
+        InvalidClassCache,
+        cache_file_name,
+        class_from_image_record,
+        compiler_options,
+        load_cached_class,
+        load_image as _load_image,
+        store_cached_class,
+    )
+
+    def _parse_file_with_cache(fname, filename, universe):
+        try:
+            input_file = open_file_as_stream(fname, "r")
+            try:
+                source = readall_from_stream(input_file)
+            finally:
+                input_file.close()
+            mtime = os.stat(fname).st_mtime
+        except OSError:
+            raise IOError()
+
+        key = ClassCacheKey(fname, mtime, source, compiler_options(universe))
+        cache_file = cache_file_name(universe.class_cache_dir, fname, filename)
+
+        cgc = load_cached_class(cache_file, key, universe)
+        if cgc is None:
+            cgc = _parse(Parser(StringStream(source), fname, universe), universe)
+            store_cached_class(cache_file, key, cgc)
+        return cgc
+
+    def _parse_file_lazily(fname, universe):
+        try:
+            input_file = open_file_as_stream(fname, "r")
+            try:
+                source = readall_from_stream(input_file)
+            finally:
+                input_file.close()
+        except OSError:
+            raise IOError()
+
+        parser = Parser(StringStream(source), fname, universe)
+        parser.compile_methods_lazily(source)
+        return _parse(parser, universe)
+
+    def new_image_recorder(universe):
+        return ImageRecorder(universe)
+
+    def load_image(file_name, universe):
+        """Return the classes of the image, or None if it cannot be read."""
+        try:
+            return _load_image(file_name, universe)
+        except (IOError, OSError, InvalidClassCache):
+            return None
 
+    def compile_class_from_image(image, name, system_class, universe):
+        record = image.get(name, None)
+        if record is None:
+            return None
+
+        startup_profile.start(name, PHASE_PARSE)
+        try:
+            cgc = class_from_image_record(record, universe)
+        except InvalidClassCache:
+            return None
+        finally:
+            startup_profile.stop()
+
+        if universe.image_recorder is not None:
+            universe.image_recorder.add_class(cgc)
+        return _assemble_class(name, cgc, system_class)
 
-def compile_class_from_file(path, filename, system_class, universe):
-    fname = path + os.sep + filename + ".som"
 
+def _parse_file(fname, universe):
     try:
         input_file = open_file_as_stream(fname, "r")
         try:
             parser = Parser(input_file, fname, universe)
-            result = _compile(parser, system_class, universe)
+            cgc = _parse(parser, universe)
         finally:
             input_file.close()
     except OSError:
         raise IOError()
+    return cgc
+
+
+def compile_class_from_file(path, filename, system_class, universe):
+    fname = path + os.sep + filename + ".som"
+
+    startup_profile.start(filename, PHASE_PARSE)
+    try:
+        if universe.class_cache_dir is not None:
+            cgc = _parse_file_with_cache(fname, filename, universe)
+        elif universe.lazy_methods and universe.image_recorder is None:
+            # cached classes and images need the compiled methods
+            cgc = _parse_file_lazily(fname, universe)
+        else:
+            cgc = _parse_file(fname, universe)
+    finally:
+        startup_profile.stop()
+
+    if universe.image_recorder is not None:
+        universe.image_recorder.add_class(cgc)
+    result = _assemble_class(filename, cgc, system_class)
 
     cname = result.get_name()
     cname_str = cname.get_embedded_string()
@@ -45,11 +159,25 @@ def compile_class_from_string(stream, system_class, universe):
 
 
 def _compile(parser, system_class, universe):
-    cgc = ClassGenerationContext(universe)
+    return _assemble(_parse(parser, universe), system_class)
 
-    result = system_class
+
+def _parse(parser, universe):
+    cgc = ClassGenerationContext(universe)
     parser.classdef(cgc)
+    return cgc
 
+
+def _assemble_class(name, cgc, system_class):
+    startup_profile.start(name, PHASE_ASSEMBLE)
+    try:
+        return _assemble(cgc, system_class)
+    finally:
+        startup_profile.stop()
+
+
+def _assemble(cgc, system_class):
+    result = system_class
     if not system_class:
         result = cgc.assemble()
     else:
@@ -29,7 +29,9 @@ class GenericDispatchNode(_AbstractDispatchNode):
         self._selector = selector
 
     def execute_dispatch(self, rcvr, args):
-        method = rcvr.get_object_layout(self.universe).lookup_invokable(self._selector)
+        method = self.universe.lookup_invokable(
+            rcvr.get_object_layout(self.universe), self._selector
+        )
         if method is not None:
             return method.invoke(rcvr, args)
         return self._send_dnu(rcvr, args)
@@ -44,25 +46,33 @@ class GenericDispatchNode(_AbstractDispatchNode):
         )
 
     def dispatch_1(self, rcvr):
-        method = rcvr.get_object_layout(self.universe).lookup_invokable(self._selector)
+        method = self.universe.lookup_invokable(
+            rcvr.get_object_layout(self.universe), self._selector
+        )
         if method is not None:
             return method.invoke_1(rcvr)
         return self._send_dnu(rcvr, [])
 
     def dispatch_2(self, rcvr, arg):
-        method = rcvr.get_object_layout(self.universe).lookup_invokable(self._selector)
+        method = self.universe.lookup_invokable(
+            rcvr.get_object_layout(self.universe), self._selector
+        )
         if method is not None:
             return method.invoke_2(rcvr, arg)
         return self._send_dnu(rcvr, [arg])
 
     def dispatch_3(self, rcvr, arg1, arg2):
-        method = rcvr.get_object_layout(self.universe).lookup_invokable(self._selector)
+        method = self.universe.lookup_invokable(
+            rcvr.get_object_layout(self.universe), self._selector
+        )
         if method is not None:
             return method.invoke_3(rcvr, arg1, arg2)
         return self._send_dnu(rcvr, [arg1, arg2])
 
     def dispatch_args(self, rcvr, args):
-        method = rcvr.get_object_layout(self.universe).lookup_invokable(self._selector)
+        method = self.universe.lookup_invokable(
+            rcvr.get_object_layout(self.universe), self._selector
+        )
         if method is not None:
             return method.invoke_args(rcvr, args)
         return self._send_dnu(rcvr, args)
@@ -3,7 +3,7 @@ from rlib.jit import JitDriver, we_are_jitted
 from som.interpreter.ast.nodes.expression_node import ExpressionNode
 from som.vm.globals import nilObject
 from som.vmobjects.double import Double
-from som.vmobjects.integer import Integer
+from som.vmobjects.integer import Integer, make_integer
 
 
 def get_printable_location(self):
@@ -60,7 +60,7 @@ class ToDoInlined(ExpressionNode):
         i = start.get_embedded_integer()
         while i <= end_int:
             driver.jit_merge_point(self=self)
-            self._idx_write.write_value(frame, Integer(i))
+            self._idx_write.write_value(frame, make_integer(i))
             self._do_expr.execute(frame)
             if we_are_jitted():
                 self._idx_write.write_value(frame, nilObject)
@@ -4,7 +4,7 @@ from som.interpreter.ast.nodes.specialized.to_do_node import AbstractToDoNode
 
 from som.vmobjects.block_ast import AstBlock
 from som.vmobjects.double import Double
-from som.vmobjects.integer import Integer
+from som.vmobjects.integer import Integer, make_integer
 from som.vmobjects.method_ast import AstMethod
 
 
@@ -62,7 +62,7 @@ class IntToIntByDoNode(AbstractToByDoNode):
         by = step.get_embedded_integer()
         while i <= top:
             int_driver.jit_merge_point(block_method=block_method)
-            block_method.invoke_2(body_block, Integer(i))
+            block_method.invoke_2(body_block, make_integer(i))
             i += by
 
     @staticmethod
@@ -109,7 +109,7 @@ class IntToDoubleByDoNode(AbstractToByDoNode):
         by = step.get_embedded_integer()
         while i <= top:
             double_driver.jit_merge_point(block_method=block_method)
-            block_method.invoke_2(body_block, Integer(i))
+            block_method.invoke_2(body_block, make_integer(i))
             i += by
 
     @staticmethod
@@ -0,0 +1,224 @@
+from rlib import jit
+from rlib.listsort import make_timsort_class
+from rlib.streamio import open_file_as_stream
+
+from som.interpreter.bc.bytecodes import (
+    Bytecodes,
+    bytecode_as_str,
+    bytecode_length,
+    first_bytecode_of,
+)
+
+_BYTECODE_BITS = 8
+
+
+class _NgramProfile(object):
+    """Counts how often sequences of two and three bytecodes are executed.
+
+    Each executed bytecode counts for the sequences it starts, made of the
+    bytecodes that follow it in the method. These are the sequences that
+    can be fused into superinstructions, see SUPERINSTRUCTIONS."""
+
+    def __init__(self):
+        self.enabled = False
+        self._pairs = {}
+        self._triples = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def record(self, method, bc_idx):
+        num_bytecodes = method.get_number_of_bytecodes()
+
+        first = first_bytecode_of(method.get_bytecode(bc_idx))
+        i = bc_idx + bytecode_length(first)
+        if i >= num_bytecodes:
+            return
+
+        second = first_bytecode_of(method.get_bytecode(i))
+        pair = (first << _BYTECODE_BITS) | second
+        self._pairs[pair] = self._pairs.get(pair, 0) + 1
+
+        i += bytecode_length(second)
+        if i >= num_bytecodes:
+            return
+
+        third = first_bytecode_of(method.get_bytecode(i))
+        triple = (pair << _BYTECODE_BITS) | third
+        self._triples[triple] = self._triples.get(triple, 0) + 1
+
+    def get_pair_count(self, first, second):
+        return self._pairs.get((first << _BYTECODE_BITS) | second, 0)
+
+    def get_triple_count(self, first, second, third):
+        key = (((first << _BYTECODE_BITS) | second) << _BYTECODE_BITS) | third
+        return self._triples.get(key, 0)
+
+    def format(self):
+        """One sequence per line, the most frequent first."""
+        lines = []
+        _format_ngrams(self._pairs, 2, lines)
+        _format_ngrams(self._triples, 3, lines)
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_name):
+        stream = open_file_as_stream(file_name, "w")
+        try:
+            stream.write(self.format())
+        finally:
+            stream.close()
+
+
+def _format_ngrams(ngrams, length, lines):
+    keys = list(ngrams.keys())
+    _ByDecreasingCount(keys, ngrams).sort()
+
+    mask = (1 << _BYTECODE_BITS) - 1
+    for key in keys:
+        names = []
+        for i in range(length - 1, -1, -1):
+            names.append(bytecode_as_str((key >> (i * _BYTECODE_BITS)) & mask))
+        lines.append(str(ngrams[key]) + "\t" + " ".join(names))
+
+
+class _MethodCounts(object):
+    def __init__(self, method):
+        self.method = method
+        self.counts = [0] * method.get_number_of_bytecodes()
+        self.total = 0
+
+
+class _BytecodeHistogram(object):
+    """Counts the executed bytecodes per opcode and per method and index.
+
+    Unlike the n-gram profile, it also counts in compiled code, where the
+    count is a call that traces do not look into. Opcodes are counted as
+    dispatched, so superinstructions only count where a tier executes them
+    without splitting them into their bytecodes."""
+
+    _immutable_fields_ = ["enabled?"]
+
+    def __init__(self):
+        self.enabled = False
+        self._opcodes = [0] * Bytecodes.invalid
+        self._methods = {}
+
+    def enable(self):
+        self.enabled = True
+
+    @jit.dont_look_inside
+    def record(self, method, bc_idx, bytecode):
+        self._opcodes[bytecode] += 1
+
+        counts = self._methods.get(method, None)
+        if counts is None:
+            counts = _MethodCounts(method)
+            self._methods[method] = counts
+        counts.counts[bc_idx] += 1
+        counts.total += 1
+
+    def get_opcode_count(self, bytecode):
+        return self._opcodes[bytecode]
+
+    def get_count(self, method, bc_idx):
+        counts = self._methods.get(method, None)
+        if counts is None:
+            return 0
+        return counts.counts[bc_idx]
+
+    def format(self):
+        """The opcodes and the methods, each sorted by decreasing count.
+
+        Each method is followed by its executed bytecodes, the most
+        frequent first."""
+        total = 0
+        for count in self._opcodes:
+            total += count
+
+        lines = ["Bytecode histogram (" + str(total) + " bytecodes)"]
+        for bytecode in _sorted_indices(self._opcodes):
+            count = self._opcodes[bytecode]
+            if count == 0:
+                break
+            lines.append(_format_count(count, total) + "  " + bytecode_as_str(bytecode))
+
+        lines.append("")
+        lines.append("Method hotness")
+        methods = list(self._methods.values())
+        _ByDecreasingTotal(methods).sort()
+
+        for counts in methods:
+            lines.append(
+                _format_count(counts.total, total)
+                + "  "
+                + counts.method.merge_point_string()
+            )
+            for bc_idx in _sorted_indices(counts.counts):
+                count = counts.counts[bc_idx]
+                if count == 0:
+                    break
+                lines.append(
+                    "    "
+                    + _format_count(count, counts.total)
+                    + "  "
+                    + str(bc_idx)
+                    + " "
+                    + bytecode_as_str(counts.method.get_bytecode(bc_idx))
+                )
+        return "\n".join(lines) + "\n"
+
+
+_TimSortInt = make_timsort_class()
+_TimSortMethodCounts = make_timsort_class()
+
+
+class _ByDecreasingCount(_TimSortInt):
+    """Sorts the keys of `ngrams` by their count."""
+
+    def __init__(self, lst, ngrams):
+        _TimSortInt.__init__(self, lst, len(lst))
+        self.ngrams = ngrams
+
+    def lt(self, a, b):
+        return self.ngrams[a] > self.ngrams[b]
+
+
+class _ByDecreasingIndexCount(_TimSortInt):
+    """Sorts the indices of the list `counts` by their count."""
+
+    def __init__(self, lst, counts):
+        _TimSortInt.__init__(self, lst, len(lst))
+        self.counts = counts
+
+    def lt(self, a, b):
+        return self.counts[a] > self.counts[b]
+
+
+class _ByDecreasingTotal(_TimSortMethodCounts):
+    def lt(self, a, b):
+        return a.total > b.total
+
+
+def _sorted_indices(counts):
+    result = list(range(len(counts)))
+    _ByDecreasingIndexCount(result, counts).sort()
+    return result
+
+
+def _format_count(count, total):
+    """The count followed by its share of the total in percent."""
+    per_mille = 0
+    if total > 0:
+        per_mille = count * 1000 // total
+    share = str(per_mille // 10) + "." + str(per_mille % 10) + "%"
+    count_str = str(count)
+    return (
+        " " * max(0, 12 - len(count_str))
+        + count_str
+        + " " * max(1, 8 - len(share))
+        + share
+    )
+
+
+ngram_profile = _NgramProfile()
+bytecode_histogram = _BytecodeHistogram()
@@ -76,14 +76,21 @@ class Bytecodes(object):
     jump_on_true_pop = jump_on_false_top_nil + 1
     jump_on_false_pop = jump_on_true_pop + 1
     jump_if_greater = jump_on_false_pop + 1
-    jump_backward = jump_if_greater + 1
+    jump_if_less = jump_if_greater + 1
+    # the nil jumps keep the value on the stack
+    jump_on_nil = jump_if_less + 1
+    jump_on_not_nil = jump_on_nil + 1
+    jump_backward = jump_on_not_nil + 1
     jump2 = jump_backward + 1
     jump2_on_true_top_nil = jump2 + 1
     jump2_on_false_top_nil = jump2_on_true_top_nil + 1
     jump2_on_true_pop = jump2_on_false_top_nil + 1
     jump2_on_false_pop = jump2_on_true_pop + 1
     jump2_if_greater = jump2_on_false_pop + 1
-    jump2_backward = jump2_if_greater + 1
+    jump2_if_less = jump2_if_greater + 1
+    jump2_on_nil = jump2_if_less + 1
+    jump2_on_not_nil = jump2_on_nil + 1
+    jump2_backward = jump2_on_not_nil + 1
 
     q_super_send_1 = jump2_backward + 1
     q_super_send_2 = q_super_send_1 + 1
@@ -97,7 +104,18 @@ class Bytecodes(object):
     pop_argument = pop_local + 1
     nil_local = pop_argument + 1
 
-    invalid = nil_local + 1
+    # superinstructions, see SUPERINSTRUCTIONS
+    push_constant_send_2 = nil_local + 1
+    push_constant_0_send_2 = push_constant_send_2 + 1
+    push_constant_1_send_2 = push_constant_0_send_2 + 1
+    push_constant_2_send_2 = push_constant_1_send_2 + 1
+    push_0_send_2 = push_constant_2_send_2 + 1
+    push_1_send_2 = push_0_send_2 + 1
+    push_field_0_send_1 = push_1_send_2 + 1
+    push_field_1_send_1 = push_field_0_send_1 + 1
+    push_global_send_1 = push_field_1_send_1 + 1
+
+    invalid = push_global_send_1 + 1
 
 
 def is_one_of(bytecode, candidates):
@@ -148,6 +166,9 @@ JUMP_BYTECODES = [
     Bytecodes.jump_on_false_pop,
     Bytecodes.jump_on_false_top_nil,
     Bytecodes.jump_if_greater,
+    Bytecodes.jump_if_less,
+    Bytecodes.jump_on_nil,
+    Bytecodes.jump_on_not_nil,
     Bytecodes.jump_backward,
     Bytecodes.jump2,
     Bytecodes.jump2_on_true_top_nil,
@@ -155,6 +176,9 @@ JUMP_BYTECODES = [
     Bytecodes.jump2_on_false_pop,
     Bytecodes.jump2_on_false_top_nil,
     Bytecodes.jump2_if_greater,
+    Bytecodes.jump2_if_less,
+    Bytecodes.jump2_on_nil,
+    Bytecodes.jump2_on_not_nil,
     Bytecodes.jump2_backward,
 ]
 
@@ -185,6 +209,29 @@ RUN_TIME_ONLY_BYTECODES = [
     Bytecodes.q_super_send_n,
 ]
 
+# bytecodes that get an entry in the call-site table of a method,
+# which holds their inline caches, receiver types, and tier-up counters
+CALL_SITE_BYTECODES = [
+    Bytecodes.send_1,
+    Bytecodes.send_2,
+    Bytecodes.send_3,
+    Bytecodes.send_4,
+    Bytecodes.send_n,
+    Bytecodes.super_send,
+    Bytecodes.q_super_send_1,
+    Bytecodes.q_super_send_2,
+    Bytecodes.q_super_send_3,
+    Bytecodes.q_super_send_4,
+    Bytecodes.q_super_send_n,
+    Bytecodes.return_local,
+    Bytecodes.return_non_local,
+    Bytecodes.jump_if_greater,
+    Bytecodes.jump_if_less,
+    Bytecodes.jump_backward,
+    Bytecodes.jump2,
+    Bytecodes.jump2_backward,
+]
+
 NOT_EXPECTED_IN_BLOCK_BYTECODES = [
     Bytecodes.halt,
     Bytecodes.push_field_0,
@@ -250,6 +297,9 @@ _BYTECODE_LENGTH = [
     3,  # jump_on_true_pop
     3,  # jump_on_false_pop
     3,  # jump_if_greater
+    3,  # jump_if_less
+    3,  # jump_on_nil
+    3,  # jump_on_not_nil
     3,  # jump_backward
     3,  # jump2
     3,  # jump2_on_true_top_nil
@@ -257,6 +307,9 @@ _BYTECODE_LENGTH = [
     3,  # jump2_on_true_pop
     3,  # jump2_on_false_pop
     3,  # jump2_if_greater
+    3,  # jump2_if_less
+    3,  # jump2_on_nil
+    3,  # jump2_on_not_nil
     3,  # jump2_backward
     2,  # q_super_send_1
     2,  # q_super_send_2
@@ -269,6 +322,16 @@ _BYTECODE_LENGTH = [
     3,  # pop_local
     3,  # pop_argument
     2,  # nil_local
+    # superinstructions, as long as the bytecodes they fuse
+    4,  # push_constant_send_2
+    3,  # push_constant_0_send_2
+    3,  # push_constant_1_send_2
+    3,  # push_constant_2_send_2
+    3,  # push_0_send_2
+    3,  # push_1_send_2
+    3,  # push_field_0_send_1
+    3,  # push_field_1_send_1
+    4,  # push_global_send_1
 ]
 
 # chose a unreasonable number to be recognizable
@@ -330,6 +393,9 @@ _BYTECODE_STACK_EFFECT = [
     -1,  # jump_on_true_pop
     -1,  # jump_on_false_pop
     0,  # jump_if_greater
+    0,  # jump_if_less
+    0,  # jump_on_nil
+    0,  # jump_on_not_nil
     0,  # jump_backward
     0,  # jump2
     0,  # jump2_on_true_top_nil
@@ -337,6 +403,9 @@ _BYTECODE_STACK_EFFECT = [
     -1,  # jump2_on_true_pop
     -1,  # jump2_on_false_pop
     0,  # jump2_if_greater
+    0,  # jump2_if_less
+    0,  # jump2_on_nil
+    0,  # jump2_on_not_nil
     0,  # jump2_backward
     _STACK_EFFECT_DEPENDS_ON_MESSAGE,  # q_super_send_1
     _STACK_EFFECT_DEPENDS_ON_MESSAGE,  # q_super_send_2
@@ -348,9 +417,80 @@ _BYTECODE_STACK_EFFECT = [
     -1,  # pop_local
     -1,  # pop_argument
     0,  # nil_local
+    # superinstructions are only created after the stack depth is computed
+    1,  # push_constant_send_2
+    1,  # push_constant_0_send_2
+    1,  # push_constant_1_send_2
+    1,  # push_constant_2_send_2
+    1,  # push_0_send_2
+    1,  # push_1_send_2
+    1,  # push_field_0_send_1
+    1,  # push_field_1_send_1
+    1,  # push_global_send_1
 ]
 
 
+# A superinstruction fuses a bytecode with the one following it. Only the
+# first bytecode is replaced, its operands and the following bytecode stay
+# in place. Thus, jumps into the fused sequence, call sites, and the JIT,
+# which executes only the first bytecode of a superinstruction, still work.
+#
+# The pairs were picked by hand, not from a recorded profile. They are the
+# sequences the compiler emits for binary sends with a literal argument,
+# as in `i + 1` or `n < 0`, and for unary sends to a field or global. Both
+# are common in loop conditions and counters. The pairs are also limited to
+# bytecodes that are final at compile time, so push_local and push_argument,
+# which are rewritten on first execution, cannot be fused yet. To revisit
+# the list, record profiles with --bytecode-ngrams and rank the candidates
+# with scripts/select_superinstructions.py.
+SUPERINSTRUCTIONS = [
+    (Bytecodes.push_constant_send_2, Bytecodes.push_constant, Bytecodes.send_2),
+    (Bytecodes.push_constant_0_send_2, Bytecodes.push_constant_0, Bytecodes.send_2),
+    (Bytecodes.push_constant_1_send_2, Bytecodes.push_constant_1, Bytecodes.send_2),
+    (Bytecodes.push_constant_2_send_2, Bytecodes.push_constant_2, Bytecodes.send_2),
+    (Bytecodes.push_0_send_2, Bytecodes.push_0, Bytecodes.send_2),
+    (Bytecodes.push_1_send_2, Bytecodes.push_1, Bytecodes.send_2),
+    (Bytecodes.push_field_0_send_1, Bytecodes.push_field_0, Bytecodes.send_1),
+    (Bytecodes.push_field_1_send_1, Bytecodes.push_field_1, Bytecodes.send_1),
+    (Bytecodes.push_global_send_1, Bytecodes.push_global, Bytecodes.send_1),
+]
+
+FIRST_SUPERINSTRUCTION = Bytecodes.push_constant_send_2
+
+
+def _first_bytecodes_of_superinstructions():
+    "NOT_RPYTHON"
+    result = [0] * (Bytecodes.invalid - FIRST_SUPERINSTRUCTION)
+    for fused, first, second in SUPERINSTRUCTIONS:
+        assert _BYTECODE_LENGTH[fused] == (
+            _BYTECODE_LENGTH[first] + _BYTECODE_LENGTH[second]
+        )
+        result[fused - FIRST_SUPERINSTRUCTION] = first
+    return result
+
+
+_FIRST_BYTECODES = _first_bytecodes_of_superinstructions()
+
+
+def is_superinstruction(bytecode):
+    return FIRST_SUPERINSTRUCTION <= bytecode < Bytecodes.invalid
+
+
+@jit.elidable
+def first_bytecode_of(bytecode):
+    """Return the first bytecode of a superinstruction, or the bytecode."""
+    if is_superinstruction(bytecode):
+        return _FIRST_BYTECODES[bytecode - FIRST_SUPERINSTRUCTION]
+    return bytecode
+
+
+def superinstruction_for(first, second):
+    for fused, fused_first, fused_second in SUPERINSTRUCTIONS:
+        if fused_first == first and fused_second == second:
+            return fused
+    return Bytecodes.invalid
+
+
 @jit.elidable
 def bytecode_length(bytecode):
     assert 0 <= bytecode < len(_BYTECODE_LENGTH)
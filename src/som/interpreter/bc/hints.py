@@ -13,7 +13,7 @@ def enable_shallow_tracing(func):
             return
         return func(*args)
 
-    shallow_hanlder.func_name = "handler_" + func.func_name
+    shallow_hanlder.__name__ = "handler_" + func.__name__
 
     @always_inline
     def call_handler(*args):
@@ -46,7 +46,7 @@ def enable_shallow_tracing_argn(argn):
                 return args[argn]
             return func(*args)
 
-        shallow_hanlder.func_name = "handler_" + func.func_name
+        shallow_hanlder.__name__ = "handler_" + func.__name__
 
         @always_inline
         def call_handler(*args):
@@ -77,7 +77,7 @@ def enable_shallow_tracing_with_value(value):
                 return value
             return func(*args)
 
-        shallow_hanlder.func_name = "handler_" + func.func_name
+        shallow_hanlder.__name__ = "handler_" + func.__name__
 
         @always_inline
         def call_handler(*args):
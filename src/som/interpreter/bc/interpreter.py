@@ -15,7 +15,9 @@ from som.interpreter.bc.frame import (
     get_block_at,
     get_self_dynamically,
 )
-from som.interpreter.bc.tier_shifting import ContinueInTier1, ContinueInTier2
+from som.interpreter.bc.jit_event_log import jit_event_log
+from som.interpreter.bc.sample_profile import TIER_1, TIER_2, sample_profiler
+from som.interpreter.bc.tier_shifting import ContinueInTier1, ContinueInTier2, tier_manager
 from som.interpreter.bc.traverse_stack import t_empty, t_dump, t_push
 from som.interpreter.control_flow import ReturnException
 from som.interpreter.send import lookup_and_send_2, lookup_and_send_3, lookup_and_send_2_tier2, lookup_and_send_3_tier2
@@ -46,44 +48,113 @@ def interpret(method, frame, max_stack_size, dummy=False):
     In the whle loop we can define the rule to shift the compilation timer.
     Movement from interpreter to interpreter is implemented using exceptions.
     """
-    from som.interpreter.bc.interpreter_tier1 import interpret_tier1
-    from som.interpreter.bc.interpreter_tier2 import interpret_tier2
-
     if dummy:
         return
 
+    if sample_profiler.enabled:
+        sample_profiler.enter(method, TIER_2 if is_tier2() else TIER_1)
+        try:
+            return _interpret(method, frame, max_stack_size)
+        finally:
+            sample_profiler.leave()
+    return _interpret(method, frame, max_stack_size)
+
+
+def _interpret(method, frame, max_stack_size):
+    from som.interpreter.bc.interpreter_tier1 import interpret_tier1_in_region
+    from som.interpreter.bc.interpreter_tier2 import interpret_tier2
+
     if is_tier1():
-        w_result = interpret_tier1(method, frame, max_stack_size)
+        w_result = interpret_tier1_in_region(method, frame, max_stack_size)
         return w_result
     elif is_tier2():
         result = interpret_tier2(method, frame, max_stack_size)
         return result
     elif is_hybrid():
-        current_bc_idx = 0
-        while True:
-            try:
-                w_result = interpret_tier1(
+        return _interpret_hybrid(method, frame, max_stack_size, False)
+    else:
+        assert False, "unreached tier"
+
+
+def interpret_in_tier2(method, frame, max_stack_size):
+    """
+    Used for activations started from tier-2 code. In hybrid mode, a
+    demoted method goes back to tier 1 instead.
+    """
+    if sample_profiler.enabled:
+        sample_profiler.enter(method, TIER_2)
+        try:
+            return _interpret_in_tier2(method, frame, max_stack_size)
+        finally:
+            sample_profiler.leave()
+    return _interpret_in_tier2(method, frame, max_stack_size)
+
+
+def _interpret_in_tier2(method, frame, max_stack_size):
+    from som.interpreter.bc.interpreter_tier2 import interpret_tier2
+
+    if is_hybrid():
+        return _interpret_hybrid(
+            method, frame, max_stack_size, not tier_manager.is_demoted(method)
+        )
+    return interpret_tier2(method, frame, max_stack_size)
+
+
+@jit.unroll_safe
+def _interpret_hybrid(method, frame, max_stack_size, in_tier2):
+    from som.interpreter.bc.interpreter_tier1 import (
+        interpret_tier1,
+        interpret_tier1_in_region,
+        stack_from_items,
+    )
+    from som.interpreter.bc.interpreter_tier2 import interpret_tier2
+
+    current_bc_idx = 0
+    stack = None
+    items = None
+    stack_ptr = -1
+    while True:
+        try:
+            if in_tier2:
+                return interpret_tier2(
+                    method, frame, max_stack_size, current_bc_idx, items, stack_ptr
+                )
+            if stack is None:
+                return interpret_tier1_in_region(
                     method, frame, max_stack_size, current_bc_idx
                 )
-                return w_result
-            except ContinueInTier2 as e:
-                assert e.method is not None
-                method = e.method
-                frame = e.frame
-                stack = e.stack
-                current_bc_idx = e.bytecode_index
-
-            w_result = interpret_tier2(
-                method,
-                frame,
-                max_stack_size,
-                current_bc_idx,
-                stack.items,
-                stack.stack_ptr,
-            )
-            return w_result
+            return interpret_tier1(method, frame, max_stack_size, current_bc_idx, stack)
+        except ContinueInTier2 as e:
+            assert e.method is not None
+            method = e.method
+            frame = e.frame
+            current_bc_idx = e.bytecode_index
+            items = e.stack.items
+            stack_ptr = e.stack.stack_ptr
+            tier_manager.promote(method)
+            in_tier2 = True
+            if jit_event_log.enabled:
+                _log_tier_shift(TIER_2, method, current_bc_idx)
+        except ContinueInTier1 as e:
+            method = e.method
+            frame = e.frame
+            current_bc_idx = e.bytecode_index
+            stack = stack_from_items(e.items, e.stack_ptr)
+            in_tier2 = False
+            if jit_event_log.enabled:
+                _log_tier_shift(TIER_1, method, current_bc_idx)
+
+
+@jit.dont_look_inside
+def _log_tier_shift(to_tier, method, bc_idx):
+    from som.interpreter.bc.interpreter_tier1 import get_printable_location_tier1
+    from som.interpreter.bc.interpreter_tier2 import get_printable_location_tier2
+
+    if to_tier == TIER_2:
+        greenkey = get_printable_location_tier2(bc_idx, method)
     else:
-        assert False, "unreached tier"
+        greenkey = get_printable_location_tier1(bc_idx, bc_idx, method, t_empty())
+    jit_event_log.log_tier_shift(to_tier, greenkey)
 
 
 def jitpolicy(_driver):
@@ -10,11 +10,19 @@ from som.interpreter.ast.frame import (
     mark_as_no_longer_on_stack,
 )
 from som.interpreter.bc.frame import create_frame_3, create_frame_4, create_frame, stack_pop_old_arguments_and_push_result_dli
-from som.interpreter.bc.bytecodes import bytecode_length, Bytecodes, bytecode_as_str
+from som.interpreter.bc.bytecodes import bytecode_length, Bytecodes, bytecode_as_str, first_bytecode_of
+from som.interpreter.bc.bytecode_profile import bytecode_histogram, ngram_profile
+from som.interpreter.bc.sample_profile import TIER_1, sample_profiler
 from som.interpreter.bc.frame import (
     get_block_at,
     get_self_dynamically,
 )
+from som.interpreter.bc.stack import (
+    Stack,
+    detach_stack,
+    stack_from_items,
+    stack_region,
+)
 from som.interpreter.bc.traverse_stack import t_empty, t_dump, t_push
 from som.interpreter.bc.hints import (
     enable_shallow_tracing,
@@ -41,56 +49,33 @@ from rlib.jit import (
 )
 
 
-TRACE_THRESHOLD = tier_manager.get_threshold()
+def interpret_tier1_in_region(
+    method, frame, max_stack_size, current_bc_idx=0, dummy=False
+):
+    """Start a tier-1 activation on a stack carved out of the stack region."""
+    if dummy:
+        return None
+
+    stack = stack_region.carve(max_stack_size)
+    try:
+        return interpret_tier1(method, frame, max_stack_size, current_bc_idx, stack)
+    except ContinueInTier2 as e:
+        if e.stack is stack:
+            e.stack = detach_stack(stack)
+        raise
+    finally:
+        stack_region.release(stack)
+
 
+@dont_look_inside
+def _carve_stack(invokable):
+    return stack_region.carve(invokable.get_maximum_number_of_stack_elements())
 
-class Stack(object):
-    def __init__(self, max_stack_size):
-        self.items = [None] * max_stack_size
-        self.stack_ptr = -1
 
-    @enable_shallow_tracing
-    def push(self, w_x):
-        self.stack_ptr += 1
-        assert self.stack_ptr < len(self.items)
-        self.items[self.stack_ptr] = w_x
+@dont_look_inside
+def _release_stack(stack):
+    stack_region.release(stack)
 
-    @dont_look_inside
-    def pop(self, dummy=False):
-        if dummy:
-            return self.items[self.stack_ptr]
-        w_x = self.items[self.stack_ptr]
-        if we_are_jitted():
-            self.items[self.stack_ptr] = None
-        self.stack_ptr -= 1
-        return w_x
-
-    @dont_look_inside
-    def top(self, dummy=False):
-        if dummy:
-            return self.items[self.stack_ptr]
-        return self.items[self.stack_ptr]
-
-    @dont_look_inside
-    def take(self, n, dummy=False):
-        if dummy:
-            return self.items[self.stack_ptr]
-        return self.items[self.stack_ptr - n]
-
-    @dont_look_inside
-    def insert(self, n, w_x, dummy=False):
-        if dummy:
-            return
-        assert n <= self.stack_ptr
-        self.items[self.stack_ptr - n] = w_x
-
-    @dont_look_inside
-    def dump(self):
-        s = "["
-        for w_v in self.items:
-            s += str(w_v) + ","
-        s += "]"
-        print s, self.stack_ptr
 
 @dont_look_inside
 def _halt(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=False):
@@ -359,7 +344,9 @@ def _pop_field_1(current_bc_idx, next_bc_idx,  method, frame, stack):
 def _interpret_naive(
     frame, stack, current_bc_idx, entry_bc_idx, method, tstack, dummy=False
 ):
-    return interpret_tier1(method, frame, 8, dummy)
+    return interpret_tier1_in_region(
+        method, frame, method.get_maximum_number_of_stack_elements(), dummy=dummy
+    )
 
 
 @jit.call_assembler
@@ -368,14 +355,22 @@ def call_assembler(
 ):
     # if dummy:
     #     return
-    return interpret_tier1(method, frame, 8, dummy=dummy)
+    if stack is None:
+        return interpret_tier1_in_region(
+            method, frame, method.get_maximum_number_of_stack_elements(), dummy=dummy
+        )
+    return interpret_tier1(
+        method, frame, method.get_maximum_number_of_stack_elements(), 0, stack, dummy
+    )
 
 
 @enable_shallow_tracing
 def _interpret_nlr_CALL_ASSEMBLER(
     frame, stack, current_bc_idx, entry_bc_idx, invokable, tstack, dummy=False
 ):
-    return _interp_with_nlr(invokable, frame, 8, dummy)
+    return _interp_with_nlr(
+        invokable, frame, invokable.get_maximum_number_of_stack_elements(), dummy
+    )
 
 
 @enable_shallow_tracing_argn(1)
@@ -810,6 +805,46 @@ def _is_greater_two(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=Fa
     return result
 
 
+@jit.dont_look_inside
+def _is_less_two(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=False):
+    if dummy:
+        return True
+    top = stack.top()
+    if isinstance(top, Integer):
+        top_val = top.get_embedded_integer()
+    elif isinstance(top, Double):
+        top_val = top.get_embedded_double()
+    else:
+        assert False, "top should be integer or double"
+
+    top_2 = stack.take(1)
+    if isinstance(top_2, Integer):
+        top_2_val = top_2.get_embedded_integer()
+    elif isinstance(top_2, Double):
+        top_2_val = top_2.get_embedded_double()
+    else:
+        assert False, "top_2 should be integer or double"
+    result = top_val < top_2_val
+    if result:
+        stack.pop()
+        stack.pop()
+    return result
+
+
+@jit.dont_look_inside
+def _is_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=False):
+    if dummy:
+        return True
+    return stack.top() is nilObject
+
+
+@jit.dont_look_inside
+def _is_not_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=False):
+    if dummy:
+        return True
+    return stack.top() is not nilObject
+
+
 @jit.dont_look_inside
 def in_fast_path(rcvr, rcvr_type, dummy=False):
     from som.vm.current import current_universe
@@ -825,7 +860,9 @@ def _interp_with_nlr(method, new_frame, max_stack_size, dummy=False):
     inner = get_inner_as_context(new_frame)
 
     try:
-        result = interpret(method, new_frame, max_stack_size, dummy)
+        result = interpret_tier1_in_region(
+            method, new_frame, max_stack_size, dummy=dummy
+        )
         mark_as_no_longer_on_stack(inner)
         return result
     except ReturnException as e:
@@ -882,6 +919,17 @@ def interpret_tier1(
         )
 
         bytecode = method.get_bytecode(current_bc_idx)
+        if we_are_jitted():
+            # compiled code executes superinstructions bytecode by bytecode,
+            # so that their sends keep the fast path
+            bytecode = first_bytecode_of(bytecode)
+        else:
+            if ngram_profile.enabled:
+                ngram_profile.record(method, current_bc_idx)
+            if sample_profiler.enabled:
+                sample_profiler.tick(current_bc_idx, TIER_1)
+        if bytecode_histogram.enabled:
+            bytecode_histogram.record(method, current_bc_idx, bytecode)
 
         # Get the length of the current bytecode
         bc_length = bytecode_length(bytecode)
@@ -1041,17 +1089,20 @@ def interpret_tier1(
                     if in_fast_path(rcvr, rcvr_type, dummy=True):
                         invokable = _lookup_invokable(rcvr_type, current_bc_idx, method)
                         new_frame = _create_frame_1(invokable, frame, stack)
-                        new_stack = Stack(16)
+                        new_stack = _carve_stack(invokable)
                         # turn this method invocation into direct call to compiled code
-                        result = call_assembler(
-                            frame=new_frame,
-                            stack=new_stack,
-                            current_bc_idx=0,
-                            entry_bc_idx=0,
-                            method=invokable,
-                            tstack=t_empty(),
-                            dummy=True,
-                        )
+                        try:
+                            result = call_assembler(
+                                frame=new_frame,
+                                stack=new_stack,
+                                current_bc_idx=0,
+                                entry_bc_idx=0,
+                                method=invokable,
+                                tstack=t_empty(),
+                                dummy=True,
+                            )
+                        finally:
+                            _release_stack(new_stack)
                         stack.insert(0, result, dummy=True)
                         # This path is a slow path, going this way when the rcvr type is
                         # different from when it is compiled
@@ -1090,16 +1141,19 @@ def interpret_tier1(
                     if in_fast_path(rcvr, rcvr_type, dummy=True):
                         invokable = _lookup_invokable(rcvr_type, current_bc_idx, method)
                         new_frame = _create_frame_2(invokable, frame, stack)
-                        new_stack = Stack(16)
-                        result = call_assembler(
-                            frame=new_frame,
-                            stack=new_stack,
-                            current_bc_idx=0,
-                            entry_bc_idx=0,
-                            method=invokable,
-                            tstack=t_empty(),
-                            dummy=True,
-                        )
+                        new_stack = _carve_stack(invokable)
+                        try:
+                            result = call_assembler(
+                                frame=new_frame,
+                                stack=new_stack,
+                                current_bc_idx=0,
+                                entry_bc_idx=0,
+                                method=invokable,
+                                tstack=t_empty(),
+                                dummy=True,
+                            )
+                        finally:
+                            _release_stack(new_stack)
                         stack.insert(0, result, dummy=True)
                         # ---------------------------------------------------------------
                         jit.begin_slow_path()
@@ -1137,16 +1191,19 @@ def interpret_tier1(
                     if in_fast_path(rcvr, rcvr_type, dummy=True):
                         invokable = _lookup_invokable(rcvr_type, current_bc_idx, method)
                         new_frame = _create_frame_3(invokable, frame, stack)
-                        new_stack = Stack(16)
-                        result = call_assembler(
-                            frame=new_frame,
-                            stack=new_stack,
-                            current_bc_idx=0,
-                            entry_bc_idx=0,
-                            method=invokable,
-                            tstack=t_empty(),
-                            dummy=True,
-                        )
+                        new_stack = _carve_stack(invokable)
+                        try:
+                            result = call_assembler(
+                                frame=new_frame,
+                                stack=new_stack,
+                                current_bc_idx=0,
+                                entry_bc_idx=0,
+                                method=invokable,
+                                tstack=t_empty(),
+                                dummy=True,
+                            )
+                        finally:
+                            _release_stack(new_stack)
                         stack.insert(0, result, dummy=True)
                         # ---------------------------------------------------------------
                         jit.begin_slow_path()
@@ -1184,16 +1241,19 @@ def interpret_tier1(
                     if in_fast_path(rcvr, rcvr_type, dummy=True):
                         invokable = _lookup_invokable(rcvr_type, current_bc_idx, method)
                         new_frame = _create_frame_4(invokable, frame, stack)
-                        new_stack = Stack(16)
-                        result = call_assembler(
-                            frame=new_frame,
-                            stack=new_stack,
-                            current_bc_idx=0,
-                            entry_bc_idx=0,
-                            method=invokable,
-                            tstack=t_empty(),
-                            dummy=True,
-                        )
+                        new_stack = _carve_stack(invokable)
+                        try:
+                            result = call_assembler(
+                                frame=new_frame,
+                                stack=new_stack,
+                                current_bc_idx=0,
+                                entry_bc_idx=0,
+                                method=invokable,
+                                tstack=t_empty(),
+                                dummy=True,
+                            )
+                        finally:
+                            _release_stack(new_stack)
                         stack.insert(0, result, dummy=True)
                         # ---------------------------------------------------------------
                         jit.begin_slow_path()
@@ -1217,14 +1277,14 @@ def interpret_tier1(
 
         elif bytecode == Bytecodes.send_n:
             if is_hybrid():
-                if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
+                if method.get_count(current_bc_idx) > tier_manager.send_threshold(method) and tstack.t_is_empty():
                     raise ContinueInTier2(method, frame, stack, current_bc_idx)
                 method.incr_count(current_bc_idx)
             next_bc_idx = _send_n(current_bc_idx, next_bc_idx,  method, frame, stack)
 
         elif bytecode == Bytecodes.super_send:
             if is_hybrid():
-                if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
+                if method.get_count(current_bc_idx) > tier_manager.send_threshold(method) and tstack.t_is_empty():
                     raise ContinueInTier2(method, frame, stack, current_bc_idx)
                 method.incr_count(current_bc_idx)
             _do_super_send(current_bc_idx, next_bc_idx,  method, frame, stack)
@@ -1251,7 +1311,7 @@ def interpret_tier1(
                     jit.emit_ret(ret_object)
             else:
                 if is_hybrid():
-                    if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
+                    if method.get_count(current_bc_idx) > tier_manager.return_threshold(method) and tstack.t_is_empty():
                         raise ContinueInTier2(method, frame, stack, current_bc_idx)
                     method.incr_count(current_bc_idx)
 
@@ -1293,7 +1353,7 @@ def interpret_tier1(
                     jit.emit_ret(ret_object)
             else:
                 if is_hybrid():
-                    if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
+                    if method.get_count(current_bc_idx) > tier_manager.return_threshold(method) and tstack.t_is_empty():
                         raise ContinueInTier2(method, frame, stack, current_bc_idx)
                     method.incr_count(current_bc_idx)
 
@@ -1401,8 +1461,10 @@ def interpret_tier1(
             target_bc_idx = current_bc_idx - method.get_bytecode(current_bc_idx + 1)
 
             if is_hybrid():
-                if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
-                    raise ContinueInTier2(method, frame, stack, current_bc_idx)
+                # on-stack replacement: the loop is hot, continue in tier 2
+                # at the loop header with the current frame and stack
+                if method.get_count(current_bc_idx) > tier_manager.back_edge_threshold(method) and tstack.t_is_empty():
+                    raise ContinueInTier2(method, frame, stack, target_bc_idx)
                 method.incr_count(current_bc_idx)
 
             if we_are_jitted():
@@ -1444,16 +1506,60 @@ def interpret_tier1(
                     tstack = t_push(target_bc_idx, tstack)
             else:
                 if is_hybrid():
-                    if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
+                    if method.get_count(current_bc_idx) > tier_manager.back_edge_threshold(method) and tstack.t_is_empty():
                         raise ContinueInTier2(method, frame, stack, current_bc_idx)
                     method.incr_count(current_bc_idx)
 
                 if _is_greater_two(current_bc_idx, next_bc_idx,  method, frame, stack):
                     next_bc_idx = target_bc_idx
 
+        elif bytecode == Bytecodes.jump_if_less:
+            target_bc_idx = current_bc_idx + method.get_bytecode(current_bc_idx + 1)
+
+            if we_are_jitted():
+                if _is_less_two(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=True):
+                    tstack = t_push(next_bc_idx, tstack)
+                    next_bc_idx = target_bc_idx
+                else:
+                    tstack = t_push(target_bc_idx, tstack)
+            else:
+                if is_hybrid():
+                    if method.get_count(current_bc_idx) > tier_manager.back_edge_threshold(method) and tstack.t_is_empty():
+                        raise ContinueInTier2(method, frame, stack, current_bc_idx)
+                    method.incr_count(current_bc_idx)
+
+                if _is_less_two(current_bc_idx, next_bc_idx,  method, frame, stack):
+                    next_bc_idx = target_bc_idx
+
+        elif bytecode == Bytecodes.jump_on_nil:
+            target_bc_idx = current_bc_idx + method.get_bytecode(current_bc_idx + 1)
+
+            if we_are_jitted():
+                if _is_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=True):
+                    tstack = t_push(next_bc_idx, tstack)
+                    next_bc_idx = target_bc_idx
+                else:
+                    tstack = t_push(target_bc_idx, tstack)
+            else:
+                if _is_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack):
+                    next_bc_idx = target_bc_idx
+
+        elif bytecode == Bytecodes.jump_on_not_nil:
+            target_bc_idx = current_bc_idx + method.get_bytecode(current_bc_idx + 1)
+
+            if we_are_jitted():
+                if _is_not_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=True):
+                    tstack = t_push(next_bc_idx, tstack)
+                    next_bc_idx = target_bc_idx
+                else:
+                    tstack = t_push(target_bc_idx, tstack)
+            else:
+                if _is_not_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack):
+                    next_bc_idx = target_bc_idx
+
         elif bytecode == Bytecodes.jump2:
             if is_hybrid():
-                if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
+                if method.get_count(current_bc_idx) > tier_manager.back_edge_threshold(method) and tstack.t_is_empty():
                     raise ContinueInTier2(method, frame, stack, current_bc_idx)
                 method.incr_count(current_bc_idx)
             target_bc_idx = (
@@ -1548,6 +1654,54 @@ def interpret_tier1(
                 if _is_greater_two(current_bc_idx, next_bc_idx,  method, frame, stack):
                     next_bc_idx = target_bc_idx
 
+        elif bytecode == Bytecodes.jump2_if_less:
+            target_bc_idx = (
+                current_bc_idx
+                + method.get_bytecode(current_bc_idx + 1)
+                + (method.get_bytecode(current_bc_idx + 2) << 8)
+            )
+            if we_are_jitted():
+                if _is_less_two(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=True):
+                    tstack = t_push(next_bc_idx, tstack)
+                    next_bc_idx = target_bc_idx
+                else:
+                    tstack = t_push(target_bc_idx, tstack)
+            else:
+                if _is_less_two(current_bc_idx, next_bc_idx,  method, frame, stack):
+                    next_bc_idx = target_bc_idx
+
+        elif bytecode == Bytecodes.jump2_on_nil:
+            target_bc_idx = (
+                current_bc_idx
+                + method.get_bytecode(current_bc_idx + 1)
+                + (method.get_bytecode(current_bc_idx + 2) << 8)
+            )
+            if we_are_jitted():
+                if _is_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=True):
+                    tstack = t_push(next_bc_idx, tstack)
+                    next_bc_idx = target_bc_idx
+                else:
+                    tstack = t_push(target_bc_idx, tstack)
+            else:
+                if _is_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack):
+                    next_bc_idx = target_bc_idx
+
+        elif bytecode == Bytecodes.jump2_on_not_nil:
+            target_bc_idx = (
+                current_bc_idx
+                + method.get_bytecode(current_bc_idx + 1)
+                + (method.get_bytecode(current_bc_idx + 2) << 8)
+            )
+            if we_are_jitted():
+                if _is_not_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack, dummy=True):
+                    tstack = t_push(next_bc_idx, tstack)
+                    next_bc_idx = target_bc_idx
+                else:
+                    tstack = t_push(target_bc_idx, tstack)
+            else:
+                if _is_not_nil_object(current_bc_idx, next_bc_idx,  method, frame, stack):
+                    next_bc_idx = target_bc_idx
+
         elif bytecode == Bytecodes.jump2_backward:
             # TODO: instrument with tstack
             target_bc_idx = current_bc_idx - (
@@ -1556,8 +1710,10 @@ def interpret_tier1(
             )
 
             if is_hybrid():
-                if method._counts[current_bc_idx] > TRACE_THRESHOLD and tstack.t_is_empty():
-                    raise ContinueInTier2(method, frame, stack, current_bc_idx)
+                # on-stack replacement: the loop is hot, continue in tier 2
+                # at the loop header with the current frame and stack
+                if method.get_count(current_bc_idx) > tier_manager.back_edge_threshold(method) and tstack.t_is_empty():
+                    raise ContinueInTier2(method, frame, stack, target_bc_idx)
                 method.incr_count(current_bc_idx)
 
             if we_are_jitted():
@@ -1608,6 +1764,62 @@ def interpret_tier1(
             method.patch_variable_access(current_bc_idx)
             next_bc_idx = current_bc_idx
 
+        # superinstructions execute their bytecodes in sequence,
+        # with the second one at its original index
+        elif bytecode == Bytecodes.push_constant_send_2:
+            _push_constant(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_2(
+                current_bc_idx + 2, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_constant_0_send_2:
+            _push_constant_0(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_2(
+                current_bc_idx + 1, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_constant_1_send_2:
+            _push_constant_1(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_2(
+                current_bc_idx + 1, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_constant_2_send_2:
+            _push_constant_2(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_2(
+                current_bc_idx + 1, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_0_send_2:
+            _push_0(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_2(
+                current_bc_idx + 1, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_1_send_2:
+            _push_1(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_2(
+                current_bc_idx + 1, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_field_0_send_1:
+            _push_field_0(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_1(
+                current_bc_idx + 1, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_field_1_send_1:
+            _push_field_1(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_1(
+                current_bc_idx + 1, next_bc_idx, method, frame, stack
+            )
+
+        elif bytecode == Bytecodes.push_global_send_1:
+            _push_global(current_bc_idx, next_bc_idx, method, frame, stack)
+            next_bc_idx = _send_1(
+                current_bc_idx + 2, next_bc_idx, method, frame, stack
+            )
+
         else:
             _unknown_bytecode(bytecode, current_bc_idx, method)
 
@@ -1662,38 +1874,14 @@ def get_self(frame, ctx_level):
 
 @elidable_promote("all")
 def _lookup(layout, selector, method, bytecode_index):
-    # First try of inline cache
-    cached_layout1 = method.get_inline_cache_layout(bytecode_index)
-    if cached_layout1 is layout:
-        invokable = method.get_inline_cache_invokable(bytecode_index)
-    elif cached_layout1 is None:
-        invokable = layout.lookup_invokable(selector)
-        method.set_inline_cache(bytecode_index, layout, invokable)
-    else:
-        # second try
-        # the bytecode index after the send is used by the selector constant,
-        # and can be used safely as another cache item
-        cached_layout2 = method.get_inline_cache_layout(bytecode_index + 1)
-        if cached_layout2 == layout:
-            invokable = method.get_inline_cache_invokable(bytecode_index + 1)
-        else:
-            invokable = layout.lookup_invokable(selector)
-            if cached_layout2 is None:
-                method.set_inline_cache(bytecode_index + 1, layout, invokable)
-    return invokable
+    return method.lookup_with_inline_cache(layout, selector, bytecode_index)
 
 
 def _update_object_and_invalidate_old_caches(obj, method, bytecode_index, universe):
     obj.update_layout_to_match_class()
     obj.get_object_layout(universe)
 
-    cached_layout1 = method.get_inline_cache_layout(bytecode_index)
-    if cached_layout1 is not None and not cached_layout1.is_latest:
-        method.set_inline_cache(bytecode_index, None, None)
-
-    cached_layout2 = method.get_inline_cache_layout(bytecode_index + 1)
-    if cached_layout2 is not None and not cached_layout2.is_latest:
-        method.set_inline_cache(bytecode_index + 1, None, None)
+    method.invalidate_outdated_inline_cache_entries(bytecode_index)
 
 
 @enable_shallow_tracing
@@ -1810,5 +1998,12 @@ tier1jitdriver = jit.JitDriver(
     get_printable_location=get_printable_location_tier1,
     should_unroll_one_iteration=lambda current_bc_idx, entry_bc_idx, method, tstack: True,
     threaded_code_gen=True,
-    conditions=["_is_true_object", "_is_false_object", "_is_greater_two"],
+    conditions=[
+        "_is_true_object",
+        "_is_false_object",
+        "_is_greater_two",
+        "_is_less_two",
+        "_is_nil_object",
+        "_is_not_nil_object",
+    ],
 )
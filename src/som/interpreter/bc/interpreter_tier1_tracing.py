@@ -15,16 +15,17 @@ from som.interpreter.bc.frame import (
     get_block_at,
     get_self_dynamically,
 )
+from som.interpreter.bc.bytecode_profile import bytecode_histogram
 from som.interpreter.bc.traverse_stack import t_empty, t_dump, t_push
 from som.interpreter.bc.hints import (
     enable_shallow_tracing,
     enable_shallow_tracing_argn,
     enable_shallow_tracing_with_value,
 )
-from som.interpreter.bc.tier_shifting import TRACE_THRESHOLD, ContinueInTier1, ContinueInTier2
+from som.interpreter.bc.tier_shifting import ContinueInTier1, ContinueInTier2, tier_manager
 from som.interpreter.control_flow import ReturnException
 from som.interpreter.send import lookup_and_send_2, lookup_and_send_3, lookup_and_send_2_tier2, lookup_and_send_3_tier2
-from som.tier_type import is_hybrid, is_tier1, is_tier2, tier_manager
+from som.tier_type import is_hybrid, is_tier1, is_tier2
 from som.vm.globals import nilObject, trueObject, falseObject
 from som.vmobjects.array import Array
 from som.vmobjects.block_bc import BcBlock
@@ -863,6 +864,8 @@ def interpret_tier1(
         )
 
         bytecode = method.get_bytecode(current_bc_idx)
+        if bytecode_histogram.enabled:
+            bytecode_histogram.record(method, current_bc_idx, bytecode)
 
         # Get the length of the current bytecode
         bc_length = bytecode_length(bytecode)
@@ -1312,7 +1315,7 @@ def interpret_tier1(
             target_bc_idx = current_bc_idx - method.get_bytecode(current_bc_idx + 1)
 
             if is_hybrid():
-                if method._counts[current_bc_idx] > TRACE_THRESHOLD:
+                if method.get_count(current_bc_idx) > tier_manager.back_edge_threshold(method):
                     raise ContinueInTier2(method, frame, stack, current_bc_idx)
                 method.incr_count(current_bc_idx)
 
@@ -1428,7 +1431,7 @@ def interpret_tier1(
             )
 
             if is_hybrid():
-                if method._counts[current_bc_idx] > TRACE_THRESHOLD:
+                if method.get_count(current_bc_idx) > tier_manager.back_edge_threshold(method):
                     raise ContinueInTier2(method, frame, stack, current_bc_idx)
                 method.incr_count(current_bc_idx)
 
@@ -1526,38 +1529,14 @@ def get_self(frame, ctx_level):
 
 @elidable_promote("all")
 def _lookup(layout, selector, method, bytecode_index):
-    # First try of inline cache
-    cached_layout1 = method.get_inline_cache_layout(bytecode_index)
-    if cached_layout1 is layout:
-        invokable = method.get_inline_cache_invokable(bytecode_index)
-    elif cached_layout1 is None:
-        invokable = layout.lookup_invokable(selector)
-        method.set_inline_cache(bytecode_index, layout, invokable)
-    else:
-        # second try
-        # the bytecode index after the send is used by the selector constant,
-        # and can be used safely as another cache item
-        cached_layout2 = method.get_inline_cache_layout(bytecode_index + 1)
-        if cached_layout2 == layout:
-            invokable = method.get_inline_cache_invokable(bytecode_index + 1)
-        else:
-            invokable = layout.lookup_invokable(selector)
-            if cached_layout2 is None:
-                method.set_inline_cache(bytecode_index + 1, layout, invokable)
-    return invokable
+    return method.lookup_with_inline_cache(layout, selector, bytecode_index)
 
 
 def _update_object_and_invalidate_old_caches(obj, method, bytecode_index, universe):
     obj.update_layout_to_match_class()
     obj.get_object_layout(universe)
 
-    cached_layout1 = method.get_inline_cache_layout(bytecode_index)
-    if cached_layout1 is not None and not cached_layout1.is_latest:
-        method.set_inline_cache(bytecode_index, None, None)
-
-    cached_layout2 = method.get_inline_cache_layout(bytecode_index + 1)
-    if cached_layout2 is not None and not cached_layout2.is_latest:
-        method.set_inline_cache(bytecode_index + 1, None, None)
+    method.invalidate_outdated_inline_cache_entries(bytecode_index)
 
 
 @enable_shallow_tracing
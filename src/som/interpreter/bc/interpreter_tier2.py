@@ -10,12 +10,14 @@ from som.interpreter.ast.frame import (
     mark_as_no_longer_on_stack,
 )
 from som.interpreter.bc.frame import create_frame_3, create_frame
-from som.interpreter.bc.bytecodes import bytecode_length, Bytecodes, bytecode_as_str
+from som.interpreter.bc.bytecodes import bytecode_length, Bytecodes, bytecode_as_str, first_bytecode_of
+from som.interpreter.bc.bytecode_profile import bytecode_histogram, ngram_profile
+from som.interpreter.bc.sample_profile import TIER_2, sample_profiler
 from som.interpreter.bc.frame import (
     get_block_at,
     get_self_dynamically,
 )
-from som.interpreter.bc.tier_shifting import ContinueInTier1, ContinueInTier2
+from som.interpreter.bc.tier_shifting import ContinueInTier1, ContinueInTier2, tier_manager
 from som.interpreter.bc.traverse_stack import t_empty, t_dump, t_push
 from som.interpreter.control_flow import ReturnException
 from som.interpreter.send import lookup_and_send_2, lookup_and_send_3, lookup_and_send_2_tier2, lookup_and_send_3_tier2
@@ -99,7 +101,16 @@ def interpret_tier2(
             stack=stack,
         )
 
-        bytecode = method.get_bytecode(current_bc_idx)
+        # the tracing JIT removes the dispatch overhead superinstructions
+        # save, so tier 2 executes them bytecode by bytecode
+        bytecode = first_bytecode_of(method.get_bytecode(current_bc_idx))
+        if bytecode_histogram.enabled:
+            bytecode_histogram.record(method, current_bc_idx, bytecode)
+        if not we_are_jitted():
+            if ngram_profile.enabled:
+                ngram_profile.record(method, current_bc_idx)
+            if sample_profiler.enabled:
+                sample_profiler.tick(current_bc_idx, TIER_2)
 
         # Get the length of the current bytecode
         bc_length = bytecode_length(bytecode)
@@ -553,8 +564,27 @@ def interpret_tier2(
                 stack_ptr -= 2
                 next_bc_idx = current_bc_idx + method.get_bytecode(current_bc_idx + 1)
 
+        elif bytecode == Bytecodes.jump_if_less:
+            top = stack[stack_ptr]
+            top_2 = stack[stack_ptr - 1]
+            if top.get_embedded_integer() < top_2.get_embedded_integer():
+                stack[stack_ptr] = None
+                stack[stack_ptr - 1] = None
+                stack_ptr -= 2
+                next_bc_idx = current_bc_idx + method.get_bytecode(current_bc_idx + 1)
+
+        elif bytecode == Bytecodes.jump_on_nil:
+            if stack[stack_ptr] is nilObject:
+                next_bc_idx = current_bc_idx + method.get_bytecode(current_bc_idx + 1)
+
+        elif bytecode == Bytecodes.jump_on_not_nil:
+            if stack[stack_ptr] is not nilObject:
+                next_bc_idx = current_bc_idx + method.get_bytecode(current_bc_idx + 1)
+
         elif bytecode == Bytecodes.jump_backward:
             next_bc_idx = current_bc_idx - method.get_bytecode(current_bc_idx + 1)
+            if is_hybrid() and tier_manager.is_demoted(method):
+                raise ContinueInTier1(method, frame, stack, stack_ptr, next_bc_idx)
             jitdriver.can_enter_jit(
                 current_bc_idx=next_bc_idx,
                 stack_ptr=stack_ptr,
@@ -635,11 +665,42 @@ def interpret_tier2(
                     + (method.get_bytecode(current_bc_idx + 2) << 8)
                 )
 
+        elif bytecode == Bytecodes.jump2_if_less:
+            top = stack[stack_ptr]
+            top_2 = stack[stack_ptr - 1]
+            if top.get_embedded_integer() < top_2.get_embedded_integer():
+                stack[stack_ptr] = None
+                stack[stack_ptr - 1] = None
+                stack_ptr -= 2
+                next_bc_idx = (
+                    current_bc_idx
+                    + method.get_bytecode(current_bc_idx + 1)
+                    + (method.get_bytecode(current_bc_idx + 2) << 8)
+                )
+
+        elif bytecode == Bytecodes.jump2_on_nil:
+            if stack[stack_ptr] is nilObject:
+                next_bc_idx = (
+                    current_bc_idx
+                    + method.get_bytecode(current_bc_idx + 1)
+                    + (method.get_bytecode(current_bc_idx + 2) << 8)
+                )
+
+        elif bytecode == Bytecodes.jump2_on_not_nil:
+            if stack[stack_ptr] is not nilObject:
+                next_bc_idx = (
+                    current_bc_idx
+                    + method.get_bytecode(current_bc_idx + 1)
+                    + (method.get_bytecode(current_bc_idx + 2) << 8)
+                )
+
         elif bytecode == Bytecodes.jump2_backward:
             next_bc_idx = current_bc_idx - (
                 method.get_bytecode(current_bc_idx + 1)
                 + (method.get_bytecode(current_bc_idx + 2) << 8)
             )
+            if is_hybrid() and tier_manager.is_demoted(method):
+                raise ContinueInTier1(method, frame, stack, stack_ptr, next_bc_idx)
             jitdriver.can_enter_jit(
                 current_bc_idx=next_bc_idx,
                 stack_ptr=stack_ptr,
@@ -773,38 +834,14 @@ def get_self(frame, ctx_level):
 
 @elidable_promote("all")
 def _lookup(layout, selector, method, bytecode_index):
-    # First try of inline cache
-    cached_layout1 = method.get_inline_cache_layout(bytecode_index)
-    if cached_layout1 is layout:
-        invokable = method.get_inline_cache_invokable(bytecode_index)
-    elif cached_layout1 is None:
-        invokable = layout.lookup_invokable(selector)
-        method.set_inline_cache(bytecode_index, layout, invokable)
-    else:
-        # second try
-        # the bytecode index after the send is used by the selector constant,
-        # and can be used safely as another cache item
-        cached_layout2 = method.get_inline_cache_layout(bytecode_index + 1)
-        if cached_layout2 == layout:
-            invokable = method.get_inline_cache_invokable(bytecode_index + 1)
-        else:
-            invokable = layout.lookup_invokable(selector)
-            if cached_layout2 is None:
-                method.set_inline_cache(bytecode_index + 1, layout, invokable)
-    return invokable
+    return method.lookup_with_inline_cache(layout, selector, bytecode_index)
 
 
 def _update_object_and_invalidate_old_caches(obj, method, bytecode_index, universe):
     obj.update_layout_to_match_class()
     obj.get_object_layout(universe)
 
-    cached_layout1 = method.get_inline_cache_layout(bytecode_index)
-    if cached_layout1 is not None and not cached_layout1.is_latest:
-        method.set_inline_cache(bytecode_index, None, None)
-
-    cached_layout2 = method.get_inline_cache_layout(bytecode_index + 1)
-    if cached_layout2 is not None and not cached_layout2.is_latest:
-        method.set_inline_cache(bytecode_index + 1, None, None)
+    method.invalidate_outdated_inline_cache_entries(bytecode_index)
 
 
 def _send_does_not_understand_tier2(receiver, selector, stack, stack_ptr):
@@ -0,0 +1,103 @@
+import time
+
+from rlib.streamio import open_file_as_stream
+
+EVENT_LOOP = "loop"
+EVENT_BRIDGE = "bridge"
+EVENT_ABORT = "abort"
+EVENT_TIER_SHIFT = "tier_shift"
+
+
+class _JitEventLog(object):
+    """Writes compilations, aborts, bridges, and tier shifts as JSON lines.
+
+    Each record has the event, the time since the log was opened, the tier
+    of the jitdriver, and the green key as printed by the printable
+    location of the tier. Compilations add how long they took and the size
+    of the machine code. Lines are flushed as they are written, so the log
+    stays usable when the VM does not exit normally."""
+
+    _immutable_fields_ = ["enabled?"]
+
+    def __init__(self):
+        self.enabled = False
+        self._stream = None
+        self._start = 0.0
+        self._compile_start = 0.0
+
+    def open(self, file_name):
+        self._stream = open_file_as_stream(file_name, "w")
+        self._start = time.time()
+        self.enabled = True
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self.enabled = False
+
+    def start_compile(self):
+        self._compile_start = time.time()
+
+    def log_compile(self, event, tier, greenkey, loop_id, num_ops, code_size):
+        duration = time.time() - self._compile_start
+        self._write(
+            event,
+            tier,
+            greenkey,
+            ', "loop_id": '
+            + str(loop_id)
+            + ', "duration_us": '
+            + _us(duration)
+            + ', "num_ops": '
+            + str(num_ops)
+            + ', "code_size": '
+            + str(code_size),
+        )
+
+    def log_abort(self, tier, greenkey, reason):
+        self._write(EVENT_ABORT, tier, greenkey, ', "reason": ' + json_string(reason))
+
+    def log_tier_shift(self, to_tier, greenkey):
+        self._write(EVENT_TIER_SHIFT, to_tier, greenkey, "")
+
+    def _write(self, event, tier, greenkey, fields):
+        if self._stream is None:
+            return
+        self._stream.write(
+            '{"event": "'
+            + event
+            + '", "time_us": '
+            + _us(time.time() - self._start)
+            + ', "tier": '
+            + str(tier)
+            + ', "greenkey": '
+            + json_string(greenkey)
+            + fields
+            + "}\n"
+        )
+        self._stream.flush()
+
+
+def json_string(value):
+    result = '"'
+    for c in value:
+        if c == '"' or c == "\\":
+            result += "\\" + c
+        elif c == "\n":
+            result += "\\n"
+        elif c == "\t":
+            result += "\\t"
+        elif ord(c) < 0x20:
+            code = hex(ord(c))[2:]
+            result += "\\u" + "0" * (4 - len(code)) + code
+        else:
+            result += c
+    return result + '"'
+
+
+def _us(seconds):
+    return str(int(seconds * 1000000.0))
+
+
+jit_event_log = _JitEventLog()
@@ -0,0 +1,114 @@
+import time
+
+from rlib import jit
+from rlib.streamio import open_file_as_stream
+
+TIER_1 = 1
+TIER_2 = 2
+
+# the clock is read only every so many safe points to keep ticks cheap
+_SAFE_POINTS_PER_CLOCK_CHECK = 256
+
+DEFAULT_INTERVAL = 0.001  # in seconds
+
+
+class _SampleProfiler(object):
+    """Samples the chain of active methods in regular time intervals.
+
+    The interpreters keep a shadow stack of the active methods, with the
+    bytecode index and tier each of them executed last. Method entries
+    and the bytecodes executed outside of compiled code are safe points,
+    where the profiler checks whether a sample is due. Compiled code does
+    not reach safe points. Its time goes to the stack it is found in at
+    the next safe point, weighted by the number of elapsed intervals.
+
+    The samples are written as collapsed stacks, one stack per line
+    followed by its number of samples, as flame graph tools expect them."""
+
+    _immutable_fields_ = ["enabled?"]
+
+    def __init__(self):
+        self.enabled = False
+        self._interval = DEFAULT_INTERVAL
+        self._methods = []
+        self._bc_idxs = []
+        self._tiers = []
+        self._depth = 0
+        self._countdown = _SAFE_POINTS_PER_CLOCK_CHECK
+        self._next_sample = 0.0
+        self._samples = {}
+
+    def enable(self, interval=DEFAULT_INTERVAL):
+        self.enabled = True
+        self._interval = interval
+        self._next_sample = time.time() + interval
+
+    @jit.dont_look_inside
+    def enter(self, method, tier):
+        if self._depth == len(self._methods):
+            self._methods.append(method)
+            self._bc_idxs.append(0)
+            self._tiers.append(tier)
+        else:
+            self._methods[self._depth] = method
+            self._bc_idxs[self._depth] = 0
+            self._tiers[self._depth] = tier
+        self._depth += 1
+        self._safe_point()
+
+    @jit.dont_look_inside
+    def leave(self):
+        self._depth -= 1
+        # do not keep the method alive
+        self._methods[self._depth] = None
+
+    def tick(self, bc_idx, tier):
+        if self._depth == 0:
+            return
+        self._bc_idxs[self._depth - 1] = bc_idx
+        self._tiers[self._depth - 1] = tier
+        self._safe_point()
+
+    def _safe_point(self):
+        self._countdown -= 1
+        if self._countdown > 0:
+            return
+        self._countdown = _SAFE_POINTS_PER_CLOCK_CHECK
+
+        now = time.time()
+        if now < self._next_sample:
+            return
+        num_samples = 1 + int((now - self._next_sample) / self._interval)
+        self._next_sample += num_samples * self._interval
+        self.record_sample(num_samples)
+
+    def record_sample(self, num_samples):
+        if self._depth == 0:
+            return
+        frames = []
+        for i in range(self._depth):
+            frames.append(
+                _frame_name(self._methods[i], self._bc_idxs[i], self._tiers[i])
+            )
+        stack = ";".join(frames)
+        self._samples[stack] = self._samples.get(stack, 0) + num_samples
+
+    def format(self):
+        result = ""
+        for stack, count in self._samples.items():
+            result += stack + " " + str(count) + "\n"
+        return result
+
+    def write(self, file_name):
+        stream = open_file_as_stream(file_name, "w")
+        try:
+            stream.write(self.format())
+        finally:
+            stream.close()
+
+
+def _frame_name(method, bc_idx, tier):
+    return method.merge_point_string() + "@" + str(bc_idx) + "[tier" + str(tier) + "]"
+
+
+sample_profiler = _SampleProfiler()
@@ -0,0 +1,143 @@
+import os
+
+from rlib.jit import dont_look_inside, we_are_jitted
+from som.interpreter.bc.hints import enable_shallow_tracing
+
+
+class Stack(object):
+    def __init__(self, max_stack_size):
+        self.items = [None] * max_stack_size
+        self.stack_ptr = -1
+
+        # the part of items that belongs to this stack, and for stacks
+        # carved out of the StackRegion, where the region continues on release
+        self.base = 0
+        self.limit = max_stack_size
+        self.chunk_idx = 0
+        self.depth = 0
+
+    @enable_shallow_tracing
+    def push(self, w_x):
+        self.stack_ptr += 1
+        assert self.stack_ptr < self.limit
+        self.items[self.stack_ptr] = w_x
+
+    @dont_look_inside
+    def pop(self, dummy=False):
+        if dummy:
+            return self.items[self.stack_ptr]
+        w_x = self.items[self.stack_ptr]
+        if we_are_jitted():
+            self.items[self.stack_ptr] = None
+        self.stack_ptr -= 1
+        return w_x
+
+    @dont_look_inside
+    def top(self, dummy=False):
+        if dummy:
+            return self.items[self.stack_ptr]
+        return self.items[self.stack_ptr]
+
+    @dont_look_inside
+    def take(self, n, dummy=False):
+        if dummy:
+            return self.items[self.stack_ptr]
+        return self.items[self.stack_ptr - n]
+
+    @dont_look_inside
+    def insert(self, n, w_x, dummy=False):
+        if dummy:
+            return
+        assert n <= self.stack_ptr
+        self.items[self.stack_ptr - n] = w_x
+
+    @dont_look_inside
+    def dump(self):
+        s = "["
+        for w_v in self.items[self.base : self.limit]:
+            s += str(w_v) + ","
+        s += "]"
+        os.write(1, s + " " + str(self.stack_ptr) + "\n")
+
+
+def stack_from_items(items, stack_ptr):
+    """Wrap the stack of a tier-2 activation, when continuing in tier 1"""
+    stack = Stack(0)
+    stack.items = items
+    stack.stack_ptr = stack_ptr
+    stack.limit = len(items)
+    return stack
+
+
+def detach_stack(stack):
+    """Copy a stack carved out of the StackRegion, so that it
+    stays valid after its part of the region was released."""
+    assert stack.base <= stack.limit
+    return stack_from_items(
+        stack.items[stack.base : stack.limit], stack.stack_ptr - stack.base
+    )
+
+
+class StackRegion(object):
+    """
+    The operand stacks of tier-1 activations.
+
+    Instead of allocating a Stack with a fresh items list for each
+    activation, the stack of a callee is carved out of a shared chunk
+    right above the stack of its caller, sized to the maximum stack
+    depth of the method, and released when the activation returns.
+    The Stack objects themselves are reused per call depth.
+    """
+
+    def __init__(self, chunk_size):
+        self._chunk_size = chunk_size
+        self._chunks = [[None] * chunk_size]
+        self._chunk_idx = 0
+        self._top = 0
+        self._stacks = []
+        self._depth = 0
+
+    def carve(self, size):
+        chunk = self._chunks[self._chunk_idx]
+        if self._top + size > len(chunk):
+            self._chunk_idx += 1
+            if self._chunk_idx == len(self._chunks):
+                self._chunks.append([None] * max(self._chunk_size, size))
+            elif len(self._chunks[self._chunk_idx]) < size:
+                self._chunks[self._chunk_idx] = [None] * size
+            chunk = self._chunks[self._chunk_idx]
+            self._top = 0
+
+        if self._depth < len(self._stacks):
+            stack = self._stacks[self._depth]
+        else:
+            stack = Stack(0)
+            self._stacks.append(stack)
+
+        stack.items = chunk
+        stack.base = self._top
+        stack.limit = self._top + size
+        stack.stack_ptr = self._top - 1
+        stack.chunk_idx = self._chunk_idx
+        stack.depth = self._depth
+
+        self._top += size
+        self._depth += 1
+        return stack
+
+    def release(self, stack):
+        # resetting to the state before carving the stack also releases
+        # the stacks of callees that were left by an exception
+        i = stack.base
+        while i < stack.limit:
+            stack.items[i] = None
+            i += 1
+        self._chunk_idx = stack.chunk_idx
+        self._top = stack.base
+        self._depth = stack.depth
+
+    def get_depth(self):
+        return self._depth
+
+
+stack_region = StackRegion(4096)
@@ -1,15 +1,166 @@
+_DEFAULT_HYBRID_THRESHOLD = 23
+
+# number of bridges and aborted traces after which a method is demoted
+# from tier 2 back to tier 1
+_TRACE_FAILURE_LIMIT = 8
+
+# added to the thresholds of a demoted method, doubled with each demotion
+_INITIAL_COOL_DOWN = 1000
+_MAX_COOL_DOWN = 1000000
+
+
+class TierUpPolicy(object):
+    """Thresholds at which a tier-1 site raises ContinueInTier2.
+
+    Send sites, loop back-edges, and returns are counted separately,
+    so that each kind of site can tier up at its own rate."""
+
+    def __init__(self, send_threshold, back_edge_threshold, return_threshold):
+        self.send_threshold = send_threshold
+        self.back_edge_threshold = back_edge_threshold
+        self.return_threshold = return_threshold
+
+    def copy(self):
+        return TierUpPolicy(
+            self.send_threshold, self.back_edge_threshold, self.return_threshold
+        )
+
+
 class _TierManager(object):
 
-    _HYBRID_THRESHOLD = 23
+    _immutable_fields_ = ["_epoch?"]
+
+    def __init__(self):
+        self._default_policy = TierUpPolicy(
+            _DEFAULT_HYBRID_THRESHOLD,
+            _DEFAULT_HYBRID_THRESHOLD,
+            _DEFAULT_HYBRID_THRESHOLD,
+        )
+
+        # per-method overrides, keyed by "Class>>selector"
+        self._method_policies = {}
+
+        # tier-2 trace failures, i.e., compiled bridges and aborted traces,
+        # per entry point ("bytecode @ idx in Class>>selector"), and per method
+        self._failures_per_entry_point = {}
+        self._failures_per_method = {}
+        self._trace_entry_points = {}
+        self._pending_demotions = {}
+
+        # incremented whenever an override or demotion is added, to
+        # invalidate the policies cached in the methods
+        self._epoch = 0
 
     def set_tier(self, tier):
         self._CURRENT_TIER = tier
 
     def set_threshold(self, value):
-        self._HYBRID_THRESHOLD = value
+        """Set the send, back-edge, and return thresholds at once."""
+        self._default_policy.send_threshold = value
+        self._default_policy.back_edge_threshold = value
+        self._default_policy.return_threshold = value
 
     def get_threshold(self):
-        return self._HYBRID_THRESHOLD
+        return self._default_policy.send_threshold
+
+    def set_send_threshold(self, value):
+        self._default_policy.send_threshold = value
+
+    def set_back_edge_threshold(self, value):
+        self._default_policy.back_edge_threshold = value
+
+    def set_return_threshold(self, value):
+        self._default_policy.return_threshold = value
+
+    def get_default_policy(self):
+        return self._default_policy
+
+    def set_method_threshold(self, method_name, value):
+        """Override all thresholds for the method named "Class>>selector"."""
+        policy = self._method_policies.get(method_name, None)
+        if policy is None:
+            policy = self._default_policy.copy()
+            self._method_policies[method_name] = policy
+            self._epoch += 1
+
+        policy.send_threshold = value
+        policy.back_edge_threshold = value
+        policy.return_threshold = value
+        return policy
+
+    def policy_for(self, method):
+        if method.tier_up_policy_epoch == self._epoch:
+            return method.tier_up_policy
+
+        policy = self._default_policy
+        if self._method_policies or self._pending_demotions:
+            name = method.merge_point_string()
+            policy = self._method_policies.get(name, self._default_policy)
+            if name in self._pending_demotions:
+                del self._pending_demotions[name]
+                self._demote(method)
+        method.tier_up_policy = policy
+        method.tier_up_policy_epoch = self._epoch
+        return policy
+
+    def send_threshold(self, method):
+        return self.policy_for(method).send_threshold + method.tier2_cool_down
+
+    def back_edge_threshold(self, method):
+        return self.policy_for(method).back_edge_threshold + method.tier2_cool_down
+
+    def return_threshold(self, method):
+        return self.policy_for(method).return_threshold + method.tier2_cool_down
+
+    def record_tier2_trace(self, trace_id, entry_point):
+        """Called by the JIT hooks when a tier-2 loop was compiled."""
+        self._trace_entry_points[trace_id] = entry_point
+
+    def record_tier2_bridge(self, trace_id):
+        """Called by the JIT hooks when a bridge was compiled for a guard
+        of a tier-2 loop that failed often."""
+        entry_point = self._trace_entry_points.get(trace_id, None)
+        if entry_point is not None:
+            self.record_trace_failure(entry_point)
+
+    def record_trace_failure(self, entry_point):
+        self._failures_per_entry_point[entry_point] = (
+            self._failures_per_entry_point.get(entry_point, 0) + 1
+        )
+
+        name = _method_name_of_entry_point(entry_point)
+        failures = self._failures_per_method.get(name, 0) + 1
+        if failures >= _TRACE_FAILURE_LIMIT:
+            failures = 0
+            self._pending_demotions[name] = True
+            self._epoch += 1
+        self._failures_per_method[name] = failures
+
+    def get_trace_failures(self, entry_point):
+        return self._failures_per_entry_point.get(entry_point, 0)
+
+    def _demote(self, method):
+        method.reset_counts()
+        method.tier2_demoted = True
+        if method.tier2_cool_down == 0:
+            method.tier2_cool_down = _INITIAL_COOL_DOWN
+        elif method.tier2_cool_down < _MAX_COOL_DOWN:
+            method.tier2_cool_down *= 2
+
+    def is_demoted(self, method):
+        self.policy_for(method)
+        return method.tier2_demoted
+
+    def promote(self, method):
+        if method.tier2_demoted:
+            method.tier2_demoted = False
+
+
+def _method_name_of_entry_point(entry_point):
+    idx = entry_point.rfind(" in ")
+    if idx < 0:
+        return entry_point
+    return entry_point[idx + 4 :]
 
 
 tier_manager = _TierManager()
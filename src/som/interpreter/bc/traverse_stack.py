@@ -1,4 +1,5 @@
 from rlib import jit
+from rlib.rweakref import RWeakValueDictionary
 
 
 class TStack:
@@ -7,6 +8,8 @@ class TStack:
     def __init__(self, bc_idx, next):
         self.bc_idx = bc_idx
         self.next = next
+        # the stacks pushed onto this one, as long as they are alive
+        self._pushed = None
 
     def __repr__(self):
         if self is None:
@@ -21,10 +24,86 @@ class TStack:
     def t_is_empty(self):
         return self is _T_EMPTY
 
+    def get_pushed(self, bc_idx):
+        if self._pushed is None:
+            return None
+        return self._pushed.get(bc_idx)
+
+    def add_pushed(self, tstack):
+        if self._pushed is None:
+            self._pushed = RWeakValueDictionary(int, TStack)
+        self._pushed.set(tstack.bc_idx, tstack)
+
 
 _T_EMPTY = TStack(-42, None)
 
-memoization = {}
+# upper bound for the number of interned stacks, see _TStackMemo
+DEFAULT_MEMO_SIZE = 4096
+
+
+class _TStackMemo(object):
+    """Interns the trace stacks, so that equal stacks are the same object.
+
+    The stacks are kept in two generations of at most half the size each.
+    When the young generation is full, the old one is dropped and the young
+    one becomes the old one. Stacks found in the old generation move back
+    to the young one, so only stacks that were not pushed for a whole
+    generation are evicted, and can then be collected by the GC.
+
+    t_push is elidable, and the stacks are green in the tier-1 driver,
+    so an equal stack must stay the same object as long as compiled code
+    can refer to it. Therefore, each stack also keeps the stacks pushed
+    onto it in a weak table. Evicted stacks that are still referenced,
+    for instance as constants of compiled loops, are found there again.
+    Only stacks that are not referenced anymore are recreated."""
+
+    def __init__(self, max_size):
+        self._young = {}
+        self._old = {}
+        self._generation_size = 1
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.set_max_size(max_size)
+
+    def set_max_size(self, max_size):
+        self._generation_size = max(1, max_size // 2)
+
+    def get_max_size(self):
+        return 2 * self._generation_size
+
+    def size(self):
+        return len(self._young) + len(self._old)
+
+    def push(self, bc_idx, next):
+        key = bc_idx, next
+        result = self._young.get(key, None)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        result = self._old.get(key, None)
+        if result is not None:
+            self.hits += 1
+            del self._old[key]
+        else:
+            result = next.get_pushed(bc_idx)
+            if result is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                result = TStack(bc_idx, next)
+                next.add_pushed(result)
+
+        if len(self._young) >= self._generation_size:
+            self.evictions += len(self._old)
+            self._old = self._young
+            self._young = {}
+        self._young[key] = result
+        return result
+
+
+memoization = _TStackMemo(DEFAULT_MEMO_SIZE)
 
 
 @jit.elidable
@@ -34,12 +113,7 @@ def t_empty():
 
 @jit.elidable
 def t_push(bc_idx, next):
-    key = bc_idx, next
-    if key in memoization:
-        return memoization[key]
-    result = TStack(bc_idx, next)
-    memoization[key] = result
-    return result
+    return memoization.push(bc_idx, next)
 
 
 @jit.dont_look_inside
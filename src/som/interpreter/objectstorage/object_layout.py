@@ -1,6 +1,7 @@
 from som.interpreter.objectstorage.storage_location import (
-    NUMBER_OF_POINTER_FIELDS,
-    NUMBER_OF_PRIMITIVE_FIELDS,
+    MAX_NUMBER_OF_BOOLEAN_FIELDS,
+    Boolean,
+    create_location_for_boolean,
     create_location_for_long,
     create_location_for_double,
     create_location_for_object,
@@ -8,6 +9,7 @@ from som.interpreter.objectstorage.storage_location import (
 )
 from som.vmobjects.double import Double
 from som.vmobjects.integer import Integer
+from som.vmobjects.object_with_layout import get_number_of_inline_fields
 
 from rlib.jit import elidable_promote
 
@@ -18,7 +20,9 @@ class ObjectLayout(object):
         "for_class",
         "_prim_locations_used",
         "_ptr_locations_used",
+        "_bool_locations_used",
         "_total_locations",
+        "_number_of_inline_fields",
         "_storage_locations[*]",
         "_storage_type[*]",
         "is_latest?",
@@ -33,22 +37,33 @@ class ObjectLayout(object):
         self._storage_types = known_types or [None] * number_of_fields
         self._total_locations = number_of_fields
         self._storage_locations = [None] * number_of_fields
+        self._number_of_inline_fields = get_number_of_inline_fields(number_of_fields)
 
         next_free_prim_idx = 0
         next_free_ptr_idx = 0
+        next_free_bool_idx = 0
 
         for i in range(0, number_of_fields):
             storage_type = self._storage_types[i]
 
             if storage_type is Integer:
-                location = create_location_for_long(i, next_free_prim_idx)
+                location = create_location_for_long(
+                    i, next_free_prim_idx, self._number_of_inline_fields
+                )
                 next_free_prim_idx += 1
             elif storage_type is Double:
-                location = create_location_for_double(i, next_free_prim_idx)
+                location = create_location_for_double(
+                    i, next_free_prim_idx, self._number_of_inline_fields
+                )
                 next_free_prim_idx += 1
             elif storage_type is Object:
-                location = create_location_for_object(i, next_free_ptr_idx)
+                location = create_location_for_object(
+                    i, next_free_ptr_idx, self._number_of_inline_fields
+                )
                 next_free_ptr_idx += 1
+            elif storage_type is Boolean:
+                location = create_location_for_boolean(i, next_free_bool_idx)
+                next_free_bool_idx += 1
             else:
                 assert storage_type is None
                 location = create_location_for_unwritten(i)
@@ -57,46 +72,53 @@ class ObjectLayout(object):
 
         self._prim_locations_used = next_free_prim_idx
         self._ptr_locations_used = next_free_ptr_idx
+        self._bool_locations_used = next_free_bool_idx
 
     def get_number_of_fields(self):
         return self._total_locations
 
+    def get_number_of_inline_fields(self):
+        return self._number_of_inline_fields
+
     def with_generalized_field(self, field_idx):
         from som.vmobjects.object_with_layout import Object
 
         if self._storage_types[field_idx] is Object:
             return self
 
-        self.is_latest = False
-
         assert self._storage_types[field_idx] is not None
-        with_generalized_field = self._storage_types[:]
-        with_generalized_field[field_idx] = Object
-        return ObjectLayout(
-            self._total_locations, self.for_class, with_generalized_field
-        )
+        return self._transition(field_idx, Object)
 
     def with_initialized_field(self, field_idx, spec_class):
         from som.vmobjects.object_with_layout import Object
 
-        # First we generalize to Integer, Double, or Object
+        # First we generalize to Integer, Double, Boolean, or Object
         # don't need more precision
         if spec_class is Integer or spec_class is Double:
             spec_type = spec_class
+        elif spec_class is Boolean and (
+            self._storage_types[field_idx] is Boolean
+            or self._bool_locations_used < MAX_NUMBER_OF_BOOLEAN_FIELDS
+        ):
+            spec_type = Boolean
         else:
             spec_type = Object
 
         if self._storage_types[field_idx] is spec_type:
             return self
 
+        if self._storage_types[field_idx] is not None:
+            # the field was already initialized with another type,
+            # for instance by an object that still had an old layout
+            return self.with_generalized_field(field_idx)
+        return self._transition(field_idx, spec_type)
+
+    def _transition(self, field_idx, storage_type):
         self.is_latest = False
 
-        assert self._storage_types[field_idx] is None
-        with_initialized_field = self._storage_types[:]
-        with_initialized_field[field_idx] = spec_type
-        return ObjectLayout(
-            self._total_locations, self.for_class, with_initialized_field
-        )
+        storage_types = self._storage_types[:]
+        storage_types[field_idx] = storage_type
+        return ObjectLayout(self._total_locations, self.for_class, storage_types)
 
     def get_storage_location(self, field_idx):
         return self._storage_locations[field_idx]
@@ -105,13 +127,13 @@ class ObjectLayout(object):
         return self._storage_locations[field_idx].create_access_node(self, next_entry)
 
     def get_number_of_used_extended_ptr_locations(self):
-        required_ext_fields = self._ptr_locations_used - NUMBER_OF_POINTER_FIELDS
+        required_ext_fields = self._ptr_locations_used - self._number_of_inline_fields
         if required_ext_fields < 0:
             return 0
         return required_ext_fields
 
     def get_number_of_used_extended_prim_locations(self):
-        required_ext_field = self._prim_locations_used - NUMBER_OF_PRIMITIVE_FIELDS
+        required_ext_field = self._prim_locations_used - self._number_of_inline_fields
         if required_ext_field < 0:
             return 0
         return required_ext_field
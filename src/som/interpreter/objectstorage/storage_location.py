@@ -3,13 +3,24 @@ from som.interpreter.objectstorage.layout_transitions import (
     UninitializedStorageLocationException,
     GeneralizeStorageLocationException,
 )
-from som.vm.globals import nilObject
+from som.vm.globals import nilObject, trueObject, falseObject
 
 from som.vmobjects.double import Double
 from som.vmobjects.integer import Integer
+from som.vmobjects.object_with_layout import (
+    MAX_NUMBER_OF_INLINE_FIELDS,
+    get_class_with_inline_field,
+)
+
+# Each boolean field takes two bits of the object's boolean map,
+# one to mark it as set and one for its value
+MAX_NUMBER_OF_BOOLEAN_FIELDS = 16
+
 
-NUMBER_OF_PRIMITIVE_FIELDS = 5
-NUMBER_OF_POINTER_FIELDS = 5
+class Boolean(object):
+    """Storage type of the fields that were only assigned true, false, or nil.
+
+    Their values are stored as bits in the object's boolean map."""
 
 
 class _Location(object):
@@ -55,8 +66,8 @@ def _get_primitive_field_mask(store_idx):
     return 0
 
 
-def create_location_for_long(field_idx, prim_field_idx):
-    if prim_field_idx < NUMBER_OF_PRIMITIVE_FIELDS:
+def create_location_for_long(field_idx, prim_field_idx, number_of_inline_fields):
+    if prim_field_idx < number_of_inline_fields:
         return _Location(
             field_idx,
             prim_field_idx,
@@ -69,7 +80,7 @@ def create_location_for_long(field_idx, prim_field_idx):
     return _Location(
         field_idx,
         prim_field_idx,
-        prim_field_idx - NUMBER_OF_PRIMITIVE_FIELDS,
+        prim_field_idx - number_of_inline_fields,
         _prim_is_set,
         _long_array_read,
         _long_array_write,
@@ -77,8 +88,8 @@ def create_location_for_long(field_idx, prim_field_idx):
     )
 
 
-def create_location_for_double(field_idx, prim_field_idx):
-    if prim_field_idx < NUMBER_OF_PRIMITIVE_FIELDS:
+def create_location_for_double(field_idx, prim_field_idx, number_of_inline_fields):
+    if prim_field_idx < number_of_inline_fields:
         return _Location(
             field_idx,
             prim_field_idx,
@@ -91,7 +102,7 @@ def create_location_for_double(field_idx, prim_field_idx):
     return _Location(
         field_idx,
         prim_field_idx,
-        prim_field_idx - NUMBER_OF_PRIMITIVE_FIELDS,
+        prim_field_idx - number_of_inline_fields,
         _prim_is_set,
         _double_array_read,
         _double_array_write,
@@ -99,10 +110,10 @@ def create_location_for_double(field_idx, prim_field_idx):
     )
 
 
-def create_location_for_object(field_idx, ptr_field_idx):
+def create_location_for_object(field_idx, ptr_field_idx, number_of_inline_fields):
     from som.vmobjects.object_with_layout import Object
 
-    if ptr_field_idx < NUMBER_OF_POINTER_FIELDS:
+    if ptr_field_idx < number_of_inline_fields:
         return _Location(
             field_idx,
             ptr_field_idx,
@@ -115,7 +126,7 @@ def create_location_for_object(field_idx, ptr_field_idx):
     return _Location(
         field_idx,
         ptr_field_idx,
-        ptr_field_idx - NUMBER_OF_POINTER_FIELDS,
+        ptr_field_idx - number_of_inline_fields,
         _object_is_set,
         _object_array_read,
         _object_array_write,
@@ -123,6 +134,19 @@ def create_location_for_object(field_idx, ptr_field_idx):
     )
 
 
+def create_location_for_boolean(field_idx, bool_field_idx):
+    assert 0 <= bool_field_idx < MAX_NUMBER_OF_BOOLEAN_FIELDS
+    return _Location(
+        field_idx,
+        2 * bool_field_idx,
+        -1,
+        _boolean_is_set,
+        _boolean_read,
+        _boolean_write,
+        Boolean,
+    )
+
+
 def create_location_for_unwritten(field_idx):
     return _Location(
         field_idx, -1, -1, _unwritten_is_set, _unwritten_read, _unwritten_write, None
@@ -143,14 +167,20 @@ def _unwritten_write(_node, _obj, value):
 
 
 def _make_object_direct_read(field_idx):
+    cls = get_class_with_inline_field(field_idx - 1)
+
     def read_location(_node, obj):
+        assert isinstance(obj, cls)
         return getattr(obj, "_field" + str(field_idx))
 
     return read_location
 
 
 def _make_object_direct_write(field_idx):
+    cls = get_class_with_inline_field(field_idx - 1)
+
     def write_location(_node, obj, value):  # pylint: disable=no-self-use
+        assert isinstance(obj, cls)
         setattr(obj, "_field" + str(field_idx), value)
 
     return write_location
@@ -179,8 +209,34 @@ def _prim_is_set(node, obj):
     return obj.is_primitive_set(node.mask)
 
 
+def _boolean_is_set(node, obj):
+    return obj.is_boolean_set(node.mask)
+
+
+def _boolean_read(node, obj):
+    if not obj.is_boolean_set(node.mask):
+        return nilObject
+    if obj.is_boolean_set(node.mask << 1):
+        return trueObject
+    return falseObject
+
+
+def _boolean_write(node, obj, value):
+    if value is trueObject:
+        obj.set_boolean(node.mask, True)
+    elif value is falseObject:
+        obj.set_boolean(node.mask, False)
+    elif value is nilObject:
+        obj.unset_boolean(node.mask)
+    else:
+        raise GeneralizeStorageLocationException()
+
+
 def _make_double_direct_read(field_idx):
+    cls = get_class_with_inline_field(field_idx - 1)
+
     def read_location(node, obj):
+        assert isinstance(obj, cls)
         if obj.is_primitive_set(node.mask):
             double_val = longlong2float(getattr(obj, "prim_field" + str(field_idx)))
             return Double(double_val)
@@ -190,7 +246,10 @@ def _make_double_direct_read(field_idx):
 
 
 def _make_double_direct_write(field_idx):
+    cls = get_class_with_inline_field(field_idx - 1)
+
     def write_location(node, obj, value):
+        assert isinstance(obj, cls)
         if isinstance(value, Double):
             setattr(
                 obj,
@@ -205,7 +264,10 @@ def _make_double_direct_write(field_idx):
 
 
 def _make_long_direct_read(field_idx):
+    cls = get_class_with_inline_field(field_idx - 1)
+
     def read_location(node, obj):
+        assert isinstance(obj, cls)
         if obj.is_primitive_set(node.mask):
             return Integer(getattr(obj, "prim_field" + str(field_idx)))
         return nilObject
@@ -214,7 +276,10 @@ def _make_long_direct_read(field_idx):
 
 
 def _make_long_direct_write(field_idx):
+    cls = get_class_with_inline_field(field_idx - 1)
+
     def write_location(node, obj, value):
+        assert isinstance(obj, cls)
         if isinstance(value, Integer):
             setattr(obj, "prim_field" + str(field_idx), value.get_embedded_integer())
             obj.mark_prim_as_set(node.mask)
@@ -255,22 +320,22 @@ def _double_array_write(node, obj, value):
 
 
 _object_direct_read = [
-    _make_object_direct_read(i + 1) for i in range(NUMBER_OF_POINTER_FIELDS)
+    _make_object_direct_read(i + 1) for i in range(MAX_NUMBER_OF_INLINE_FIELDS)
 ]
 _object_direct_write = [
-    _make_object_direct_write(i + 1) for i in range(NUMBER_OF_POINTER_FIELDS)
+    _make_object_direct_write(i + 1) for i in range(MAX_NUMBER_OF_INLINE_FIELDS)
 ]
 
 _long_direct_read = [
-    _make_long_direct_read(i + 1) for i in range(NUMBER_OF_PRIMITIVE_FIELDS)
+    _make_long_direct_read(i + 1) for i in range(MAX_NUMBER_OF_INLINE_FIELDS)
 ]
 _long_direct_write = [
-    _make_long_direct_write(i + 1) for i in range(NUMBER_OF_PRIMITIVE_FIELDS)
+    _make_long_direct_write(i + 1) for i in range(MAX_NUMBER_OF_INLINE_FIELDS)
 ]
 
 _double_direct_read = [
-    _make_double_direct_read(i + 1) for i in range(NUMBER_OF_PRIMITIVE_FIELDS)
+    _make_double_direct_read(i + 1) for i in range(MAX_NUMBER_OF_INLINE_FIELDS)
 ]
 _double_direct_write = [
-    _make_double_direct_write(i + 1) for i in range(NUMBER_OF_PRIMITIVE_FIELDS)
+    _make_double_direct_write(i + 1) for i in range(MAX_NUMBER_OF_INLINE_FIELDS)
 ]
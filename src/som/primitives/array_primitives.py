@@ -1,6 +1,7 @@
 from rlib.jit import JitDriver
 
 from som.interp_type import is_ast_interpreter
+from som.vm.globals import nilObject
 from som.vmobjects.array import Array
 from som.vmobjects.primitive import UnaryPrimitive, BinaryPrimitive, TernaryPrimitive
 from som.vmobjects.method import AbstractMethod
@@ -24,15 +25,40 @@ def _at_put(rcvr, index, value):
 
 
 def _length(rcvr):
-    from som.vmobjects.integer import Integer
+    from som.vmobjects.integer import make_integer
 
-    return Integer(rcvr.get_number_of_indexable_fields())
+    return make_integer(rcvr.get_number_of_indexable_fields())
 
 
 def _copy(rcvr):
     return rcvr.copy()
 
 
+def _copy_from_to(rcvr, start, end):
+    first = start.get_embedded_integer() - 1
+    return rcvr.copy_range(first, end.get_embedded_integer() - first)
+
+
+def _index_of(rcvr, value):
+    from som.vmobjects.integer import make_integer
+
+    idx = rcvr.index_of(value)
+    if idx < 0:
+        return nilObject
+    return make_integer(idx + 1)
+
+
+def replace_from_to_with_starting_at(rcvr, start, end, other, other_start):
+    first = start.get_embedded_integer() - 1
+    rcvr.replace_range(
+        first,
+        end.get_embedded_integer() - first,
+        other,
+        other_start.get_embedded_integer() - 1,
+    )
+    return rcvr
+
+
 def _new(_rcvr, length):
     return Array.from_size(length.get_embedded_integer())
 
@@ -51,7 +77,7 @@ do_index_driver = JitDriver(
 
 
 def _do_indexes(rcvr, block):
-    from som.vmobjects.integer import Integer
+    from som.vmobjects.integer import make_integer
 
     block_method = block.get_method()
 
@@ -60,9 +86,9 @@ def _do_indexes(rcvr, block):
     while i <= length:  # the i is propagated to Smalltalk, so, start with 1
         do_index_driver.jit_merge_point(block_method=block_method)
         if is_tier1():
-            block_method.invoke_2(block, Integer(i))
+            block_method.invoke_2(block, make_integer(i))
         else:
-            block_method.invoke_2_tier2(block, Integer(i))
+            block_method.invoke_2_tier2(block, make_integer(i))
         i += 1
 
 
@@ -112,6 +138,12 @@ class ArrayPrimitivesBase(Primitives):
             UnaryPrimitive("length", self.universe, _length)
         )
         self._install_instance_primitive(UnaryPrimitive("copy", self.universe, _copy))
+        self._install_instance_primitive(
+            TernaryPrimitive("copyFrom:to:", self.universe, _copy_from_to)
+        )
+        self._install_instance_primitive(
+            BinaryPrimitive("indexOf:", self.universe, _index_of)
+        )
 
         self._install_class_primitive(BinaryPrimitive("new:", self.universe, _new))
 
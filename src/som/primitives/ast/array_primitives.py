@@ -1,4 +1,21 @@
-from som.primitives.array_primitives import ArrayPrimitivesBase as _Base
+from som.primitives.array_primitives import (
+    ArrayPrimitivesBase as _Base,
+    replace_from_to_with_starting_at,
+)
+from som.vmobjects.primitive import Primitive
 
 
-ArrayPrimitives = _Base
+def _replace_from_to_with_starting_at(_ivkbl, rcvr, args):
+    return replace_from_to_with_starting_at(rcvr, args[0], args[1], args[2], args[3])
+
+
+class ArrayPrimitives(_Base):
+    def install_primitives(self):
+        _Base.install_primitives(self)
+        self._install_instance_primitive(
+            Primitive(
+                "replaceFrom:to:with:startingAt:",
+                self.universe,
+                _replace_from_to_with_starting_at,
+            )
+        )
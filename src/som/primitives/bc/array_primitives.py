@@ -1,4 +1,39 @@
-from som.primitives.array_primitives import ArrayPrimitivesBase as _Base
+from som.primitives.array_primitives import (
+    ArrayPrimitivesBase as _Base,
+    replace_from_to_with_starting_at,
+)
+from som.vmobjects.primitive import Primitive
 
 
-ArrayPrimitives = _Base
+def _replace_from_to_with_starting_at(_ivkbl, stack, stack_ptr):
+    other_start = stack[stack_ptr]
+    stack[stack_ptr] = None
+    stack_ptr -= 1
+
+    other = stack[stack_ptr]
+    stack[stack_ptr] = None
+    stack_ptr -= 1
+
+    end = stack[stack_ptr]
+    stack[stack_ptr] = None
+    stack_ptr -= 1
+
+    start = stack[stack_ptr]
+    stack[stack_ptr] = None
+    stack_ptr -= 1
+
+    rcvr = stack[stack_ptr]
+    replace_from_to_with_starting_at(rcvr, start, end, other, other_start)
+    return stack_ptr
+
+
+class ArrayPrimitives(_Base):
+    def install_primitives(self):
+        _Base.install_primitives(self)
+        self._install_instance_primitive(
+            Primitive(
+                "replaceFrom:to:with:startingAt:",
+                self.universe,
+                _replace_from_to_with_starting_at,
+            )
+        )
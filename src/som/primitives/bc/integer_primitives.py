@@ -2,7 +2,7 @@ from rlib import jit
 
 from som.primitives.integer_primitives import IntegerPrimitivesBase as _Base
 from som.vmobjects.double import Double
-from som.vmobjects.integer import Integer
+from som.vmobjects.integer import make_integer
 from som.vmobjects.primitive import Primitive, TernaryPrimitive, QuaternaryPrimitive
 from som.tier_type import is_tier1, is_tier2, is_hybrid
 
@@ -67,9 +67,9 @@ def _to_do_int(i, by_increment, top, block, block_method):
             jitdriver_int.jit_merge_point(block_method=block_method)
 
         if is_tier1():
-            block_method.invoke_2(block, Integer(i))
+            block_method.invoke_2(block, make_integer(i))
         else:
-            block_method.invoke_2_tier2(block, Integer(i))
+            block_method.invoke_2_tier2(block, make_integer(i))
         i += by_increment
 
 
@@ -81,9 +81,9 @@ def _to_do_double(i, by_increment, top, block, block_method):
             jitdriver_double.jit_merge_point(block_method=block_method)
 
         if is_tier1():
-            block_method.invoke_2(block, Integer(i))
+            block_method.invoke_2(block, make_integer(i))
         else:
-            block_method.invoke_2_tier2(block, Integer(i))
+            block_method.invoke_2_tier2(block, make_integer(i))
         i += by_increment
 
 
@@ -166,9 +166,9 @@ def _down_to_do_int(i, by_increment, bottom, block, block_method):
             jitdriver_int_down.jit_merge_point(block_method=block_method)
 
         if is_tier1():
-            block_method.invoke_2(block, Integer(i))
+            block_method.invoke_2(block, make_integer(i))
         else:
-            block_method.invoke_2_tier2(block, Integer(i))
+            block_method.invoke_2_tier2(block, make_integer(i))
         i -= by_increment
 
 
@@ -180,9 +180,9 @@ def _down_to_do_double(i, by_increment, bottom, block, block_method):
             jitdriver_double_down.jit_merge_point(block_method=block_method)
 
         if is_tier1():
-            block_method.invoke_2(block, Integer(i))
+            block_method.invoke_2(block, make_integer(i))
         else:
-            block_method.invoke_2_tier2(block, Integer(i))
+            block_method.invoke_2_tier2(block, make_integer(i))
         i -= by_increment
 
 
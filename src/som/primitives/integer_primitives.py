@@ -17,7 +17,7 @@ from som.vm.globals import nilObject, falseObject, trueObject
 from som.vmobjects.array import Array
 from som.vmobjects.biginteger import BigInteger
 from som.vmobjects.double import Double
-from som.vmobjects.integer import Integer
+from som.vmobjects.integer import Integer, make_integer
 from som.vmobjects.primitive import UnaryPrimitive, BinaryPrimitive
 from som.vmobjects.string import String
 
@@ -36,14 +36,14 @@ def _as_32_bit_signed_value(rcvr):
 
 def _as_32_bit_unsigned_value(rcvr):
     val = as_32_bit_unsigned_value(rcvr.get_embedded_integer())
-    return Integer(val)
+    return make_integer(val)
 
 
 def _sqrt(rcvr):
     assert isinstance(rcvr, Integer)
     res = sqrt(rcvr.get_embedded_integer())
     if res == float(int(res)):
-        return Integer(int(res))
+        return make_integer(int(res))
     return Double(res)
 
 
@@ -136,7 +136,7 @@ def _left_shift(left, right):
         if not (left_val == 0 or 0 <= right_val < LONG_BIT):
             raise OverflowError
         result = ovfcheck(left_val << right_val)
-        return Integer(result)
+        return make_integer(result)
     except OverflowError:
         return BigInteger(bigint_from_int(left_val).lshift(right_val))
 
@@ -147,13 +147,13 @@ def _unsigned_right_shift(left, right):
     left_val = left.get_embedded_integer()
     right_val = right.get_embedded_integer()
 
-    return Integer(unsigned_right_shift(left_val, right_val))
+    return make_integer(unsigned_right_shift(left_val, right_val))
 
 
 def _bit_xor(left, right):
     assert isinstance(right, Integer)
     result = left.get_embedded_integer() ^ right.get_embedded_integer()
-    return Integer(result)
+    return make_integer(result)
 
 
 def _abs(rcvr):
@@ -188,7 +188,7 @@ def _from_string(_rcvr, param):
 
     try:
         i = string_to_int(str_val)
-        return Integer(i)
+        return make_integer(i)
     except ParseStringOverflowError:
         bigint = bigint_from_str(str_val)
         return BigInteger(bigint)
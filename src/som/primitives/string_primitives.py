@@ -4,7 +4,7 @@ from som.primitives.primitives import Primitives
 from som.vm.current import current_universe
 
 from som.vm.globals import trueObject, falseObject
-from som.vmobjects.integer import Integer
+from som.vmobjects.integer import Integer, make_integer
 from som.vmobjects.primitive import UnaryPrimitive, BinaryPrimitive, TernaryPrimitive
 from som.vmobjects.string import String
 
@@ -18,7 +18,7 @@ def _as_symbol(rcvr):
 
 
 def _length(rcvr):
-    return Integer(len(rcvr.get_embedded_string()))
+    return make_integer(len(rcvr.get_embedded_string()))
 
 
 def _equals(op1, op2):
@@ -5,6 +5,8 @@ from rlib.streamio import open_file_as_stream, readall_from_stream
 
 from som.primitives.primitives import Primitives
 from som.vm.current import current_universe
+from som.vm.gc_stats import gc_stats
+from som.vmobjects.array import Array
 from som.vmobjects.integer import Integer
 from som.vmobjects.double import Double
 from som.vm.globals import nilObject, trueObject, falseObject
@@ -100,6 +102,13 @@ def _full_gc(_rcvr):
     return trueObject
 
 
+@jit.dont_look_inside
+def _gc_stats(_rcvr):
+    # minor collections, major collection steps, major collections,
+    # minor and major GC time in us, allocated bytes, peak memory in bytes
+    return Array.from_integers(gc_stats.as_integers())
+
+
 # Krun features
 
 try:
@@ -164,6 +173,9 @@ class SystemPrimitivesBase(Primitives):
         self._install_instance_primitive(
             UnaryPrimitive("fullGC", self.universe, _full_gc)
         )
+        self._install_instance_primitive(
+            UnaryPrimitive("gcStats", self.universe, _gc_stats)
+        )
 
         self._install_instance_primitive(
             BinaryPrimitive("loadFile:", self.universe, _load_file)
@@ -1,3 +1,4 @@
+import os
 import sys
 
 from rlib.jit import not_in_trace
@@ -105,6 +106,12 @@ class _Statistics(object):
             debug_print("%d,%d,%s" % (i+1, self.counts[signature], signature))
 
 
+    @not_in_trace
+    def report_bytecode_histogram(self):
+        from som.interpreter.bc.bytecode_profile import bytecode_histogram
+
+        os.write(2, bytecode_histogram.format())
+
     @not_in_trace
     def report(self):
         send_1_all = self.primitive_send_1 + self.trivial_send_1 + self.method_send_1
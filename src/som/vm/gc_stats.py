@@ -0,0 +1,149 @@
+import time
+
+from rlib.rtimer import UNIT_NS, get_timestamp_unit, read_timestamp
+
+NUM_PAUSE_BUCKETS = 24
+
+# time after which the rate of the timestamp counter is considered known
+_CALIBRATION_US = 100000.0
+
+
+class GcHooksStats(object):
+    """Statistics recorded by the GC hooks of the translated VM.
+
+    Pauses are counted in histograms with power-of-two buckets in
+    microseconds: bucket 0 holds pauses below 1 us, and bucket i > 0 those
+    below 2^i us. The last bucket also holds all longer pauses.
+
+    The GC reports durations in ticks of its timestamp counter. They are
+    nanoseconds on some platforms, but for instance ticks of the TSC of
+    x86 processors on others, of which the rate is not known. Then, the
+    rate is measured against the wall clock from the time the statistics
+    were reset, and fixed once enough time has passed.
+
+    The GC does not report allocations. Since a minor collection happens
+    each time the nursery is full, the allocated bytes are estimated as
+    the number of minor collections times the nursery size. Objects
+    allocated outside of the nursery are not counted."""
+
+    def __init__(self):
+        self.reset(0, 0.0)
+
+    def reset(self, zero, zero_duration):
+        if get_timestamp_unit() == UNIT_NS:
+            self.ticks_per_us = 1000.0
+        else:
+            self.ticks_per_us = 0.0
+        self.start_ticks = read_timestamp()
+        self.start_time = time.time()
+
+        self.minors = zero
+        self.steps = zero
+        self.collects = zero
+        self.duration_major = zero_duration
+        self.duration_minor = zero_duration
+        self.minor_pauses = [zero] * NUM_PAUSE_BUCKETS
+        self.major_pauses = [zero] * NUM_PAUSE_BUCKETS
+        self.peak_memory = zero
+        self.nursery_size = zero
+
+    def record_minor(self, duration, total_memory_used):
+        self.minors += 1
+        self.duration_minor += duration
+        self.minor_pauses[self._pause_bucket(duration)] += 1
+        self._update_peak_memory(total_memory_used)
+
+    def record_collect_step(self, duration):
+        self.steps += 1
+        self.duration_major += duration
+        self.major_pauses[self._pause_bucket(duration)] += 1
+
+    def record_collect(self, memory_used):
+        self.collects += 1
+        self._update_peak_memory(memory_used)
+
+    def _update_peak_memory(self, memory_used):
+        if memory_used > self.peak_memory:
+            self.peak_memory = memory_used
+
+    def bytes_allocated(self):
+        return self.minors * self.nursery_size
+
+    def minor_time_us(self):
+        return self._us(self.duration_minor)
+
+    def major_time_us(self):
+        return self._us(self.duration_major)
+
+    def _ticks_per_us(self):
+        if self.ticks_per_us > 0.0:
+            return self.ticks_per_us
+
+        elapsed_us = (time.time() - self.start_time) * 1000000.0
+        if elapsed_us <= 0.0:
+            return 1000.0
+        rate = float(read_timestamp() - self.start_ticks) / elapsed_us
+        if elapsed_us >= _CALIBRATION_US:
+            self.ticks_per_us = rate
+        return rate
+
+    def _us(self, ticks):
+        return int(ticks / self._ticks_per_us())
+
+    def _pause_bucket(self, duration):
+        pause = self._us(duration)
+        bucket = 0
+        while pause > 0 and bucket < NUM_PAUSE_BUCKETS - 1:
+            pause >>= 1
+            bucket += 1
+        return bucket
+
+    def as_integers(self):
+        """The counters in the order of the System>>#gcStats primitive."""
+        return [
+            self.minors,
+            self.steps,
+            self.collects,
+            self.minor_time_us(),
+            self.major_time_us(),
+            self.bytes_allocated(),
+            self.peak_memory,
+        ]
+
+    def format_json(self):
+        bounds = []
+        for i in range(NUM_PAUSE_BUCKETS):
+            bounds.append(str(1 << i))
+        return (
+            '{"minor_collections": '
+            + str(self.minors)
+            + ', "major_steps": '
+            + str(self.steps)
+            + ', "major_collections": '
+            + str(self.collects)
+            + ', "minor_time_us": '
+            + str(self.minor_time_us())
+            + ', "major_time_us": '
+            + str(self.major_time_us())
+            + ', "bytes_allocated": '
+            + str(self.bytes_allocated())
+            + ', "peak_memory": '
+            + str(self.peak_memory)
+            + ', "pause_bucket_limits_us": ['
+            + ", ".join(bounds)
+            + '], "minor_pauses": '
+            + _json_list(self.minor_pauses)
+            + ', "major_pauses": '
+            + _json_list(self.major_pauses)
+            + "}\n"
+        )
+
+
+def _json_list(counts):
+    items = []
+    for count in counts:
+        items.append(str(count))
+    return "[" + ", ".join(items) + "]"
+
+
+gc_stats = GcHooksStats()
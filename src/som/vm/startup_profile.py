@@ -0,0 +1,119 @@
+import time
+
+PHASE_PARSE = 0
+PHASE_ASSEMBLE = 1
+PHASE_PRIMITIVES = 2
+
+_PHASE_NAMES = ["parse", "assemble", "primitives"]
+
+
+class _ClassProfile(object):
+    def __init__(self, name):
+        self.name = name
+        self.times = [0.0] * len(_PHASE_NAMES)
+
+    def total(self):
+        result = 0.0
+        for t in self.times:
+            result += t
+        return result
+
+
+class _Timer(object):
+    def __init__(self, profile, phase):
+        self.profile = profile
+        self.phase = phase
+        self.nested = 0.0
+        self.start = time.time()
+
+
+class _StartupProfile(object):
+    """Times the phases of loading each class.
+
+    Loading a class also loads its super class while parsing,
+    so the times of a phase exclude the time spent in nested loads.
+    Parsing includes lexing, bytecode generation, and inlining,
+    because the compiler does all of them in a single pass."""
+
+    def __init__(self):
+        self.enabled = False
+        self._classes = {}
+        self._timers = []
+
+    def enable(self):
+        self.enabled = True
+
+    def start(self, class_name, phase):
+        if not self.enabled:
+            return
+        profile = self._classes.get(class_name, None)
+        if profile is None:
+            profile = _ClassProfile(class_name)
+            self._classes[class_name] = profile
+        self._timers.append(_Timer(profile, phase))
+
+    def stop(self):
+        if not self.enabled:
+            return
+        timer = self._timers.pop()
+        elapsed = time.time() - timer.start
+        timer.profile.times[timer.phase] += elapsed - timer.nested
+        if self._timers:
+            self._timers[-1].nested += elapsed
+
+    def get_classes(self):
+        """Return the profiles sorted by decreasing total time."""
+        result = []
+        for profile in self._classes.values():
+            total = profile.total()
+            i = len(result)
+            while i > 0 and result[i - 1].total() < total:
+                i -= 1
+            result.insert(i, profile)
+        return result
+
+    def format_table(self):
+        classes = self.get_classes()
+        totals = [0.0] * len(_PHASE_NAMES)
+        lines = ["Startup profile (us)"]
+        lines.append(_format_row("class", _PHASE_NAMES + ["total"]))
+        for profile in classes:
+            cells = []
+            for i in range(len(_PHASE_NAMES)):
+                totals[i] += profile.times[i]
+                cells.append(_us(profile.times[i]))
+            cells.append(_us(profile.total()))
+            lines.append(_format_row(profile.name, cells))
+
+        total = 0.0
+        cells = []
+        for t in totals:
+            total += t
+            cells.append(_us(t))
+        cells.append(_us(total))
+        lines.append(_format_row("all %d classes" % len(classes), cells))
+        return "\n".join(lines) + "\n"
+
+    def format_json(self):
+        entries = []
+        for profile in self.get_classes():
+            fields = ['"class": "' + profile.name + '"']
+            for i in range(len(_PHASE_NAMES)):
+                fields.append('"' + _PHASE_NAMES[i] + '_us": ' + _us(profile.times[i]))
+            fields.append('"total_us": ' + _us(profile.total()))
+            entries.append("{" + ", ".join(fields) + "}")
+        return "[" + ",\n ".join(entries) + "]\n"
+
+
+def _us(seconds):
+    return str(int(seconds * 1000000.0))
+
+
+def _format_row(name, cells):
+    row = name + " " * max(1, 24 - len(name))
+    for cell in cells:
+        row += " " * max(1, 12 - len(cell)) + cell
+    return row
+
+
+startup_profile = _StartupProfile()
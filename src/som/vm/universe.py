@@ -5,23 +5,31 @@ from rlib import jit
 from rlib.string_stream import encode_to_bytes
 from rlib.exit import Exit
 from rlib.osext import path_split
-from rlib.objectmodel import we_are_translated
+from rlib.objectmodel import we_are_translated, compute_identity_hash
 from rlib import rgc
 
 from som.vmobjects.array import Array
 from som.vmobjects.block_bc import block_evaluation_primitive
 from som.vmobjects.clazz import Class
+from som.vmobjects.integer import is_valid_small_integer_range, small_integers
 from som.vmobjects.object_without_fields import ObjectWithoutFields
-from som.vmobjects.object_with_layout import Object
+from som.vmobjects.object_with_layout import new_object
 from som.vmobjects.symbol import Symbol
 from som.vmobjects.string import String
 
+from som.interp_type import is_ast_interpreter
+from som.interpreter.bc.bytecode_profile import bytecode_histogram, ngram_profile
+from som.interpreter.bc.sample_profile import sample_profiler
 from som.vm.globals import nilObject, trueObject, falseObject
 from som.vm.shell import Shell
+from som.vm.startup_profile import PHASE_PRIMITIVES, startup_profile
 
 from som.compiler.sourcecode_compiler import (
     compile_class_from_file,
+    compile_class_from_image,
     compile_class_from_string,
+    load_image,
+    new_image_recorder,
 )
 
 
@@ -37,6 +45,10 @@ class Assoc(object):
         return "(%s => %s)" % (self.global_name, self.value)
 
 
+# number of entries in the global lookup cache, needs to be a power of 2
+_LOOKUP_CACHE_SIZE = 1024
+
+
 class Universe(object):
 
     _immutable_fields_ = [
@@ -64,6 +76,10 @@ class Universe(object):
         "double_layout?",
         "_symbol_table",
         "_globals",
+        "_lookup_cache_layouts",
+        "_lookup_cache_selectors",
+        "_lookup_cache_invokables",
+        "_lookup_cache_epochs",
         "start_time",
         "sym_plus",
         "sym_minus",
@@ -75,6 +91,14 @@ class Universe(object):
         self._symbol_table = {}
         self._globals = {}
 
+        # global method lookup cache, keyed on (layout, selector),
+        # entries are only valid if they have the current epoch
+        self._lookup_cache_layouts = [None] * _LOOKUP_CACHE_SIZE
+        self._lookup_cache_selectors = [None] * _LOOKUP_CACHE_SIZE
+        self._lookup_cache_invokables = [None] * _LOOKUP_CACHE_SIZE
+        self._lookup_cache_epochs = [0] * _LOOKUP_CACHE_SIZE
+        self._lookup_cache_epoch = 1
+
         self.object_class = None
         self.class_class = None
         self.metaclass_class = None
@@ -102,11 +126,23 @@ class Universe(object):
         self.sym_nil = self.symbol_for("nil")
         self.sym_plus = self.symbol_for("+")
         self.sym_minus = self.symbol_for("-")
+        self.sym_equals = self.symbol_for("=")
 
         self._last_exit_code = 0
         self._avoid_exit = avoid_exit
         self._dump_bytecodes = False
         self.classpath = None
+        self.class_cache_dir = None
+        self.lazy_methods = False
+        self.superinstructions = True
+        self.constant_folding = True
+        self._bytecode_ngrams_file = None
+        self._sample_profile_file = None
+        self._report_bytecode_histogram = False
+        self.image_recorder = None
+        self._image = None
+        self._image_file = None
+        self._save_image_file = None
         self.start_time = time.time()  # a float of the time in seconds
         self._object_system_initialized = False
 
@@ -114,11 +150,38 @@ class Universe(object):
         self.__init__(avoid_exit)
 
     def exit(self, error_code):
+        if self._bytecode_ngrams_file is not None:
+            self._write_bytecode_ngrams()
+        if self._sample_profile_file is not None:
+            self._write_sample_profile()
+        if self._report_bytecode_histogram:
+            from som.statistics import statistics
+
+            statistics.report_bytecode_histogram()
+            # only report the histogram once
+            self._report_bytecode_histogram = False
+
         if self._avoid_exit:
             self._last_exit_code = error_code
         else:
             raise Exit(error_code)
 
+    def _write_bytecode_ngrams(self):
+        try:
+            ngram_profile.write(self._bytecode_ngrams_file)
+        except (IOError, OSError):
+            error_println("Could not write " + self._bytecode_ngrams_file)
+        # only write the profile once
+        self._bytecode_ngrams_file = None
+
+    def _write_sample_profile(self):
+        try:
+            sample_profiler.write(self._sample_profile_file)
+        except (IOError, OSError):
+            error_println("Could not write " + self._sample_profile_file)
+        # only write the profile once
+        self._sample_profile_file = None
+
     def last_exit_code(self):
         return self._last_exit_code
 
@@ -143,6 +206,11 @@ class Universe(object):
         # Initialize the known universe
         system_object = self._initialize_object_system()
 
+        if self._save_image_file is not None:
+            self._save_image()
+            if len(arguments) == 0:
+                return nilObject
+
         # Start the shell if no filename is given
         if len(arguments) == 0:
             shell = Shell(self)
@@ -164,6 +232,67 @@ class Universe(object):
                 self.setup_classpath(arguments[i + 1])
                 i += 1  # skip class path
                 got_classpath = True
+            elif arguments[i] == "-cache" and not saw_others:
+                if i + 1 >= len(arguments):
+                    self._print_usage_and_exit()
+                self.class_cache_dir = arguments[i + 1]
+                i += 1  # skip cache directory
+            elif arguments[i] == "--image" and not saw_others:
+                if i + 1 >= len(arguments):
+                    self._print_usage_and_exit()
+                self._image_file = arguments[i + 1]
+                i += 1  # skip image file
+            elif arguments[i] == "--save-image" and not saw_others:
+                if i + 1 >= len(arguments):
+                    self._print_usage_and_exit()
+                self._save_image_file = arguments[i + 1]
+                self.image_recorder = new_image_recorder(self)
+                if self.image_recorder is None:
+                    error_println(
+                        "Images are only supported by the bytecode interpreter."
+                    )
+                    self.exit(1)
+                i += 1  # skip image file
+            elif arguments[i] == "--lazy-methods" and not saw_others:
+                self.lazy_methods = True
+            elif arguments[i] == "--no-superinstructions" and not saw_others:
+                self.superinstructions = False
+            elif arguments[i] == "--no-constant-folding" and not saw_others:
+                self.constant_folding = False
+            elif arguments[i] == "--bytecode-ngrams" and not saw_others:
+                if i + 1 >= len(arguments):
+                    self._print_usage_and_exit()
+                self._bytecode_ngrams_file = arguments[i + 1]
+                # profile the bytecodes the superinstructions are made of
+                self.superinstructions = False
+                ngram_profile.enable()
+                i += 1  # skip profile file
+            elif arguments[i] == "--sample-profile" and not saw_others:
+                if i + 1 >= len(arguments):
+                    self._print_usage_and_exit()
+                if is_ast_interpreter():
+                    error_println(
+                        "Sampling is only supported by the bytecode interpreter."
+                    )
+                    self.exit(1)
+                self._sample_profile_file = arguments[i + 1]
+                sample_profiler.enable()
+                i += 1  # skip profile file
+            elif arguments[i] == "--bytecode-histogram" and not saw_others:
+                if is_ast_interpreter():
+                    error_println(
+                        "Bytecode histograms are only supported by the"
+                        + " bytecode interpreter."
+                    )
+                    self.exit(1)
+                self._report_bytecode_histogram = True
+                bytecode_histogram.enable()
+            elif arguments[i] == "--small-integers" and not saw_others:
+                if i + 1 >= len(arguments):
+                    self._print_usage_and_exit()
+                if not self._set_small_integer_range(arguments[i + 1]):
+                    self._print_usage_and_exit()
+                i += 1  # skip range
             elif arguments[i] == "-d" and not saw_others:
                 self._dump_bytecodes = True
             elif arguments[i] in ["-h", "--help", "-?"] and not saw_others:
@@ -197,6 +326,22 @@ class Universe(object):
     def setup_classpath(self, class_path):
         self.classpath = class_path.split(os.pathsep)
 
+    @staticmethod
+    def _set_small_integer_range(min_max):
+        """Set the range of --small-integers, or return False if invalid."""
+        bounds = min_max.split(":")
+        if len(bounds) != 2:
+            return False
+        try:
+            min_value = int(bounds[0])
+            max_value = int(bounds[1])
+        except ValueError:
+            return False
+        if not is_valid_small_integer_range(min_value, max_value):
+            return False
+        small_integers.set_range(min_value, max_value)
+        return True
+
     @staticmethod
     def _default_classpath():
         return ["."]
@@ -214,15 +359,54 @@ class Universe(object):
         std_println("where options include:                                   ")
         std_println("    -cp <directories separated by " + os.pathsep + ">")
         std_println("        set search path for application classes")
+        std_println("    -cache <directory>")
+        std_println("        cache compiled classes in the given directory")
         std_println("    -d  enable disassembling")
         std_println("    -h  print this help")
         std_println("")
         std_println("    --no-gc disable garbage collection")
+        std_println("    --save-image <file>")
+        std_println("        save the classes loaded at start up as image")
+        std_println("    --image <file>")
+        std_println("        load classes from the image, before the class path")
+        std_println("    --lazy-methods")
+        std_println("        compile method bodies on first use")
+        std_println("    --no-superinstructions")
+        std_println("        do not fuse frequent bytecode sequences")
+        std_println("    --no-constant-folding")
+        std_println("        do not evaluate operations on literals at compile time,")
+        std_println("        needed when core classes like Integer or True are changed")
+        std_println("    --bytecode-ngrams <file>")
+        std_println("        write the frequencies of executed bytecode sequences")
+        std_println("    --sample-profile <file>")
+        std_println("        sample the active methods every millisecond and write")
+        std_println("        them as collapsed stacks for flame graphs")
+        std_println("    --small-integers <min>:<max>")
+        std_println("        preallocate the Integers in this range, default -128:1023,")
+        std_println("        at most 65536 values, an empty range like 0:-1")
+        std_println("        disables the cache")
+        std_println("    --bytecode-histogram")
+        std_println("        report the executed bytecodes per opcode and method at exit")
 
         # Exit
         self.exit(0)
 
+    def _save_image(self):
+        try:
+            self.image_recorder.save(self._save_image_file)
+        except (IOError, OSError):
+            error_println("Could not write image " + self._save_image_file)
+            self.exit(1)
+        # classes loaded later are not part of the image
+        self.image_recorder = None
+
     def _initialize_object_system(self):
+        if self._image_file is not None:
+            self._image = load_image(self._image_file, self)
+            if self._image is None:
+                error_println("Could not load image " + self._image_file)
+                self.exit(1)
+
         # Allocate the Metaclass classes
         self.metaclass_class = self.new_metaclass_class()
 
@@ -339,6 +523,32 @@ class Universe(object):
         result = self._new_symbol(string)
         return result
 
+    def lookup_invokable(self, layout, selector):
+        """Lookup of selector for the class of layout, using the global cache"""
+        if jit.we_are_jitted():
+            return layout.lookup_invokable(selector)
+
+        idx = (compute_identity_hash(layout) ^ compute_identity_hash(selector)) & (
+            _LOOKUP_CACHE_SIZE - 1
+        )
+        if (
+            self._lookup_cache_layouts[idx] is layout
+            and self._lookup_cache_selectors[idx] is selector
+            and self._lookup_cache_epochs[idx] == self._lookup_cache_epoch
+        ):
+            return self._lookup_cache_invokables[idx]
+
+        invokable = layout.lookup_invokable(selector)
+        self._lookup_cache_layouts[idx] = layout
+        self._lookup_cache_selectors[idx] = selector
+        self._lookup_cache_invokables[idx] = invokable
+        self._lookup_cache_epochs[idx] = self._lookup_cache_epoch
+        return invokable
+
+    def invalidate_lookup_cache(self):
+        """Called whenever the methods of a class change"""
+        self._lookup_cache_epoch += 1
+
     @staticmethod
     def new_array_with_strings(strings):
         values = [String(s) for s in strings]
@@ -350,7 +560,7 @@ class Universe(object):
         num_fields = layout.get_number_of_fields()
         if num_fields == 0:
             return ObjectWithoutFields(layout)
-        return Object(layout)
+        return new_object(layout)
 
     def new_metaclass_class(self):
         # Allocate the metaclass classes
@@ -463,7 +673,13 @@ class Universe(object):
             return
 
         if clazz.needs_primitives() or is_system_class:
-            clazz.load_primitives(not is_system_class, self)
+            startup_profile.start(
+                clazz.get_name().get_embedded_string(), PHASE_PRIMITIVES
+            )
+            try:
+                clazz.load_primitives(not is_system_class, self)
+            finally:
+                startup_profile.stop()
 
     def _load_system_class(self, system_class):
         # Load the system class
@@ -481,20 +697,29 @@ class Universe(object):
         self._load_primitives(result, True)
 
     def _load_class(self, name, system_class):
+        result = self._compile_class(name, system_class)
+        if result is not None and self._dump_bytecodes:
+            from som.compiler.disassembler import dump
+
+            dump(result.get_class(self))
+            dump(result)
+        return result
+
+    def _compile_class(self, name, system_class):
+        if self._image is not None:
+            result = compile_class_from_image(
+                self._image, name.get_embedded_string(), system_class, self
+            )
+            if result is not None:
+                return result
+
         # Try loading the class from all different paths
         for cp_entry in self.classpath:
             try:
                 # Load the class from a file and return the loaded class
-                result = compile_class_from_file(
+                return compile_class_from_file(
                     cp_entry, name.get_embedded_string(), system_class, self
                 )
-                if self._dump_bytecodes:
-                    from som.compiler.disassembler import dump
-
-                    dump(result.get_class(self))
-                    dump(result)
-
-                return result
             except IOError:
                 # Continue trying different paths
                 pass
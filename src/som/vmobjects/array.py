@@ -1,14 +1,15 @@
-from rlib.arithmetic import IntType
+from rlib.arithmetic import IntType, intmask, r_int32
 from rlib.erased import new_erasing_pair
 from rlib.jit import JitDriver
 from rlib.debug import make_sure_not_resized
 
+from som.interpreter.send import lookup_and_send_3
 from som.tier_type import is_tier2, is_hybrid
 
 from som.vmobjects.abstract_object import AbstractObject
 from som.vm.globals import nilObject, falseObject, trueObject
 from som.vmobjects.double import Double
-from som.vmobjects.integer import Integer
+from som.vmobjects.integer import Integer, make_integer
 from som.vmobjects.method import AbstractMethod
 
 
@@ -69,16 +70,85 @@ put_all_bool_driver = JitDriver(
 )
 
 
+def index_of_pl(equals_method):
+    return "#indexOf: %s" % equals_method.merge_point_string()
+
+
+index_of_driver = JitDriver(
+    greens=["equals_method"],
+    reds="auto",
+    is_recursive=True,
+    get_printable_location=index_of_pl,
+)
+
+# Integers in these ranges are stored as bytes or as 32-bit words
+BYTE_MAX = 0xFF
+WORD_MIN = -0x80000000
+WORD_MAX = 0x7FFFFFFF
+
+
+def _integer_strategy_for(value):
+    if 0 <= value <= BYTE_MAX:
+        return _byte_strategy
+    if WORD_MIN <= value <= WORD_MAX:
+        return _word_strategy
+    return _long_strategy
+
+
+def _index_of_object(store, value):
+    """Answer the index of the first element that is `=` to the value.
+
+    This sends #= to the elements, the loop is compiled separately for
+    each #= method."""
+    from som.vm.current import current_universe
+
+    i = 0
+    while i < len(store):
+        element = store[i]
+        equals_method = element.get_object_layout(current_universe).lookup_invokable(
+            current_universe.sym_equals
+        )
+        index_of_driver.jit_merge_point(equals_method=equals_method)
+
+        if equals_method is None:
+            # like the send of #= in the library method
+            result = lookup_and_send_3(
+                element,
+                current_universe.sym_equals,
+                Array.from_values([value]),
+                "doesNotUnderstand:arguments:",
+            )
+        elif is_tier2() or is_hybrid():
+            result = equals_method.invoke_2_tier2(element, value)
+        else:
+            result = equals_method.invoke_2(element, value)
+        if result is trueObject:
+            return i
+        i += 1
+    return -1
+
+
 class _ArrayStrategy(object):
+
+    # Integer strategies are ordered by the range of values they can store,
+    # the other strategies cannot store integers
+    integer_rank = 0
+
     @staticmethod
     def _set_all_with_value(array, value, size):
         if value is nilObject:
             array.storage = _empty_strategy.new_storage_for(size)
             array.strategy = _empty_strategy
         elif isinstance(value, Integer):
-            int_arr = [value.get_embedded_integer()] * size
-            array.storage = _long_strategy.erase(int_arr)
-            array.strategy = _long_strategy
+            int_value = value.get_embedded_integer()
+            strategy = _integer_strategy_for(int_value)
+            if strategy is _byte_strategy:
+                array.storage = _byte_strategy.erase([chr(int_value)] * size)
+            elif strategy is _word_strategy:
+                array.storage = _word_strategy.erase([r_int32(int_value)] * size)
+            else:
+                array.storage = _long_strategy.erase([int_value] * size)
+            array.strategy = strategy
         elif isinstance(value, Double):
             double_arr = [value.get_embedded_double()] * size
             array.storage = _double_strategy.erase(double_arr)
@@ -175,7 +245,7 @@ class _ArrayStrategy(object):
                 # something else, so, let's go to the object strategy
                 new_storage = [None] * size
                 for i in range(0, next_i + 1):
-                    new_storage[i] = Integer(storage[i])
+                    new_storage[i] = make_integer(storage[i])
                 _ArrayStrategy._set_remaining_with_block_as_obj(
                     array, block, size, next_i + 1, new_storage
                 )
@@ -251,6 +321,54 @@ class _ArrayStrategy(object):
         array.strategy = _obj_strategy
         array.storage = _obj_strategy.erase(storage)
 
+    def _generalize(self, array, idx, value):
+        """Move the values of a byte or word array to a strategy that can
+        also store the new value."""
+        values = self.as_arguments_array(array.storage)
+        values[idx] = value
+        if isinstance(value, Integer):
+            strategy = _integer_strategy_for(value.get_embedded_integer())
+        else:
+            strategy = _obj_strategy
+        array.storage = strategy.new_storage_with_values(values)
+        array.strategy = strategy
+
+    def copy_range(self, storage, start, length):
+        """Copy the length elements from the 0-based start index."""
+        if start < 0 or length < 0 or start + length > self.get_size(storage):
+            raise IndexError()
+        return self._copy_range(storage, start, length)
+
+    def _copy_range(self, storage, start, length):
+        values = [None] * length
+        for i in range(length):
+            values[i] = self.get_idx(storage, start + i)
+        return Array.from_values(values)
+
+    def index_of(self, storage, value):
+        return _index_of_object(self.as_arguments_array(storage), value)
+
+    def replace_range(self, array, start, length, other, other_start):
+        """Replace the length elements from the 0-based start index with the
+        elements of other from the 0-based other_start index."""
+        if (
+            start < 0
+            or length < 0
+            or other_start < 0
+            or start + length > self.get_size(array.storage)
+            or other_start + length > other.get_number_of_indexable_fields()
+        ):
+            raise IndexError()
+        self._replace_range(array, start, length, other, other_start)
+
+    def _replace_range(self, array, start, length, other, other_start):
+        # read first, in case array and other are the same
+        values = [None] * length
+        for i in range(length):
+            values[i] = other.get_indexable_field(other_start + i)
+        for i in range(length):
+            array.set_indexable_field(start + i, values[i])
+
 
 class _ObjectStrategy(_ArrayStrategy):
 
@@ -298,6 +416,24 @@ class _ObjectStrategy(_ArrayStrategy):
         make_sure_not_resized(values)
         return _ObjectStrategy.erase(values)
 
+    def _copy_range(self, storage, start, length):
+        assert start >= 0 and length >= 0
+        store = self.unerase(storage)
+        return Array(_obj_strategy, self.erase(store[start : start + length]))
+
+    def _replace_range(self, array, start, length, other, other_start):
+        if other.strategy is not self:
+            _ArrayStrategy._replace_range(
+                self, array, start, length, other, other_start
+            )
+            return
+
+        assert other_start >= 0 and length >= 0
+        store = self.unerase(array.storage)
+        source = self.unerase(other.storage)[other_start : other_start + length]
+        for i in range(length):
+            store[start + i] = source[i]
+
     def copy(self, storage):
         store = self.unerase(storage)
         return Array(_obj_strategy, self.erase(store[:]))
@@ -323,11 +459,13 @@ class _LongStrategy(_ArrayStrategy):
     erase = staticmethod(erase)
     unerase = staticmethod(unerase)
 
+    integer_rank = 3
+
     def get_idx(self, storage, idx):
         store = self.unerase(storage)
         assert isinstance(store, list)
         assert isinstance(store[idx], IntType)
-        return Integer(store[idx])
+        return make_integer(store[idx])
 
     def set_idx(self, array, idx, value):
         assert isinstance(array, Array)
@@ -341,7 +479,7 @@ class _LongStrategy(_ArrayStrategy):
         store = self.unerase(array.storage)
         new_store = [None] * len(store)
         for i, val in enumerate(store):
-            new_store[i] = Integer(val)
+            new_store[i] = make_integer(val)
 
         new_store[idx] = value
         array.storage = _ObjectStrategy.new_storage_with_values(new_store)
@@ -366,7 +504,7 @@ class _LongStrategy(_ArrayStrategy):
 
     def as_arguments_array(self, storage):
         store = self.unerase(storage)
-        return [Integer(v) for v in store]
+        return [make_integer(v) for v in store]
 
     def get_size(self, storage):
         return len(self.unerase(storage))
@@ -383,6 +521,38 @@ class _LongStrategy(_ArrayStrategy):
         new = [v.get_embedded_integer() for v in values]
         return _LongStrategy.erase(new)
 
+    def _copy_range(self, storage, start, length):
+        assert start >= 0 and length >= 0
+        store = self.unerase(storage)
+        return Array(_long_strategy, self.erase(store[start : start + length]))
+
+    def _replace_range(self, array, start, length, other, other_start):
+        if other.strategy is not self:
+            _ArrayStrategy._replace_range(
+                self, array, start, length, other, other_start
+            )
+            return
+
+        assert other_start >= 0 and length >= 0
+        store = self.unerase(array.storage)
+        source = self.unerase(other.storage)[other_start : other_start + length]
+        for i in range(length):
+            store[start + i] = source[i]
+
+    def index_of(self, storage, value):
+        store = self.unerase(storage)
+        if isinstance(value, Integer):
+            int_value = value.get_embedded_integer()
+            for i, element in enumerate(store):
+                if element == int_value:
+                    return i
+        elif isinstance(value, Double):
+            double_value = value.get_embedded_double()
+            for i, element in enumerate(store):
+                if float(element) == double_value:
+                    return i
+        return -1
+
     def copy(self, storage):
         store = self.unerase(storage)
         return Array(_long_strategy, self.erase(store[:]))
@@ -457,6 +627,37 @@ class _DoubleStrategy(_ArrayStrategy):
         new = [v.get_embedded_double() for v in values]
         return _DoubleStrategy.erase(new)
 
+    def _copy_range(self, storage, start, length):
+        assert start >= 0 and length >= 0
+        store = self.unerase(storage)
+        return Array(_double_strategy, self.erase(store[start : start + length]))
+
+    def _replace_range(self, array, start, length, other, other_start):
+        if other.strategy is not self:
+            _ArrayStrategy._replace_range(
+                self, array, start, length, other, other_start
+            )
+            return
+
+        assert other_start >= 0 and length >= 0
+        store = self.unerase(array.storage)
+        source = self.unerase(other.storage)[other_start : other_start + length]
+        for i in range(length):
+            store[start + i] = source[i]
+
+    def index_of(self, storage, value):
+        store = self.unerase(storage)
+        if isinstance(value, Double):
+            double_value = value.get_embedded_double()
+        elif isinstance(value, Integer):
+            double_value = float(value.get_embedded_integer())
+        else:
+            return -1
+        for i, element in enumerate(store):
+            if element == double_value:
+                return i
+        return -1
+
     def copy(self, storage):
         store = self.unerase(storage)
         return Array(_double_strategy, self.erase(store[:]))
@@ -531,6 +732,34 @@ class _BoolStrategy(_ArrayStrategy):
         new = [v is trueObject for v in values]
         return _BoolStrategy.erase(new)
 
+    def _copy_range(self, storage, start, length):
+        assert start >= 0 and length >= 0
+        store = self.unerase(storage)
+        return Array(_bool_strategy, self.erase(store[start : start + length]))
+
+    def _replace_range(self, array, start, length, other, other_start):
+        if other.strategy is not self:
+            _ArrayStrategy._replace_range(
+                self, array, start, length, other, other_start
+            )
+            return
+
+        assert other_start >= 0 and length >= 0
+        store = self.unerase(array.storage)
+        source = self.unerase(other.storage)[other_start : other_start + length]
+        for i in range(length):
+            store[start + i] = source[i]
+
+    def index_of(self, storage, value):
+        if value is not trueObject and value is not falseObject:
+            return -1
+        bool_value = value is trueObject
+        store = self.unerase(storage)
+        for i, element in enumerate(store):
+            if element == bool_value:
+                return i
+        return -1
+
     def copy(self, storage):
         store = self.unerase(storage)
         return Array(_bool_strategy, self.erase(store[:]))
@@ -551,6 +780,200 @@ class _BoolStrategy(_ArrayStrategy):
         return Array(_bool_strategy, self.erase(new))
 
 
+class _ByteStrategy(_ArrayStrategy):
+    # Integers between 0 and BYTE_MAX, stored as characters, which RPython
+    # stores as a single byte
+
+    erase, unerase = new_erasing_pair("byte_list")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    integer_rank = 1
+
+    def get_idx(self, storage, idx):
+        store = self.unerase(storage)
+        return make_integer(ord(store[idx]))
+
+    def set_idx(self, array, idx, value):
+        assert isinstance(array, Array)
+        if isinstance(value, Integer):
+            int_value = value.get_embedded_integer()
+            if 0 <= int_value <= BYTE_MAX:
+                store = self.unerase(array.storage)
+                store[idx] = chr(int_value)
+                return
+        self._generalize(array, idx, value)
+
+    def set_all(self, array, value):
+        assert isinstance(array, Array)
+
+        store = self.unerase(array.storage)
+        self._set_all_with_value(array, value, len(store))
+
+    def set_all_with_block(self, array, block):
+        assert isinstance(array, Array)
+        store = self.unerase(array.storage)
+        self._set_all_with_block(array, block, len(store))
+
+    def as_arguments_array(self, storage):
+        store = self.unerase(storage)
+        return [make_integer(ord(v)) for v in store]
+
+    def get_size(self, storage):
+        return len(self.unerase(storage))
+
+    @staticmethod
+    def new_storage_for(size):
+        return _ByteStrategy.erase(["\x00"] * size)
+
+    @staticmethod
+    def new_storage_with_values(values):
+        assert isinstance(values, list)
+        make_sure_not_resized(values)
+        new = [chr(v.get_embedded_integer()) for v in values]
+        return _ByteStrategy.erase(new)
+
+    def _copy_range(self, storage, start, length):
+        assert start >= 0 and length >= 0
+        store = self.unerase(storage)
+        return Array(_byte_strategy, self.erase(store[start : start + length]))
+
+    def _replace_range(self, array, start, length, other, other_start):
+        if other.strategy is not self:
+            _ArrayStrategy._replace_range(
+                self, array, start, length, other, other_start
+            )
+            return
+
+        assert other_start >= 0 and length >= 0
+        store = self.unerase(array.storage)
+        source = self.unerase(other.storage)[other_start : other_start + length]
+        for i in range(length):
+            store[start + i] = source[i]
+
+    def index_of(self, storage, value):
+        store = self.unerase(storage)
+        if isinstance(value, Integer):
+            int_value = value.get_embedded_integer()
+            if not 0 <= int_value <= BYTE_MAX:
+                return -1
+            byte = chr(int_value)
+            for i, element in enumerate(store):
+                if element == byte:
+                    return i
+        elif isinstance(value, Double):
+            double_value = value.get_embedded_double()
+            for i, element in enumerate(store):
+                if float(ord(element)) == double_value:
+                    return i
+        return -1
+
+    def copy(self, storage):
+        store = self.unerase(storage)
+        return Array(_byte_strategy, self.erase(store[:]))
+
+    def copy_and_extend_with(self, storage, value):
+        store = self.unerase(storage)
+        new_arr = Array(_byte_strategy, self.erase(store + ["\x00"]))
+        new_arr.set_indexable_field(len(store), value)
+        return new_arr
+
+
+class _WordStrategy(_ArrayStrategy):
+    # Integers between WORD_MIN and WORD_MAX, stored as 32-bit words
+
+    erase, unerase = new_erasing_pair("word_list")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    integer_rank = 2
+
+    def get_idx(self, storage, idx):
+        store = self.unerase(storage)
+        return make_integer(intmask(store[idx]))
+
+    def set_idx(self, array, idx, value):
+        assert isinstance(array, Array)
+        if isinstance(value, Integer):
+            int_value = value.get_embedded_integer()
+            if WORD_MIN <= int_value <= WORD_MAX:
+                store = self.unerase(array.storage)
+                store[idx] = r_int32(int_value)
+                return
+        self._generalize(array, idx, value)
+
+    def set_all(self, array, value):
+        assert isinstance(array, Array)
+
+        store = self.unerase(array.storage)
+        self._set_all_with_value(array, value, len(store))
+
+    def set_all_with_block(self, array, block):
+        assert isinstance(array, Array)
+        store = self.unerase(array.storage)
+        self._set_all_with_block(array, block, len(store))
+
+    def as_arguments_array(self, storage):
+        store = self.unerase(storage)
+        return [make_integer(intmask(v)) for v in store]
+
+    def get_size(self, storage):
+        return len(self.unerase(storage))
+
+    @staticmethod
+    def new_storage_for(size):
+        return _WordStrategy.erase([r_int32(0)] * size)
+
+    @staticmethod
+    def new_storage_with_values(values):
+        assert isinstance(values, list)
+        make_sure_not_resized(values)
+        new = [r_int32(v.get_embedded_integer()) for v in values]
+        return _WordStrategy.erase(new)
+
+    def _copy_range(self, storage, start, length):
+        assert start >= 0 and length >= 0
+        store = self.unerase(storage)
+        return Array(_word_strategy, self.erase(store[start : start + length]))
+
+    def _replace_range(self, array, start, length, other, other_start):
+        if other.strategy is not self:
+            _ArrayStrategy._replace_range(
+                self, array, start, length, other, other_start
+            )
+            return
+
+        assert other_start >= 0 and length >= 0
+        store = self.unerase(array.storage)
+        source = self.unerase(other.storage)[other_start : other_start + length]
+        for i in range(length):
+            store[start + i] = source[i]
+
+    def index_of(self, storage, value):
+        store = self.unerase(storage)
+        if isinstance(value, Integer):
+            int_value = value.get_embedded_integer()
+            for i, element in enumerate(store):
+                if intmask(element) == int_value:
+                    return i
+        elif isinstance(value, Double):
+            double_value = value.get_embedded_double()
+            for i, element in enumerate(store):
+                if float(intmask(element)) == double_value:
+                    return i
+        return -1
+
+    def copy(self, storage):
+        store = self.unerase(storage)
+        return Array(_word_strategy, self.erase(store[:]))
+
+    def copy_and_extend_with(self, storage, value):
+        store = self.unerase(storage)
+        new_arr = Array(_word_strategy, self.erase(store + [r_int32(0)]))
+        new_arr.set_indexable_field(len(store), value)
+        return new_arr
+
+
 class _EmptyStrategy(_ArrayStrategy):
 
     # We have these basic erase/unerase methods, and then the once to be used, which
@@ -618,6 +1041,19 @@ class _EmptyStrategy(_ArrayStrategy):
     def new_storage_with_values(values):
         return _empty_strategy.erase(len(values))
 
+    def _copy_range(self, storage, start, length):
+        return Array.from_size(length)
+
+    def index_of(self, storage, value):
+        if value is nilObject and self.unerase(storage) > 0:
+            return 0
+        return -1
+
+    def _replace_range(self, array, start, length, other, other_start):
+        if other.strategy is self:
+            return  # everything is nil already
+        _ArrayStrategy._replace_range(self, array, start, length, other, other_start)
+
     def copy(self, storage):  # pylint: disable=no-self-use
         return Array(_empty_strategy, storage)
 
@@ -685,10 +1121,13 @@ class _PartiallyEmptyStrategy(_ArrayStrategy):
         store.storage[idx] = value
 
         if isinstance(value, Integer):
+            int_strategy = _integer_strategy_for(value.get_embedded_integer())
             if store.type is None:
-                store.type = _long_strategy
-            elif store.type is not _long_strategy:
+                store.type = int_strategy
+            elif store.type.integer_rank == 0:
                 store.type = _obj_strategy
+            elif store.type.integer_rank < int_strategy.integer_rank:
+                store.type = int_strategy
         elif isinstance(value, Double):
             if store.type is None:
                 store.type = _double_strategy
@@ -763,6 +1202,8 @@ _obj_strategy = _ObjectStrategy()
 _long_strategy = _LongStrategy()
 _double_strategy = _DoubleStrategy()
 _bool_strategy = _BoolStrategy()
+_byte_strategy = _ByteStrategy()
+_word_strategy = _WordStrategy()
 _empty_strategy = _EmptyStrategy()
 _partially_empty_strategy = _PartiallyEmptyStrategy()
 
@@ -772,6 +1213,7 @@ def _determine_strategy(values):
     only_double = True
     only_long = True
     only_bool = True
+    integer_strategy = _byte_strategy
     for value in values:
         if value is None or value is nilObject:
             continue
@@ -779,6 +1221,12 @@ def _determine_strategy(values):
             is_empty = False
             only_double = False
             only_bool = False
+            if isinstance(value, Integer):
+                strategy = _integer_strategy_for(value.get_embedded_integer())
+            else:
+                strategy = _long_strategy
+            if strategy.integer_rank > integer_strategy.integer_rank:
+                integer_strategy = strategy
             continue
         if isinstance(value, float) or isinstance(value, Double):
             is_empty = False
@@ -800,7 +1248,7 @@ def _determine_strategy(values):
     if only_double:
         return _double_strategy
     if only_long:
-        return _long_strategy
+        return integer_strategy
     if only_bool:
         return _bool_strategy
     return _obj_strategy
@@ -865,6 +1313,19 @@ class Array(AbstractObject):
     def copy_and_extend_with(self, value):
         return self.strategy.copy_and_extend_with(self.storage, value)
 
+    def copy_range(self, start, length):
+        # Copy the length elements from the 0-based start index
+        return self.strategy.copy_range(self.storage, start, length)
+
+    def index_of(self, value):
+        # Get the 0-based index of the first element `=` to value, or -1
+        return self.strategy.index_of(self.storage, value)
+
+    def replace_range(self, start, length, other, other_start):
+        # Replace the length elements from the 0-based start index with the
+        # elements of other from the 0-based other_start index
+        self.strategy.replace_range(self, start, length, other, other_start)
+
     def get_class(self, universe):
         return universe.array_class
 
@@ -1,11 +1,12 @@
 from rlib import jit
 from som.vm.globals import nilObject
 from som.vmobjects.array import Array
-from som.vmobjects.object_with_layout import Object
+from som.vmobjects.method_lazy import LazyMethod
+from som.vmobjects.object_with_layout import Object, Object16
 from som.interpreter.objectstorage.object_layout import ObjectLayout
 
 
-class Class(Object):
+class Class(Object16):
 
     _immutable_fields_ = [
         "_super_class",
@@ -17,7 +18,7 @@ class Class(Object):
     ]
 
     def __init__(self, number_of_fields=Object.NUMBER_OF_OBJECT_FIELDS, obj_class=None):
-        Object.__init__(
+        Object16.__init__(
             self, obj_class.get_layout_for_instances() if obj_class else None
         )
         self._super_class = nilObject
@@ -63,6 +64,7 @@ class Class(Object):
         if not self._invokables_table:
             return Array.from_size(0)
 
+        self._compile_lazy_methods()
         result = [None] * len(self._invokables_table)
 
         i = 0
@@ -73,6 +75,9 @@ class Class(Object):
         return Array.from_objects(result)
 
     def set_instance_invokables(self, value, has_primitives):
+        from som.vm.current import current_universe
+
+        current_universe.invalidate_lookup_cache()
         self.has_primitives = has_primitives
 
         if not value:
@@ -91,10 +96,34 @@ class Class(Object):
         tbl = self._invokables_table
         if tbl is None:
             return []
+        self._compile_lazy_methods()
         return tbl.values()
 
-    @jit.elidable_promote("all")
+    def _compile_lazy_methods(self):
+        for signature, invokable in self._invokables_table.items():
+            if isinstance(invokable, LazyMethod):
+                self._invokables_table[signature] = invokable.compile()
+
     def lookup_invokable(self, signature):
+        invokable = self._lookup_invokable(signature)
+        if isinstance(invokable, LazyMethod):
+            # compile the method body on first use, outside of the elidable
+            # lookup, because parsing can fail and changes the table
+            invokable = self._compile_lazy_method(signature, invokable)
+        return invokable
+
+    @jit.dont_look_inside
+    def _compile_lazy_method(self, signature, lazy_method):
+        method = lazy_method.compile()
+        self._invokables_table[signature] = method
+        # subclasses cache the methods they inherit
+        holder = lazy_method.get_holder()
+        if holder._invokables_table.get(signature, None) is lazy_method:
+            holder._invokables_table[signature] = method
+        return method
+
+    @jit.elidable_promote("all")
+    def _lookup_invokable(self, signature):
         # Lookup invokable and return if found
         if self._invokables_table:
             invokable = self._invokables_table.get(signature, None)
@@ -103,7 +132,7 @@ class Class(Object):
 
         # Traverse the super class chain by calling lookup on the super class
         if self.has_super_class():
-            invokable = self.get_super_class().lookup_invokable(signature)
+            invokable = self.get_super_class()._lookup_invokable(signature)
             if invokable:
                 if not self._invokables_table:
                     self._invokables_table = {}
@@ -145,6 +174,10 @@ class Class(Object):
             self._invokables_table = {}
         self._invokables_table[value.get_signature()] = value
 
+        from som.vm.current import current_universe
+
+        current_universe.invalidate_lookup_cache()
+
     def get_instance_field_name(self, index):
         return self.get_instance_fields().get_indexable_field(index)
 
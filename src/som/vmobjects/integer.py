@@ -1,4 +1,5 @@
 from rlib.arithmetic import ovfcheck, bigint_from_int, divrem, IntType
+from rlib.jit import we_are_jitted
 from rlib.llop import as_32_bit_signed_value, int_mod, Signed
 
 from som.vmobjects.abstract_object import AbstractObject
@@ -112,11 +113,11 @@ class Integer(AbstractObject):
         return Double(float(self._embedded_integer))
 
     def prim_abs(self):
-        return Integer(abs(self._embedded_integer))
+        return make_integer(abs(self._embedded_integer))
 
     def prim_as_32_bit_signed_value(self):
         val = as_32_bit_signed_value(self._embedded_integer)
-        return Integer(val)
+        return make_integer(val)
 
     def prim_inc(self):
         from som.vmobjects.biginteger import BigInteger
@@ -124,7 +125,7 @@ class Integer(AbstractObject):
         l = self._embedded_integer
         try:
             result = ovfcheck(l + 1)
-            return Integer(result)
+            return make_integer(result)
         except OverflowError:
             return BigInteger(bigint_from_int(l).add(bigint_from_int(1)))
 
@@ -134,7 +135,7 @@ class Integer(AbstractObject):
         l = self._embedded_integer
         try:
             result = ovfcheck(l - 1)
-            return Integer(result)
+            return make_integer(result)
         except OverflowError:
             return BigInteger(bigint_from_int(l).sub(bigint_from_int(1)))
 
@@ -154,7 +155,7 @@ class Integer(AbstractObject):
         r = right.get_embedded_integer()
         try:
             result = ovfcheck(l + r)
-            return Integer(result)
+            return make_integer(result)
         except OverflowError:
             return BigInteger(bigint_from_int(l).add(bigint_from_int(r)))
 
@@ -173,7 +174,7 @@ class Integer(AbstractObject):
         r = right.get_embedded_integer()
         try:
             result = ovfcheck(l - r)
-            return Integer(result)
+            return make_integer(result)
         except OverflowError:
             return BigInteger(bigint_from_int(l).sub(bigint_from_int(r)))
 
@@ -192,7 +193,7 @@ class Integer(AbstractObject):
         r = right.get_embedded_integer()
         try:
             result = ovfcheck(l * r)
-            return Integer(result)
+            return make_integer(result)
         except OverflowError:
             return BigInteger(bigint_from_int(l).mul(bigint_from_int(r)))
 
@@ -224,7 +225,7 @@ class Integer(AbstractObject):
             return self._to_double().prim_int_div(right)
         l = self._embedded_integer
         r = right.get_embedded_integer()
-        return Integer(l // r)
+        return make_integer(l // r)
 
     def prim_modulo(self, right):
         from som.vmobjects.double import Double
@@ -239,7 +240,7 @@ class Integer(AbstractObject):
             return self._to_double().prim_modulo(right)
         l = self._embedded_integer
         r = right.get_embedded_integer()
-        return Integer(l % r)
+        return make_integer(l % r)
 
     def prim_remainder(self, right):
         from som.vmobjects.double import Double
@@ -254,7 +255,7 @@ class Integer(AbstractObject):
             return self._to_double().prim_remainder(right)
         l = self._embedded_integer
         r = right.get_embedded_integer()
-        return Integer(int_mod(Signed, l, r))
+        return make_integer(int_mod(Signed, l, r))
 
     def prim_and(self, right):
         from som.vmobjects.double import Double
@@ -269,7 +270,7 @@ class Integer(AbstractObject):
             return self._to_double().prim_and(right)
         l = self._embedded_integer
         r = right.get_embedded_integer()
-        return Integer(l & r)
+        return make_integer(l & r)
 
     def prim_equals(self, right):
         from som.vmobjects.double import Double
@@ -316,3 +317,58 @@ class Integer(AbstractObject):
 
 int_0 = Integer(0)
 int_1 = Integer(1)
+
+SMALL_INTEGER_MIN = -128
+SMALL_INTEGER_MAX = 1023
+
+# the most Integers --small-integers may preallocate
+SMALL_INTEGER_RANGE_LIMIT = 65536
+
+
+def is_valid_small_integer_range(min_value, max_value):
+    """Whether the range is empty or has at most SMALL_INTEGER_RANGE_LIMIT
+    values. The difference wraps around for huge ranges in RPython, and
+    then is negative."""
+    if max_value < min_value:
+        return True
+    return 0 <= max_value - min_value < SMALL_INTEGER_RANGE_LIMIT
+
+
+class _SmallIntegers(object):
+    """Preallocated Integers for the values of a small range.
+
+    Only the interpreter takes results from the cache. Compiled code
+    allocates Integers as virtuals that the JIT removes, and a lookup
+    would force them into the heap."""
+
+    def __init__(self, min_value, max_value):
+        self.min_value = 0
+        self.max_value = -1
+        self.integers = []
+        self.set_range(min_value, max_value)
+
+    def set_range(self, min_value, max_value):
+        """An empty range, with max_value < min_value, disables the cache."""
+        integers = []
+        for value in range(min_value, max_value + 1):
+            if value == 0:
+                integers.append(int_0)
+            elif value == 1:
+                integers.append(int_1)
+            else:
+                integers.append(Integer(value))
+        self.integers = integers
+        self.min_value = min_value
+        self.max_value = max_value
+
+
+small_integers = _SmallIntegers(SMALL_INTEGER_MIN, SMALL_INTEGER_MAX)
+
+
+def make_integer(value):
+    """Box the value, sharing the Integers of the small-integer cache."""
+    if not we_are_jitted():
+        cache = small_integers
+        if cache.min_value <= value <= cache.max_value:
+            return cache.integers[value - cache.min_value]
+    return Integer(value)
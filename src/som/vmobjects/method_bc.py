@@ -40,20 +40,35 @@ from som.interpreter.bc.frame import (
     create_frame_3,
     create_frame_4
 )
-from som.interpreter.bc.interpreter import interpret
-from som.interpreter.bc.interpreter_tier2 import interpret_tier2
+from som.interpreter.bc.interpreter import interpret, interpret_in_tier2
 from som.interpreter.control_flow import ReturnException
 from som.vmobjects.abstract_object import AbstractObject
 from som.vmobjects.method import AbstractMethod
 
+# maximum number of (layout, invokable) pairs in the inline cache of a call
+# site, same as INLINE_CACHE_SIZE of the AST interpreter's dispatch chains.
+# A call site that sees more layouts becomes megamorphic.
+INLINE_CACHE_SIZE = 6
+INLINE_CACHE_MEGAMORPHIC = INLINE_CACHE_SIZE + 1
+
+
+class _InlineCacheEntry(object):
+
+    _immutable_fields_ = ["layout", "invokable", "next_entry"]
+
+    def __init__(self, layout, invokable, next_entry):
+        self.layout = layout
+        self.invokable = invokable
+        self.next_entry = next_entry
+
 
 class BcAbstractMethod(AbstractMethod):
 
     _immutable_fields_ = [
         "_bytecodes?[*]",
         #"_literals[*]",
-        "_inline_cache_layout",
-        "_inline_cache_invokable",
+        "_inline_caches",
+        "_inline_cache_states",
         "_number_of_locals",
         "_maximum_number_of_stack_elements",
         "_number_of_arguments",
@@ -61,6 +76,9 @@ class BcAbstractMethod(AbstractMethod):
         "_size_frame",
         "_size_inner",
         "_inlined_loops[*]",
+        "_call_sites[*]",
+        "tier_up_policy_epoch?",
+        "tier2_demoted?",
     ]
 
     def __init__(
@@ -75,19 +93,28 @@ class BcAbstractMethod(AbstractMethod):
         size_inner,
         lexical_scope,
         inlined_loops,
+        call_sites,
+        num_call_sites,
     ):
         AbstractMethod.__init__(self, signature, lexical_scope)
 
         # Set the number of bytecodes in this method
         self._bytecodes = ["\x00"] * num_bytecodes
-        self._inline_cache_layout = [None] * num_bytecodes
-        self._inline_cache_invokable = [None] * num_bytecodes
 
-        self._receiver_types = [None] * num_bytecodes
-        self._selectors = [None] * num_bytecodes
-        self._invokable = [None] * num_bytecodes
+        # the profiling data is only needed for sends, returns, and loop
+        # jumps, so it is kept in a dense table, indexed by call site
+        self._call_sites = call_sites
+        self._inline_caches = [None] * num_call_sites
+        # number of cached layouts, or INLINE_CACHE_MEGAMORPHIC
+        self._inline_cache_states = [0] * num_call_sites
 
-        self._counts = [0] * num_bytecodes
+        self._receiver_types = [None] * num_call_sites
+
+        self._counts = [0] * num_call_sites
+        self.tier_up_policy = None
+        self.tier_up_policy_epoch = -1
+        self.tier2_demoted = False
+        self.tier2_cool_down = 0
 
         self._literals = literals
 
@@ -168,19 +195,81 @@ class BcAbstractMethod(AbstractMethod):
         ), "Expected bytecode in the range of [0..255], but was: " + str(value)
         self._bytecodes[index] = chr(value)
 
+    def get_call_site(self, bytecode_index):
+        assert 0 <= bytecode_index < len(self._call_sites)
+        call_site = self._call_sites[bytecode_index]
+        assert call_site >= 0, "No call site at bytecode index " + str(
+            bytecode_index
+        )
+        return call_site
+
+    def get_number_of_call_sites(self):
+        return len(self._counts)
+
     @jit.elidable
     def get_inline_cache_layout(self, bytecode_index):
-        assert 0 <= bytecode_index < len(self._inline_cache_layout)
-        return self._inline_cache_layout[bytecode_index]
+        entry = self._inline_caches[self.get_call_site(bytecode_index)]
+        if entry is None:
+            return None
+        return entry.layout
 
     @jit.elidable
     def get_inline_cache_invokable(self, bytecode_index):
-        assert 0 <= bytecode_index < len(self._inline_cache_invokable)
-        return self._inline_cache_invokable[bytecode_index]
+        entry = self._inline_caches[self.get_call_site(bytecode_index)]
+        if entry is None:
+            return None
+        return entry.invokable
 
     def set_inline_cache(self, bytecode_index, layout, invokable):
-        self._inline_cache_layout[bytecode_index] = layout
-        self._inline_cache_invokable[bytecode_index] = invokable
+        call_site = self.get_call_site(bytecode_index)
+        self._inline_caches[call_site] = _InlineCacheEntry(layout, invokable, None)
+        self._inline_cache_states[call_site] = 1
+
+    def get_inline_cache_state(self, bytecode_index):
+        return self._inline_cache_states[self.get_call_site(bytecode_index)]
+
+    def lookup_with_inline_cache(self, layout, selector, bytecode_index):
+        from som.vm.current import current_universe
+
+        call_site = self.get_call_site(bytecode_index)
+        state = self._inline_cache_states[call_site]
+        if state == INLINE_CACHE_MEGAMORPHIC:
+            return current_universe.lookup_invokable(layout, selector)
+
+        entry = self._inline_caches[call_site]
+        while entry is not None:
+            if entry.layout is layout:
+                return entry.invokable
+            entry = entry.next_entry
+
+        invokable = current_universe.lookup_invokable(layout, selector)
+        if state < INLINE_CACHE_SIZE:
+            self._inline_caches[call_site] = _InlineCacheEntry(
+                layout, invokable, self._inline_caches[call_site]
+            )
+            self._inline_cache_states[call_site] = state + 1
+        else:
+            self._inline_caches[call_site] = None
+            self._inline_cache_states[call_site] = INLINE_CACHE_MEGAMORPHIC
+        return invokable
+
+    def invalidate_outdated_inline_cache_entries(self, bytecode_index):
+        """Drop the entries for layouts that are no longer the latest."""
+        call_site = self.get_call_site(bytecode_index)
+        if self._inline_cache_states[call_site] == INLINE_CACHE_MEGAMORPHIC:
+            return
+
+        entry = self._inline_caches[call_site]
+        new_head = None
+        num_entries = 0
+        while entry is not None:
+            if entry.layout.is_latest:
+                new_head = _InlineCacheEntry(entry.layout, entry.invokable, new_head)
+                num_entries += 1
+            entry = entry.next_entry
+
+        self._inline_caches[call_site] = new_head
+        self._inline_cache_states[call_site] = num_entries
 
     def patch_variable_access(self, bytecode_index):
         bc = self.get_bytecode(bytecode_index)
@@ -216,32 +305,21 @@ class BcAbstractMethod(AbstractMethod):
         self.set_bytecode(bytecode_index + 1, var.access_idx)
 
     def set_receiver_type(self, bytecode_index, receiver_type):
-        self._receiver_types[bytecode_index] = receiver_type
+        self._receiver_types[self.get_call_site(bytecode_index)] = receiver_type
 
     @jit.elidable_promote("all")
     def get_receiver_type(self, bytecode_index):
-        assert 0 <= bytecode_index < len(self._receiver_types)
-        return self._receiver_types[bytecode_index]
-
-    def set_invokable(self, bytecode_index, invokable):
-        self._invokable[bytecode_index] = invokable
-
-    @jit.elidable
-    def get_invokable(self, bytecode_index):
-        assert 0 <= bytecode_index < len(self._invokable)
-        return self._invokable[bytecode_index]
-
-    @jit.elidable
-    def has_invokable(self, bytecode_index):
-        return self._invokable[bytecode_index] is not None
+        return self._receiver_types[self.get_call_site(bytecode_index)]
 
     def get_count(self, bytecode_index):
-        assert 0 <= bytecode_index < len(self._counts)
-        return self._counts
+        return self._counts[self.get_call_site(bytecode_index)]
 
     def incr_count(self, bytecode_index):
-        assert 0 <= bytecode_index < len(self._counts)
-        self._counts[bytecode_index] += 1
+        self._counts[self.get_call_site(bytecode_index)] += 1
+
+    def reset_counts(self):
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
 
 
 def _interp_with_nlr(method, new_frame, max_stack_size):
@@ -262,7 +340,7 @@ def _interp_with_nlr_tier2(method, new_frame, max_stack_size):
     inner = get_inner_as_context(new_frame)
 
     try:
-        result = interpret_tier2(method, new_frame, max_stack_size)
+        result = interpret_in_tier2(method, new_frame, max_stack_size)
         mark_as_no_longer_on_stack(inner)
         return result
     except ReturnException as e:
@@ -279,7 +357,7 @@ class BcMethod(BcAbstractMethod):
 
     def invoke_1_tier2(self, rcvr, ctx=None):
         new_frame = create_frame_1(rcvr, self._size_frame, self._size_inner)
-        return interpret_tier2(self, new_frame, self._maximum_number_of_stack_elements)
+        return interpret_in_tier2(self, new_frame, self._maximum_number_of_stack_elements)
 
     def invoke_2(self, rcvr, arg1, ctx=None):
         new_frame = create_frame_2(
@@ -299,7 +377,7 @@ class BcMethod(BcAbstractMethod):
             self._size_frame,
             self._size_inner,
         )
-        return interpret_tier2(self, new_frame, self._maximum_number_of_stack_elements)
+        return interpret_in_tier2(self, new_frame, self._maximum_number_of_stack_elements)
 
     def invoke_3(self, rcvr, arg1, arg2, ctx=None):
         new_frame = create_frame_3(
@@ -321,7 +399,7 @@ class BcMethod(BcAbstractMethod):
             arg1,
             arg2,
         )
-        return interpret_tier2(self, new_frame, self._maximum_number_of_stack_elements)
+        return interpret_in_tier2(self, new_frame, self._maximum_number_of_stack_elements)
 
     def invoke_4(self, rcvr, arg1, arg2, arg3, ctx=None):
         new_frame = create_frame_4(
@@ -345,7 +423,7 @@ class BcMethod(BcAbstractMethod):
             arg2,
             arg3
         )
-        return interpret_tier2(self, new_frame, self._maximum_number_of_stack_elements)
+        return interpret_in_tier2(self, new_frame, self._maximum_number_of_stack_elements)
 
     def invoke_n(self, stack, stack_ptr, ctx=None):
         new_frame = create_frame(
@@ -370,7 +448,7 @@ class BcMethod(BcAbstractMethod):
             stack_ptr,
             self._number_of_arguments,
         )
-        result = interpret_tier2(self, new_frame, self._maximum_number_of_stack_elements)
+        result = interpret_in_tier2(self, new_frame, self._maximum_number_of_stack_elements)
         return stack_pop_old_arguments_and_push_result(
             stack, stack_ptr, self._number_of_arguments, result
         )
@@ -550,12 +628,18 @@ class BcMethod(BcAbstractMethod):
                 or bytecode == Bytecodes.jump_on_false_top_nil
                 or bytecode == Bytecodes.jump_on_false_pop
                 or bytecode == Bytecodes.jump_if_greater
+                or bytecode == Bytecodes.jump_if_less
+                or bytecode == Bytecodes.jump_on_nil
+                or bytecode == Bytecodes.jump_on_not_nil
                 or bytecode == Bytecodes.jump2
                 or bytecode == Bytecodes.jump2_on_true_top_nil
                 or bytecode == Bytecodes.jump2_on_true_pop
                 or bytecode == Bytecodes.jump2_on_false_top_nil
                 or bytecode == Bytecodes.jump2_on_false_pop
                 or bytecode == Bytecodes.jump2_if_greater
+                or bytecode == Bytecodes.jump2_if_less
+                or bytecode == Bytecodes.jump2_on_nil
+                or bytecode == Bytecodes.jump2_on_not_nil
             ):
                 # emit the jump, but instead of the offset, emit a dummy
                 idx = emit3_with_dummy(mgenc, bytecode)
@@ -634,6 +718,9 @@ class BcMethod(BcAbstractMethod):
                 or bytecode == Bytecodes.jump_on_false_top_nil
                 or bytecode == Bytecodes.jump_on_false_pop
                 or bytecode == Bytecodes.jump_if_greater
+                or bytecode == Bytecodes.jump_if_less
+                or bytecode == Bytecodes.jump_on_nil
+                or bytecode == Bytecodes.jump_on_not_nil
                 or bytecode == Bytecodes.jump_backward
                 or bytecode == Bytecodes.jump2
                 or bytecode == Bytecodes.jump2_on_true_top_nil
@@ -641,6 +728,9 @@ class BcMethod(BcAbstractMethod):
                 or bytecode == Bytecodes.jump2_on_false_top_nil
                 or bytecode == Bytecodes.jump2_on_false_pop
                 or bytecode == Bytecodes.jump2_if_greater
+                or bytecode == Bytecodes.jump2_if_less
+                or bytecode == Bytecodes.jump2_on_nil
+                or bytecode == Bytecodes.jump2_on_not_nil
                 or bytecode == Bytecodes.jump2_backward
             ):
                 # don't use context
@@ -838,7 +928,7 @@ class BcMethodNLR(BcMethod):
         inner = get_inner_as_context(new_frame)
 
         try:
-            result = interpret_tier2(self, new_frame, self._maximum_number_of_stack_elements)
+            result = interpret_in_tier2(self, new_frame, self._maximum_number_of_stack_elements)
             stack_ptr = stack_pop_old_arguments_and_push_result(
                 stack, stack_ptr, self._number_of_arguments, result
             )
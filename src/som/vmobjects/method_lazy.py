@@ -0,0 +1,85 @@
+from rlib.string_stream import StringStream
+from som.vmobjects.method import AbstractMethod
+
+
+class LazyMethod(AbstractMethod):
+    """
+    Placeholder for a method of which only the pattern was parsed.
+
+    The body is compiled from its part of the class source, when the method
+    is first looked up. Class.lookup_invokable then replaces the LazyMethod
+    by the compiled method.
+    """
+
+    _immutable_fields_ = ["_method?"]
+
+    def __init__(self, signature, source, start_coord, file_name, cgenc, universe):
+        AbstractMethod.__init__(self, signature, None)
+        self._source = source
+        self._start_coord = start_coord
+        self._file_name = file_name
+        self._cgenc = cgenc
+        self._is_class_side = cgenc.is_class_side()
+        self._universe = universe
+        self._method = None
+
+    def set_holder(self, value):
+        self._holder = value
+
+    def compile(self):
+        if self._method is not None:
+            return self._method
+
+        from som.compiler.bc.parser import Parser
+
+        # indent the source, so that the lexer reports the original columns
+        source = " " * (self._start_coord.start_column - 1) + self._source
+        parser = Parser(
+            StringStream(source), self._file_name, self._universe, self._start_coord
+        )
+
+        self._cgenc.set_class_side(self._is_class_side)
+        method = parser.method_definition(self._cgenc)
+        method.set_holder(self._holder)
+
+        self._method = method
+        # the source and the class are not needed anymore
+        self._source = None
+        self._cgenc = None
+        return method
+
+    def get_number_of_arguments(self):
+        return self._signature.get_number_of_signature_arguments()
+
+    def get_number_of_signature_arguments(self):
+        return self._signature.get_number_of_signature_arguments()
+
+    def invoke_1(self, rcvr, ctx=None):
+        return self.compile().invoke_1(rcvr, ctx)
+
+    def invoke_1_tier2(self, rcvr, ctx=None):
+        return self.compile().invoke_1_tier2(rcvr, ctx)
+
+    def invoke_2(self, rcvr, arg1, ctx=None):
+        return self.compile().invoke_2(rcvr, arg1, ctx)
+
+    def invoke_2_tier2(self, rcvr, arg1, ctx=None):
+        return self.compile().invoke_2_tier2(rcvr, arg1, ctx)
+
+    def invoke_3(self, rcvr, arg1, arg2, ctx=None):
+        return self.compile().invoke_3(rcvr, arg1, arg2, ctx)
+
+    def invoke_3_tier2(self, rcvr, arg1, arg2, ctx=None):
+        return self.compile().invoke_3_tier2(rcvr, arg1, arg2, ctx)
+
+    def invoke_4(self, rcvr, arg1, arg2, arg3, ctx=None):
+        return self.compile().invoke_4(rcvr, arg1, arg2, arg3, ctx)
+
+    def invoke_4_tier2(self, rcvr, arg1, arg2, arg3, ctx=None):
+        return self.compile().invoke_4_tier2(rcvr, arg1, arg2, arg3, ctx)
+
+    def invoke_n(self, stack, stack_ptr, ctx=None):
+        return self.compile().invoke_n(stack, stack_ptr, ctx)
+
+    def invoke_n_tier2(self, stack, stack_ptr, ctx=None):
+        return self.compile().invoke_n_tier2(stack, stack_ptr, ctx)
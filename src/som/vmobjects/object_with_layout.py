@@ -1,11 +1,12 @@
 from rlib.jit import promote, we_are_jitted
+from rlib.unroll import unrolling_iterable
 from som.interpreter.objectstorage.layout_transitions import (
     UninitializedStorageLocationException,
     GeneralizeStorageLocationException,
 )
 from som.vmobjects.abstract_object import AbstractObject
 from som.vmobjects.object_without_fields import ObjectWithoutFields
-from som.vm.globals import nilObject
+from som.vm.globals import nilObject, trueObject, falseObject
 
 _EMPTY_LIST = []
 
@@ -17,24 +18,15 @@ class Object(ObjectWithoutFields):
     # Static field indices and number of object fields
     NUMBER_OF_OBJECT_FIELDS = 0
 
+    # Number of pointer fields, and of primitive fields, stored directly
+    # in the object instead of the fields and prim_fields lists
+    NUMBER_OF_INLINE_FIELDS = 0
+
     def __init__(self, layout):
         ObjectWithoutFields.__init__(self, layout)
 
-        # IMPORTANT: when changing the number of preallocated fields,
-        # you'll also need to update storage_location.py's constants:
-        #  NUMBER_OF_PRIMITIVE_FIELDS and NUMBER_OF_POINTER_FIELDS
-        self._field1 = nilObject
-        self._field2 = nilObject
-        self._field3 = nilObject
-        self._field4 = nilObject
-        self._field5 = nilObject
-
-        self.prim_field1 = 0
-        self.prim_field2 = 0
-        self.prim_field3 = 0
-        self.prim_field4 = 0
-        self.prim_field5 = 0
-
+        # The inline fields are added by the subclasses below,
+        # see _object_with_inline_fields()
         if layout is None:
             self.prim_fields = _EMPTY_LIST
             self.fields = None
@@ -47,6 +39,10 @@ class Object(ObjectWithoutFields):
             self.prim_fields = _EMPTY_LIST
 
         self._primitive_used_map = 0
+        # the booleans are not part of _primitive_used_map, because
+        # is_primitive_set promotes it: traces would be specialized on the
+        # values of the booleans, and fail whenever one of them changes
+        self._boolean_map = 0
 
         n = self._object_layout.get_number_of_used_extended_ptr_locations()
         if n > 0:
@@ -54,6 +50,9 @@ class Object(ObjectWithoutFields):
         else:
             self.fields = None  ## for some reason _EMPTY_LIST doesn't typecheck here
 
+    def _reset_inline_fields(self):
+        pass
+
     def _get_all_fields(self):
         assert not we_are_jitted()
         num_fields = self._object_layout.get_number_of_fields()
@@ -65,12 +64,7 @@ class Object(ObjectWithoutFields):
 
     def _set_all_fields(self, field_values):
         assert not we_are_jitted()
-        self._field1 = (
-            self._field2
-        ) = self._field3 = self._field4 = self._field5 = nilObject
-        self.prim_field1 = (
-            self.prim_field2
-        ) = self.prim_field3 = self.prim_field4 = self.prim_field5 = 1234567890
+        self._reset_inline_fields()
 
         for i in range(0, self._object_layout.get_number_of_fields()):
             if field_values[i] is None:
@@ -103,6 +97,7 @@ class Object(ObjectWithoutFields):
             self.prim_fields = _EMPTY_LIST
 
         self._primitive_used_map = 0
+        self._boolean_map = 0
 
         n = self._object_layout.get_number_of_used_extended_ptr_locations()
         if n > 0:
@@ -144,7 +139,7 @@ class Object(ObjectWithoutFields):
 
     def get_number_of_fields(self):
         # Get the number of fields in this object
-        return len(self.fields)
+        return self._object_layout.get_number_of_fields()
 
     def is_primitive_set(self, mask):
         return (promote(self._primitive_used_map) & mask) != 0
@@ -157,6 +152,19 @@ class Object(ObjectWithoutFields):
         if (self._primitive_used_map & mask) != 0:
             self._primitive_used_map &= ~mask
 
+    def is_boolean_set(self, mask):
+        return (self._boolean_map & mask) != 0
+
+    def set_boolean(self, mask, value):
+        # the bit after the mask holds the value
+        if value:
+            self._boolean_map |= mask | (mask << 1)
+        else:
+            self._boolean_map = (self._boolean_map | mask) & ~(mask << 1)
+
+    def unset_boolean(self, mask):
+        self._boolean_map &= ~(mask | (mask << 1))
+
     def get_location(self, field_idx):
         field_idx = promote(field_idx)
         location = promote(self._object_layout).get_storage_location(field_idx)
@@ -185,7 +193,9 @@ class Object(ObjectWithoutFields):
             location.write_fn(location, self, value)
             return
         except UninitializedStorageLocationException:
-            self.update_layout_with_initialized_field(field_idx, value.__class__)
+            self.update_layout_with_initialized_field(
+                field_idx, _get_storage_class(value)
+            )
         except GeneralizeStorageLocationException:
             self.update_layout_with_generalized_field(field_idx)
         self.set_field_after_layout_change(field_idx, value)
@@ -197,3 +207,89 @@ class Object(ObjectWithoutFields):
         # we aren't handling potential exceptions here, because,
         # they should not happen by construction
         location.write_fn(location, self, value)
+
+
+def _get_storage_class(value):
+    if value is trueObject or value is falseObject:
+        from som.interpreter.objectstorage.storage_location import Boolean
+
+        return Boolean
+    return value.__class__
+
+
+def _object_with_inline_fields(super_class, number_of_fields):
+    first = super_class.NUMBER_OF_INLINE_FIELDS + 1
+    ptr_fields = unrolling_iterable(
+        ["_field" + str(i) for i in range(first, number_of_fields + 1)]
+    )
+    prim_fields = unrolling_iterable(
+        ["prim_field" + str(i) for i in range(first, number_of_fields + 1)]
+    )
+
+    class ObjectWithInlineFields(super_class):
+        NUMBER_OF_INLINE_FIELDS = number_of_fields
+
+        def __init__(self, layout):
+            super_class.__init__(self, layout)
+            for name in ptr_fields:
+                setattr(self, name, nilObject)
+            for name in prim_fields:
+                setattr(self, name, 0)
+
+        def _reset_inline_fields(self):
+            super_class._reset_inline_fields(self)
+            for name in ptr_fields:
+                setattr(self, name, nilObject)
+            for name in prim_fields:
+                setattr(self, name, 1234567890)
+
+    ObjectWithInlineFields.__name__ = "ObjectWith%dInlineFields" % number_of_fields
+    return ObjectWithInlineFields
+
+
+# Each class adds inline fields to the previous one, so that an inline field
+# is always stored in the same class, and an object can be used with the
+# layouts of all classes with fewer fields. IMPORTANT: when changing the
+# sizes, you'll also need to update new_object() and INLINE_FIELD_CLASSES.
+Object2 = _object_with_inline_fields(Object, 2)
+Object4 = _object_with_inline_fields(Object2, 4)
+Object8 = _object_with_inline_fields(Object4, 8)
+Object16 = _object_with_inline_fields(Object8, 16)
+
+INLINE_FIELD_CLASSES = [Object, Object2, Object4, Object8, Object16]
+MAX_NUMBER_OF_INLINE_FIELDS = Object16.NUMBER_OF_INLINE_FIELDS
+
+_INLINE_FIELD_COUNTS = [cls.NUMBER_OF_INLINE_FIELDS for cls in INLINE_FIELD_CLASSES]
+
+
+def get_number_of_inline_fields(number_of_fields):
+    """The number of pointer, and of primitive, inline fields of the
+    objects allocated for a layout with the given number of fields."""
+    for count in _INLINE_FIELD_COUNTS:
+        if number_of_fields <= count:
+            return count
+    return MAX_NUMBER_OF_INLINE_FIELDS
+
+
+def get_class_with_inline_field(field_idx):
+    """The class in which the inline field with the given 0-based index is
+    stored."""
+    for cls in INLINE_FIELD_CLASSES:
+        if field_idx < cls.NUMBER_OF_INLINE_FIELDS:
+            return cls
+    assert False, "no inline field " + str(field_idx)
+    return None
+
+
+def new_object(layout):
+    number_of_fields = promote(layout).get_number_of_inline_fields()
+    if number_of_fields == 0:
+        return Object(layout)
+    if number_of_fields == 2:
+        return Object2(layout)
+    if number_of_fields == 4:
+        return Object4(layout)
+    if number_of_fields == 8:
+        return Object8(layout)
+    assert number_of_fields == 16
+    return Object16(layout)
@@ -1,12 +1,20 @@
-from som.vm.globals import trueObject
+import pytest
+
+from som.vm.globals import nilObject, trueObject
 from som.vmobjects.array import Array
 from som.vmobjects.array import _empty_strategy  # pylint: disable=protected-access
 from som.vmobjects.array import _obj_strategy  # pylint: disable=protected-access
 from som.vmobjects.array import _long_strategy  # pylint: disable=protected-access
 from som.vmobjects.array import _partially_empty_strategy  # pylint: disable=W
 from som.vmobjects.array import _bool_strategy  # pylint: disable=protected-access
+from som.vmobjects.array import _byte_strategy  # pylint: disable=protected-access
+from som.vmobjects.array import _word_strategy  # pylint: disable=protected-access
+from som.vmobjects.array import _double_strategy  # pylint: disable=W
 
+from som.vmobjects.clazz import Class
+from som.vmobjects.double import Double
 from som.vmobjects.integer import Integer
+from som.vmobjects.string import String
 
 
 def test_empty_array():
@@ -30,7 +38,7 @@ def test_empty_to_int():
     int_obj = Integer(42)
 
     arr.set_indexable_field(0, int_obj)
-    assert arr.strategy is _long_strategy
+    assert arr.strategy is _byte_strategy
     assert arr.get_indexable_field(0).get_embedded_integer() == 42
 
 
@@ -54,3 +62,170 @@ def test_copy_and_extend_partially_empty():
     assert arr is not new_arr
     assert new_arr.get_number_of_indexable_fields() == 4
     assert new_arr.strategy is _partially_empty_strategy
+
+
+def _integers(arr):
+    return [v.get_embedded_integer() for v in arr.as_argument_array()]
+
+
+def test_integer_strategies_generalize():
+    arr = Array.from_size(3)
+    arr.set_all(Integer(7))
+    assert arr.strategy is _byte_strategy
+
+    arr.set_indexable_field(0, Integer(255))
+    assert arr.strategy is _byte_strategy
+
+    arr.set_indexable_field(1, Integer(-1))
+    assert arr.strategy is _word_strategy
+
+    arr.set_indexable_field(2, Integer(0x7FFFFFFF))
+    assert arr.strategy is _word_strategy
+    assert _integers(arr) == [255, -1, 0x7FFFFFFF]
+
+    arr.set_indexable_field(2, Integer(1 << 40))
+    assert arr.strategy is _long_strategy
+    assert _integers(arr) == [255, -1, 1 << 40]
+
+
+def test_byte_array_to_obj():
+    arr = Array.from_values([Integer(1), Integer(2)])
+    assert arr.strategy is _byte_strategy
+
+    arr.set_indexable_field(1, trueObject)
+    assert arr.strategy is _obj_strategy
+    assert arr.get_indexable_field(0).get_embedded_integer() == 1
+    assert arr.get_indexable_field(1) is trueObject
+
+
+def test_partially_empty_takes_widest_integer_strategy():
+    arr = Array.from_size(3)
+    arr.set_indexable_field(0, Integer(1))
+    arr.set_indexable_field(1, Integer(1000))
+    arr.set_indexable_field(2, Integer(2))
+    assert arr.strategy is _word_strategy
+    assert _integers(arr) == [1, 1000, 2]
+
+
+def test_copy_and_extend_byte_array():
+    arr = Array.from_values([Integer(1), Integer(2)])
+    new_arr = arr.copy_and_extend_with(Integer(300))
+    assert new_arr.strategy is _word_strategy
+    assert _integers(new_arr) == [1, 2, 300]
+    assert _integers(arr) == [1, 2]
+
+
+def test_copy_range():
+    arr = Array.from_values([Integer(i) for i in range(10)])
+    copy = arr.copy_range(2, 3)
+    assert copy.strategy is _byte_strategy
+    assert _integers(copy) == [2, 3, 4]
+    assert arr.copy_range(10, 0).get_number_of_indexable_fields() == 0
+
+    with pytest.raises(IndexError):
+        arr.copy_range(8, 3)
+
+    strings = Array.from_values([String("a"), String("b")])
+    assert strings.copy_range(1, 1).get_indexable_field(0) is (
+        strings.get_indexable_field(1)
+    )
+    assert Array.from_size(4).copy_range(1, 2).strategy is _empty_strategy
+
+
+@pytest.mark.parametrize(
+    "values,strategy",
+    [
+        ([String("a"), String("b"), String("c")], _obj_strategy),
+        ([Integer(1 << 40)] * 3, _long_strategy),
+        ([Double(1.5)] * 3, _double_strategy),
+        ([trueObject] * 3, _bool_strategy),
+        ([Integer(1)] * 3, _byte_strategy),
+        ([Integer(1 << 20)] * 3, _word_strategy),
+        ([nilObject] * 3, _empty_strategy),
+    ],
+)
+def test_ranges_are_bounds_checked_in_every_strategy(values, strategy):
+    arr = Array.from_values(values)
+    assert arr.strategy is strategy
+
+    for start, length in [(2, 2), (-1, 1), (0, 4), (0, -1)]:
+        with pytest.raises(IndexError):
+            arr.copy_range(start, length)
+        with pytest.raises(IndexError):
+            arr.replace_range(start, length, Array.from_values(values * 2), 0)
+    with pytest.raises(IndexError):
+        arr.replace_range(0, 3, Array.from_values(values[:2]), 0)
+
+
+def test_index_of_sends_does_not_understand_for_missing_equals(monkeypatch):
+    from som.vm.universe import Universe
+    from som.vmobjects import array
+
+    sent = []
+
+    def send(rcvr, selector, args, dnu_selector):
+        sent.append((rcvr, selector.get_embedded_string(), dnu_selector))
+        return trueObject
+
+    monkeypatch.setattr(array, "lookup_and_send_3", send)
+    obj = Universe.new_instance(Class(0))
+    assert Array.from_values([obj]).index_of(Integer(1)) == 0
+    assert sent == [(obj, "=", "doesNotUnderstand:arguments:")]
+
+
+def test_index_of_in_typed_arrays():
+    words = Array.from_values([Integer(5), Integer(70000), Integer(5)])
+    assert words.strategy is _word_strategy
+    assert words.index_of(Integer(5)) == 0
+    assert words.index_of(Integer(70000)) == 1
+    assert words.index_of(Double(70000.0)) == 1
+    assert words.index_of(Integer(6)) == -1
+
+    doubles = Array.from_values([Double(1.5), Double(2.0)])
+    assert doubles.strategy is _double_strategy
+    assert doubles.index_of(Integer(2)) == 1
+    assert doubles.index_of(trueObject) == -1
+
+    assert Array.from_size(2).index_of(nilObject) == 0
+    assert Array.from_size(0).index_of(nilObject) == -1
+
+
+def test_replace_range():
+    arr = Array.from_values([Integer(i) for i in range(6)])
+    other = Array.from_values([Integer(100 + i) for i in range(4)])
+    arr.replace_range(1, 2, other, 2)
+    assert arr.strategy is _byte_strategy
+    assert _integers(arr) == [0, 102, 103, 3, 4, 5]
+
+    # overlapping ranges of the same array
+    arr.replace_range(2, 4, arr, 0)
+    assert _integers(arr) == [0, 102, 0, 102, 103, 3]
+
+    words = Array.from_values([Integer(1 << 20)])
+    arr.replace_range(5, 1, words, 0)
+    assert arr.strategy is _word_strategy
+    assert _integers(arr) == [0, 102, 0, 102, 103, 1 << 20]
+
+    with pytest.raises(IndexError):
+        arr.replace_range(4, 3, arr, 0)
+
+
+def test_bulk_primitives_use_one_based_indexes():
+    # pylint: disable=protected-access
+    from som.primitives import array_primitives as prims
+
+    arr = Array.from_values([Integer(i) for i in range(1, 6)])
+    assert _integers(prims._copy_from_to(arr, Integer(2), Integer(4))) == [2, 3, 4]
+    assert prims._copy_from_to(arr, Integer(3), Integer(2)).as_argument_array() == []
+
+    assert prims._index_of(arr, Integer(4)).get_embedded_integer() == 4
+    assert prims._index_of(arr, Integer(9)) is nilObject
+
+    other = Array.from_values([Integer(9), Integer(8)])
+    assert (
+        prims.replace_from_to_with_starting_at(
+            arr, Integer(4), Integer(5), other, Integer(1)
+        )
+        is arr
+    )
+    assert _integers(arr) == [1, 2, 3, 9, 8]
@@ -8,7 +8,12 @@ from som.compiler.bc.method_generation_context import MethodGenerationContext
 from som.compiler.bc.parser import Parser
 from som.compiler.class_generation_context import ClassGenerationContext
 from som.interp_type import is_ast_interpreter
-from som.interpreter.bc.bytecodes import Bytecodes, bytecode_length, bytecode_as_str
+from som.interpreter.bc.bytecodes import (
+    Bytecodes,
+    bytecode_length,
+    bytecode_as_str,
+    first_bytecode_of,
+)
 from som.vm.current import current_universe
 
 pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
@@ -24,6 +29,15 @@ def dump(mgenc):
     dump_method(mgenc, b"")
 
 
+@pytest.fixture(autouse=True)
+def no_constant_folding():
+    # literal receivers stand in for arbitrary ones here,
+    # so they must not be folded away
+    current_universe.constant_folding = False
+    yield
+    current_universe.constant_folding = True
+
+
 @pytest.fixture
 def cgenc():
     gen_c = ClassGenerationContext(current_universe)
@@ -1199,6 +1213,225 @@ def test_inlining_of_to_do(mgenc):
     )
 
 
+def test_inlining_of_down_to_do(mgenc):
+    bytecodes = method_to_bytecodes(mgenc, "test = ( 2 downTo: 1 do: [:i | i ] )")
+
+    assert len(bytecodes) == 23
+    check(
+        bytecodes,
+        [
+            Bytecodes.push_constant_0,
+            Bytecodes.push_1,
+            Bytecodes.dup_second,
+            Bytecodes.nil_local,
+            BC(Bytecodes.jump_if_less, 17),
+            Bytecodes.dup,
+            BC(Bytecodes.pop_local, 0, 0),
+            BC(Bytecodes.push_local, 0, 0),
+            Bytecodes.pop,
+            Bytecodes.dec,
+            Bytecodes.nil_local,
+            BC(Bytecodes.jump_backward, 14),
+            Bytecodes.return_self,
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "step,jump,increment",
+    [
+        ("1", Bytecodes.jump_if_greater, [Bytecodes.inc]),
+        ("-1", Bytecodes.jump_if_greater, [Bytecodes.dec]),
+        ("3", Bytecodes.jump_if_greater, [Bytecodes.push_constant_1, Bytecodes.send_2]),
+        (
+            "-3",
+            Bytecodes.jump_if_greater,
+            [Bytecodes.push_constant_1, Bytecodes.send_2],
+        ),
+        ("0", Bytecodes.jump_if_greater, [Bytecodes.push_0, Bytecodes.send_2]),
+    ],
+)
+def test_inlining_of_to_by_do(mgenc, step, jump, increment):
+    bytecodes = method_to_bytecodes(
+        mgenc, "test = ( 1 to: 10 by: " + step + " do: [:i | i ] )"
+    )
+
+    check(
+        bytecodes,
+        [
+            Bytecodes.push_1,
+            Bytecodes.push_constant_0,
+            Bytecodes.dup_second,
+            Bytecodes.nil_local,
+            jump,
+            Bytecodes.dup,
+            BC(Bytecodes.pop_local, 0, 0),
+            BC(Bytecodes.push_local, 0, 0),
+            Bytecodes.pop,
+        ]
+        + increment
+        + [
+            Bytecodes.nil_local,
+            Bytecodes.jump_backward,
+            Bytecodes.return_self,
+        ],
+    )
+
+
+def test_to_by_do_with_negative_step_ends_above_the_limit(mgenc):
+    # like the primitive, this loop does not run at all
+    bytecodes = method_to_bytecodes(mgenc, "test = ( 10 to: 1 by: -1 do: [:i | i ] )")
+
+    check(
+        bytecodes,
+        [
+            Bytecodes.push_constant_0,
+            Bytecodes.push_1,
+            Bytecodes.dup_second,
+            Bytecodes.nil_local,
+            BC(Bytecodes.jump_if_greater, 17),
+            Bytecodes.dup,
+            BC(Bytecodes.pop_local, 0, 0),
+            BC(Bytecodes.push_local, 0, 0),
+            Bytecodes.pop,
+            Bytecodes.dec,
+            Bytecodes.nil_local,
+            BC(Bytecodes.jump_backward, 14),
+            Bytecodes.return_self,
+        ],
+    )
+
+
+def test_to_by_do_with_unknown_step_is_not_inlined(mgenc):
+    bytecodes = method_to_bytecodes(
+        mgenc, "test: step = ( 1 to: 10 by: step do: [:i | i ] )"
+    )
+
+    check(
+        bytecodes,
+        [
+            Bytecodes.push_1,
+            Bytecodes.push_constant_0,
+            BC(Bytecodes.push_argument, 1, 0),
+            Bytecodes.push_block_no_ctx,
+            Bytecodes.send_4,
+            Bytecodes.return_self,
+        ],
+    )
+
+
+def test_inlining_of_times_repeat(cgenc, mgenc):
+    add_field(cgenc, "field")
+    bytecodes = method_to_bytecodes(mgenc, "test = ( 3 timesRepeat: [ field ] )")
+
+    assert len(bytecodes) == 13
+    check(
+        bytecodes,
+        [
+            Bytecodes.push_constant_0,
+            Bytecodes.dup,  # the limit
+            Bytecodes.push_1,  # the counter, stack: Top[1, 3, 3]
+            BC(Bytecodes.jump_if_greater, 9),
+            Bytecodes.push_field_0,
+            Bytecodes.pop,
+            Bytecodes.inc,
+            BC(Bytecodes.jump_backward, 6),
+            Bytecodes.return_self,
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "selector,jump_bytecode",
+    [("ifNil:", Bytecodes.jump_on_not_nil), ("ifNotNil:", Bytecodes.jump_on_nil)],
+)
+def test_inlining_of_if_nil_or_if_not_nil(cgenc, mgenc, selector, jump_bytecode):
+    add_field(cgenc, "field")
+    bytecodes = method_to_bytecodes(
+        mgenc, "test: arg = ( ^ arg " + selector + " [ field ] )"
+    )
+
+    assert len(bytecodes) == 9
+    check(
+        bytecodes,
+        [
+            BC(Bytecodes.push_argument, 1, 0),
+            BC(jump_bytecode, 5),
+            Bytecodes.pop,
+            Bytecodes.push_field_0,
+            Bytecodes.return_local,
+        ],
+    )
+
+
+def test_if_not_nil_passes_the_receiver_to_the_block(mgenc):
+    bytecodes = method_to_bytecodes(mgenc, "test: arg = ( ^ arg ifNotNil: [:v | v ] )")
+
+    assert len(bytecodes) == 13
+    check(
+        bytecodes,
+        [
+            BC(Bytecodes.push_argument, 1, 0),
+            BC(Bytecodes.jump_on_nil, 9),
+            BC(Bytecodes.pop_local, 0, 0),
+            BC(Bytecodes.push_local, 0, 0),
+            Bytecodes.return_local,
+        ],
+    )
+
+
+def test_if_nil_with_block_argument_is_not_inlined(mgenc):
+    bytecodes = method_to_bytecodes(mgenc, "test: arg = ( ^ arg ifNil: [:v | v ] )")
+
+    check(
+        bytecodes,
+        [
+            BC(Bytecodes.push_argument, 1, 0),
+            Bytecodes.push_block_no_ctx,
+            Bytecodes.send_2,
+            Bytecodes.return_local,
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "source,jump_bytecode",
+    [
+        ("arg ifNil: [ #a ] ifNotNil: [:v | v ]", Bytecodes.jump_on_not_nil),
+        ("arg ifNotNil: [:v | v ] ifNil: [ #a ]", Bytecodes.jump_on_nil),
+    ],
+)
+def test_inlining_of_if_nil_if_not_nil(mgenc, source, jump_bytecode):
+    bytecodes = method_to_bytecodes(mgenc, "test: arg = ( ^ " + source + " )")
+
+    if jump_bytecode == Bytecodes.jump_on_not_nil:
+        branches = [
+            Bytecodes.pop,
+            Bytecodes.push_constant_2,
+            BC(Bytecodes.jump, 9),
+            BC(Bytecodes.pop_local, 0, 0),
+            BC(Bytecodes.push_local, 0, 0),
+        ]
+        jump_offset = 8
+    else:
+        branches = [
+            BC(Bytecodes.pop_local, 0, 0),
+            BC(Bytecodes.push_local, 0, 0),
+            BC(Bytecodes.jump, 5),
+            Bytecodes.pop,
+            Bytecodes.push_constant_2,
+        ]
+        jump_offset = 12
+
+    assert len(bytecodes) == 18
+    check(
+        bytecodes,
+        [BC(Bytecodes.push_argument, 1, 0), BC(jump_bytecode, jump_offset)]
+        + branches
+        + [Bytecodes.return_local],
+    )
+
+
 def test_to_do_block_block_inlined_self(cgenc, mgenc):
     add_field(cgenc, "field")
     bytecodes = method_to_bytecodes(
@@ -1239,3 +1472,33 @@ def test_to_do_block_block_inlined_self(cgenc, mgenc):
     block_method = mgenc._literals[2]  # pylint: disable=protected-access
     block_bcs = block_method.get_bytecodes()
     check(block_bcs, [(6, BC(Bytecodes.push_local, 2, 1)), Bytecodes.pop])
+
+
+def test_call_sites_only_for_sends_returns_and_loop_jumps(mgenc):
+    mgenc.signature = current_universe.symbol_for("test")
+    method_to_bytecodes(
+        mgenc,
+        """
+        test = (
+            1 to: 10 do: [:i | i foo ].
+            ^ self bar: 1 )""",
+    )
+    method = mgenc.assemble(None)
+    bytecodes = method.get_bytecodes()
+
+    call_sites = []
+    i = 0
+    while i < len(bytecodes):
+        if bytecodes[i] in [
+            Bytecodes.jump_if_greater,
+            Bytecodes.send_1,
+            Bytecodes.jump_backward,
+            Bytecodes.send_2,
+            Bytecodes.return_local,
+        ]:
+            call_sites.append(method.get_call_site(i))
+        # the send of a superinstruction keeps its own index
+        i += bytecode_length(first_bytecode_of(bytecodes[i]))
+
+    assert call_sites == [0, 1, 2, 3, 4]
+    assert method.get_number_of_call_sites() == 5
@@ -0,0 +1,77 @@
+# pylint: disable=redefined-outer-name,protected-access
+import pytest
+from rlib.string_stream import StringStream
+
+from som.compiler.bc.method_generation_context import MethodGenerationContext
+from som.compiler.bc.parser import Parser
+from som.compiler.class_generation_context import ClassGenerationContext
+from som.interp_type import is_ast_interpreter
+from som.interpreter.bc.bytecode_profile import _BytecodeHistogram
+from som.interpreter.bc.bytecodes import Bytecodes
+from som.vm.current import current_universe
+
+pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
+    is_ast_interpreter(), reason="Tests are specific to bytecode interpreter"
+)
+
+
+@pytest.fixture(autouse=True)
+def no_constant_folding():
+    # literal receivers stand in for arbitrary ones here,
+    # so they must not be folded away
+    current_universe.constant_folding = False
+    yield
+    current_universe.constant_folding = True
+
+
+@pytest.fixture
+def cgenc():
+    gen_c = ClassGenerationContext(current_universe)
+    gen_c.name = current_universe.symbol_for("Test")
+    gen_c.add_instance_field(current_universe.symbol_for("field"))
+    return gen_c
+
+
+def _compile(cgenc, source):
+    mgenc = MethodGenerationContext(current_universe, cgenc, None)
+    mgenc.add_argument("self", None, None)
+    parser = Parser(StringStream(source), "test", current_universe)
+    return parser._assemble_method(mgenc)
+
+
+def test_bytecode_histogram(cgenc):
+    method = _compile(cgenc, "test = ( ^ 3 < 4 )")
+    other = _compile(cgenc, "other = ( ^ 5 + field )")
+    histogram = _BytecodeHistogram()
+    for _ in range(3):
+        histogram.record(method, 0, Bytecodes.push_constant_0)
+    # compiled code of tier 1 dispatches the first bytecode of a superinstruction
+    histogram.record(method, 1, Bytecodes.push_constant_1)
+    histogram.record(other, 0, Bytecodes.push_constant_0)
+
+    assert histogram.get_opcode_count(Bytecodes.push_constant_0) == 4
+    assert histogram.get_count(method, 0) == 3
+    assert histogram.get_count(other, 1) == 0
+
+    lines = histogram.format().splitlines()
+    assert lines[0] == "Bytecode histogram (5 bytecodes)"
+    assert lines[1].split() == ["4", "80.0%", "PUSH_CONSTANT_0"]
+    assert lines[2].split() == ["1", "20.0%", "PUSH_CONSTANT_1"]
+    assert lines[4] == "Method hotness"
+    assert lines[5].split() == ["4", "80.0%", "nil>>test"]
+    assert lines[6].split() == ["3", "75.0%", "0", "PUSH_CONSTANT_0"]
+    assert lines[7].split() == ["1", "25.0%", "1", "PUSH_CONSTANT_1_SEND_2"]
+    assert lines[8].split() == ["1", "20.0%", "nil>>other"]
+
+
+def test_equal_counts_keep_their_order(cgenc):
+    method = _compile(cgenc, "test = ( ^ 3 < 4 )")
+    histogram = _BytecodeHistogram()
+    histogram.record(method, 1, Bytecodes.push_constant_1)
+    histogram.record(method, 0, Bytecodes.push_constant_0)
+
+    lines = histogram.format().splitlines()
+    assert lines[1].split()[2] == "PUSH_CONSTANT_0"
+    assert lines[2].split()[2] == "PUSH_CONSTANT_1"
+    assert lines[6].split()[2] == "0"
+    assert lines[7].split()[2] == "1"
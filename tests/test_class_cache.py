@@ -0,0 +1,242 @@
+# pylint: disable=redefined-outer-name,protected-access
+import os
+import pytest
+
+from som.interp_type import is_ast_interpreter
+from som.vm.current import current_universe
+from som.vmobjects.clazz import Class
+
+pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
+    is_ast_interpreter(), reason="Tests are specific to bytecode interpreter"
+)
+
+if not is_ast_interpreter():
+    from som.compiler import sourcecode_compiler
+    from som.compiler.bc import class_cache
+    from som.compiler.sourcecode_compiler import _parse_file_with_cache
+
+SOURCE = """CacheTest = nil (
+| a b |
+a = ( ^ a )
+a: val = ( a := val )
+one = ( ^ 1 )
+prim = primitive
+loop: n = ( | i | i := 0. [ i < n ] whileTrue: [ i := i + 1 ]. ^ i )
+find: c = ( c do: [:e | e = 3.5 ifTrue: [ ^ e ] ]. ^ 'none' )
+big = ( ^ 123456789012345678901234567890 )
+neg = ( ^ -42 )
+----
+| count |
+global = ( ^ Foo )
+)
+"""
+
+
+@pytest.fixture
+def source_dir(tmpdir):
+    tmpdir.join("CacheTest.som").write(SOURCE)
+    return str(tmpdir)
+
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    current_universe.class_cache_dir = str(tmpdir.join("cache"))
+    yield current_universe.class_cache_dir
+    current_universe.class_cache_dir = None
+
+
+def _cache_files(cache_dir):
+    return [f for f in os.listdir(cache_dir) if f.endswith(".somc")]
+
+
+def _load(source_dir):
+    return _parse_file_with_cache(
+        source_dir + os.sep + "CacheTest.som", "CacheTest", current_universe
+    )
+
+
+def _assert_same_method(expected, actual):
+    assert type(expected) is type(actual)
+    assert expected.get_signature() is actual.get_signature()
+    if not hasattr(expected, "_bytecodes"):
+        return
+
+    assert expected.get_bytecodes() == actual.get_bytecodes()
+    assert expected._call_sites == actual._call_sites
+    assert expected._arg_inner_access == actual._arg_inner_access
+    assert expected._size_frame == actual._size_frame
+    assert expected._size_inner == actual._size_inner
+    assert expected.get_maximum_number_of_stack_elements() == (
+        actual.get_maximum_number_of_stack_elements()
+    )
+    assert [
+        (l.loop_begin_idx, l.backward_jump_idx) for l in expected._inlined_loops
+    ] == [(l.loop_begin_idx, l.backward_jump_idx) for l in actual._inlined_loops]
+
+    expected_scope = expected._lexical_scope
+    actual_scope = actual._lexical_scope
+    for expected_var, actual_var in zip(
+        expected_scope.arguments + expected_scope.locals,
+        actual_scope.arguments + actual_scope.locals,
+    ):
+        assert str(expected_var) == str(actual_var)
+        assert expected_var.access_idx == actual_var.access_idx
+        assert expected_var.is_accessed_out_of_context() == (
+            actual_var.is_accessed_out_of_context()
+        )
+
+    assert len(expected._literals) == len(actual._literals)
+    for expected_lit, actual_lit in zip(expected._literals, actual._literals):
+        if expected_lit.is_invokable():
+            _assert_same_method(expected_lit, actual_lit)
+            # blocks keep the scope of their method as outer scope
+            if actual_lit._lexical_scope is not None:
+                assert actual_lit._lexical_scope.outer is actual_scope
+        else:
+            assert str(expected_lit) == str(actual_lit)
+
+
+def test_cached_class_is_equivalent_to_compiled_one(source_dir, cache_dir):
+    compiled = _load(source_dir)
+    assert len(_cache_files(cache_dir)) == 1
+
+    cached = _load(source_dir)
+    assert cached is not compiled
+    assert cached.name is compiled.name
+    assert cached._instance_fields == compiled._instance_fields
+    assert cached._class_fields == compiled._class_fields
+    assert cached._instance_has_primitives
+
+    for methods, cached_methods in [
+        (compiled._instance_methods, cached._instance_methods),
+        (compiled._class_methods, cached._class_methods),
+    ]:
+        assert list(methods.keys()) == list(cached_methods.keys())
+        for sig in methods:
+            _assert_same_method(methods[sig], cached_methods[sig])
+
+
+def test_cache_is_used_when_valid(source_dir, cache_dir, monkeypatch):
+    _load(source_dir)
+
+    def fail(*_args):
+        raise AssertionError("should have been loaded from the cache")
+
+    monkeypatch.setattr(sourcecode_compiler, "store_cached_class", fail)
+    _load(source_dir)
+
+
+def test_changed_source_invalidates_cache(source_dir, cache_dir):
+    _load(source_dir)
+    cache_file = os.path.join(cache_dir, _cache_files(cache_dir)[0])
+    with open(cache_file, "rb") as f:
+        old_data = f.read()
+
+    source_file = os.path.join(source_dir, "CacheTest.som")
+    with open(source_file, "w") as f:
+        f.write(SOURCE.replace("^ 1 )", "^ 2 )"))
+    stat = os.stat(source_file)
+    os.utime(source_file, (stat.st_atime, stat.st_mtime + 10))
+
+    cgc = _load(source_dir)
+    one = cgc._instance_methods[current_universe.symbol_for("one")]
+    assert one._value.get_embedded_integer() == 2
+
+    with open(cache_file, "rb") as f:
+        assert f.read() != old_data
+
+
+def test_corrupt_cache_is_ignored(source_dir, cache_dir):
+    _load(source_dir)
+    cache_file = os.path.join(cache_dir, _cache_files(cache_dir)[0])
+    with open(cache_file, "rb") as f:
+        data = f.read()
+    with open(cache_file, "wb") as f:
+        f.write(data[: len(data) // 2])
+
+    cgc = _load(source_dir)
+    assert cgc.name.get_embedded_string() == "CacheTest"
+
+
+def test_changed_compiler_options_invalidate_cache(source_dir, cache_dir):
+    _load(source_dir)
+    cache_file = os.path.join(cache_dir, _cache_files(cache_dir)[0])
+    with open(cache_file, "rb") as f:
+        old_data = f.read()
+
+    current_universe.superinstructions = False
+    try:
+        cgc = _load(source_dir)
+    finally:
+        current_universe.superinstructions = True
+    assert cgc.name.get_embedded_string() == "CacheTest"
+
+    with open(cache_file, "rb") as f:
+        assert f.read() != old_data
+
+
+def test_cache_of_other_format_version_is_ignored(source_dir, cache_dir, monkeypatch):
+    _load(source_dir)
+    monkeypatch.setattr(class_cache, "_FORMAT_VERSION", class_cache._FORMAT_VERSION + 1)
+
+    stored = []
+    monkeypatch.setattr(
+        sourcecode_compiler,
+        "store_cached_class",
+        lambda *args: stored.append(args),
+    )
+    _load(source_dir)
+    assert len(stored) == 1
+
+
+def _new_system_class():
+    # without the core library, only system classes can be assembled
+    system_class = Class(0, Class(0, None))
+    system_class.set_name(current_universe.symbol_for("CacheTest"))
+    return system_class
+
+
+def test_image_round_trip(source_dir, tmpdir):
+    current_universe.image_recorder = sourcecode_compiler.new_image_recorder(
+        current_universe
+    )
+    try:
+        compiled = sourcecode_compiler.compile_class_from_file(
+            source_dir, "CacheTest", _new_system_class(), current_universe
+        )
+        image_file = str(tmpdir.join("test.image"))
+        current_universe.image_recorder.save(image_file)
+    finally:
+        current_universe.image_recorder = None
+
+    image = sourcecode_compiler.load_image(image_file, current_universe)
+    assert list(image.keys()) == ["CacheTest"]
+
+    os.remove(os.path.join(source_dir, "CacheTest.som"))
+    loaded = sourcecode_compiler.compile_class_from_image(
+        image, "CacheTest", _new_system_class(), current_universe
+    )
+    assert loaded is not compiled
+    assert loaded.get_number_of_instance_fields() == 2
+    for sig in ["a", "a:", "loop:", "find:"]:
+        selector = current_universe.symbol_for(sig)
+        _assert_same_method(
+            compiled.lookup_invokable(selector), loaded.lookup_invokable(selector)
+        )
+
+    assert (
+        sourcecode_compiler.compile_class_from_image(
+            image, "Missing", None, current_universe
+        )
+        is None
+    )
+
+
+def test_invalid_image_is_rejected(tmpdir):
+    image_file = tmpdir.join("broken.image")
+    image_file.write("SOMC")
+    assert sourcecode_compiler.load_image(str(image_file), current_universe) is None
+    assert (
+        sourcecode_compiler.load_image(str(tmpdir.join("missing")), current_universe)
+        is None
+    )
@@ -0,0 +1,198 @@
+# pylint: disable=redefined-outer-name,protected-access
+import pytest
+from rlib.string_stream import StringStream
+
+from som.compiler.bc.method_generation_context import MethodGenerationContext
+from som.compiler.bc.parser import Parser
+from som.compiler.class_generation_context import ClassGenerationContext
+from som.interp_type import is_ast_interpreter
+from som.interpreter.bc.bytecodes import Bytecodes, bytecode_length
+from som.vm.current import current_universe
+from som.vm.globals import nilObject, trueObject, falseObject
+from som.vmobjects.double import Double
+from som.vmobjects.integer import Integer
+from som.vmobjects.method_trivial import LiteralReturn
+
+pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
+    is_ast_interpreter(), reason="Tests are specific to bytecode interpreter"
+)
+
+_PUSH_CONSTANT_N = [
+    Bytecodes.push_constant_0,
+    Bytecodes.push_constant_1,
+    Bytecodes.push_constant_2,
+]
+
+
+@pytest.fixture
+def mgenc():
+    cgenc = ClassGenerationContext(current_universe)
+    cgenc.name = current_universe.symbol_for("Test")
+    cgenc.add_instance_field(current_universe.symbol_for("field"))
+    gen_m = MethodGenerationContext(current_universe, cgenc, None)
+    gen_m.add_argument("self", None, None)
+    return gen_m
+
+
+def _compile(mgenc, source):
+    parser = Parser(StringStream(source), "test", current_universe)
+    return parser._assemble_method(mgenc)
+
+
+def _bytecodes(mgenc, source):
+    parser = Parser(StringStream(source), "test", current_universe)
+    parser.method(mgenc)
+    bytecodes = mgenc.get_bytecodes()
+    result = []
+    i = 0
+    while i < len(bytecodes):
+        result.append(bytecodes[i])
+        i += bytecode_length(bytecodes[i])
+    return result
+
+
+def _folded_value(mgenc, expr):
+    method = _compile(mgenc, "test = ( ^ " + expr + " )")
+    if isinstance(method, LiteralReturn):
+        return method._value
+
+    # a method returning the literal that remains
+    bytecode = method.get_bytecode(0)
+    assert method.get_number_of_bytecodes() == bytecode_length(bytecode) + 1
+    assert method.get_bytecode(bytecode_length(bytecode)) == Bytecodes.return_local
+    if bytecode == Bytecodes.push_nil:
+        return nilObject
+    if bytecode == Bytecodes.push_constant:
+        return method.get_constant(0)
+    return method._literals[_PUSH_CONSTANT_N.index(bytecode)]
+
+
+@pytest.mark.parametrize(
+    "expr,expected",
+    [
+        ("1 + 2", 3),
+        ("1 + 1", 2),
+        ("5 - 1", 4),
+        ("1 + 2 * 3", 9),
+        ("7 / 2", 3),
+        ("-7 % 3", 2),
+    ],
+)
+def test_integer_arithmetic(mgenc, expr, expected):
+    value = _folded_value(mgenc, expr)
+    assert isinstance(value, Integer)
+    assert value.get_embedded_integer() == expected
+
+
+def test_double_arithmetic(mgenc):
+    value = _folded_value(mgenc, "1.5 * 2")
+    assert isinstance(value, Double)
+    assert value.get_embedded_double() == 3.0
+
+
+@pytest.mark.parametrize(
+    "expr,expected",
+    [
+        ("3 < 4", trueObject),
+        ("3 >= 4", falseObject),
+        ("2 = 2.0", trueObject),
+        ("2 == 2.0", falseObject),
+        ("1.5 <> 1.5", falseObject),
+        ("#foo == #foo", trueObject),
+        ("#foo == #bar", falseObject),
+        ("nil == nil", trueObject),
+        ("true == false", falseObject),
+    ],
+)
+def test_comparisons(mgenc, expr, expected):
+    assert _folded_value(mgenc, expr) is expected
+
+
+@pytest.mark.parametrize(
+    "expr,expected",
+    [
+        ("true ifTrue: [ #a ] ifFalse: [ #b ]", "a"),
+        ("false ifTrue: [ #a ] ifFalse: [ #b ]", "b"),
+        ("true ifFalse: [ #a ] ifTrue: [ #b ]", "b"),
+        ("(1 < 2) ifTrue: [ #a ] ifFalse: [ #b ]", "a"),
+        ("true ifTrue: [ #a ]", "a"),
+        ("false ifFalse: [ #a ]", "a"),
+    ],
+)
+def test_dead_branches_are_removed(mgenc, expr, expected):
+    assert _folded_value(mgenc, expr).get_embedded_string() == expected
+
+
+def test_if_without_taken_branch_is_nil(mgenc):
+    assert _folded_value(mgenc, "false ifTrue: [ #a ]") is nilObject
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        ("test = ( ^ true and: [ field ] )", [Bytecodes.push_field_0]),
+        ("test = ( ^ false or: [ field ] )", [Bytecodes.push_field_0]),
+        ("test = ( ^ false && [ field ] )", [Bytecodes.push_global]),
+        ("test = ( ^ true or: [ field ] )", [Bytecodes.push_global]),
+    ],
+)
+def test_and_or(mgenc, source, expected):
+    assert _bytecodes(mgenc, source) == expected + [Bytecodes.return_local]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "test: a = ( ^ a + 2 )",
+        "test: a = ( ^ 2 + a )",
+        "test = ( ^ 1 / 0 )",
+        "test = ( ^ 1 + #foo )",
+        "test = ( ^ 'a' == 'a' )",
+        "test = ( ^ 2 max: 3 )",
+    ],
+)
+def test_no_folding_of_unknown_results(mgenc, source):
+    bytecodes = _bytecodes(mgenc, source)
+    assert Bytecodes.send_2 in bytecodes or Bytecodes.inc in bytecodes
+
+
+def test_no_folding_when_disabled(mgenc):
+    current_universe.constant_folding = False
+    try:
+        bytecodes = _bytecodes(mgenc, "test = ( ^ (true ifTrue: [ 1 + 2 ]) )")
+    finally:
+        current_universe.constant_folding = True
+
+    assert Bytecodes.jump_on_false_top_nil in bytecodes
+    assert Bytecodes.send_2 in bytecodes
+
+
+def _literals(mgenc, source):
+    parser = Parser(StringStream(source), "test", current_universe)
+    parser.method(mgenc)
+    return mgenc._literals
+
+
+def test_operand_literals_are_removed(mgenc):
+    literals = _literals(mgenc, "test = ( ^ 1 + 2 )")
+    assert len(literals) == 1
+    assert literals[0].get_embedded_integer() == 3
+
+
+def test_operand_literals_of_comparison_are_removed(mgenc):
+    assert _literals(mgenc, "test = ( ^ #a == #a )") == [trueObject]
+
+
+def test_operand_literals_still_in_use_are_kept(mgenc):
+    literals = _literals(mgenc, "test = ( #a size. ^ #a == #a )")
+    assert [lit for lit in literals if lit is not trueObject] == [
+        current_universe.symbol_for("a"),
+        current_universe.symbol_for("size"),
+    ]
+
+
+def test_folding_does_not_exhaust_the_literals(mgenc):
+    statements = ["1000 + " + str(i) + "." for i in range(2, 100)]
+    literals = _literals(mgenc, "test = ( " + " ".join(statements) + " )")
+    # only the results remain
+    assert len(literals) == 98
@@ -0,0 +1,72 @@
+import json
+
+from som.vm import gc_stats
+from som.vm.gc_stats import GcHooksStats, NUM_PAUSE_BUCKETS
+
+# durations as reported by the GC, in nanosecond ticks
+US = 1000
+MS = 1000 * US
+
+
+def test_pauses_are_bucketed_by_powers_of_two():
+    stats = GcHooksStats()
+    stats.record_minor(500, 1000)
+    stats.record_minor(3 * US, 1000)
+    stats.record_minor(3 * US, 1000)
+    stats.record_collect_step(1000000 * MS)
+
+    assert stats.minor_pauses[0] == 1
+    assert stats.minor_pauses[2] == 2
+    assert stats.major_pauses[NUM_PAUSE_BUCKETS - 1] == 1
+
+
+def test_counters_in_primitive_order():
+    stats = GcHooksStats()
+    stats.nursery_size = 4096
+    stats.record_minor(2 * MS, 10000)
+    stats.record_minor(1 * MS, 30000)
+    stats.record_collect_step(5 * MS)
+    stats.record_collect(20000)
+
+    assert stats.as_integers() == [2, 1, 1, 3000, 5000, 8192, 30000]
+
+
+def test_tsc_ticks_are_converted_with_the_rate_of_the_counter():
+    stats = GcHooksStats()
+    # a 3 GHz time stamp counter
+    stats.ticks_per_us = 3000.0
+    stats.record_minor(3000 * 3, 1000)
+    stats.record_collect_step(3000 * 1000)
+
+    assert stats.minor_pauses[2] == 1
+    assert stats.major_pauses[10] == 1
+    assert stats.minor_time_us() == 3
+    assert stats.major_time_us() == 1000
+
+
+def test_unknown_rate_is_measured_against_the_clock(monkeypatch):
+    stats = GcHooksStats()
+    stats.ticks_per_us = 0.0
+    stats.start_ticks = 0
+    stats.start_time = 0.0
+
+    # 2.5 ticks per us, measured over 250 ms
+    monkeypatch.setattr(gc_stats, "read_timestamp", lambda: 625000)
+    monkeypatch.setattr(gc_stats.time, "time", lambda: 0.25)
+    stats.record_minor(25, 1000)
+
+    assert stats.minor_time_us() == 10
+    assert stats.minor_pauses[4] == 1
+    assert stats.ticks_per_us == 2.5
+
+
+def test_json():
+    stats = GcHooksStats()
+    stats.record_minor(1 * US, 500)
+    result = json.loads(stats.format_json())
+
+    assert result["minor_collections"] == 1
+    assert result["peak_memory"] == 500
+    assert len(result["minor_pauses"]) == NUM_PAUSE_BUCKETS
+    assert result["pause_bucket_limits_us"][:3] == [1, 2, 4]
+    assert result["minor_pauses"][1] == 1
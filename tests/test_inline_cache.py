@@ -0,0 +1,84 @@
+# pylint: disable=redefined-outer-name
+import pytest
+from rlib.string_stream import StringStream
+
+from som.compiler.bc.method_generation_context import MethodGenerationContext
+from som.compiler.bc.parser import Parser
+from som.compiler.class_generation_context import ClassGenerationContext
+from som.interp_type import is_ast_interpreter
+from som.interpreter.bc.bytecodes import Bytecodes
+from som.vm.current import current_universe
+from som.vmobjects.method_bc import INLINE_CACHE_SIZE, INLINE_CACHE_MEGAMORPHIC
+
+pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
+    is_ast_interpreter(), reason="Tests are specific to bytecode interpreter"
+)
+
+
+class _Layout(object):
+    def __init__(self):
+        self.is_latest = True
+        self.lookups = 0
+
+    def lookup_invokable(self, selector):
+        self.lookups += 1
+        return (self, selector)
+
+
+@pytest.fixture
+def method():
+    cgenc = ClassGenerationContext(current_universe)
+    cgenc.name = current_universe.symbol_for("Test")
+    mgenc = MethodGenerationContext(current_universe, cgenc, None)
+    mgenc.add_argument("self", None, None)
+    mgenc.signature = current_universe.symbol_for("test")
+
+    parser = Parser(StringStream("test = ( self foo. ^ 1 )"), "test", current_universe)
+    parser.method(mgenc)
+    return mgenc.assemble(None)
+
+
+SEND_IDX = 3  # after push_argument self
+
+
+def test_send_is_at_expected_index(method):
+    assert method.get_bytecode(SEND_IDX) == Bytecodes.send_1
+
+
+def test_polymorphic_cache_hits(method):
+    layouts = [_Layout() for _ in range(INLINE_CACHE_SIZE)]
+
+    for _ in range(3):
+        for layout in layouts:
+            invokable = method.lookup_with_inline_cache(layout, "foo", SEND_IDX)
+            assert invokable == (layout, "foo")
+
+    assert method.get_inline_cache_state(SEND_IDX) == INLINE_CACHE_SIZE
+    for layout in layouts:
+        assert layout.lookups == 1
+
+
+def test_becomes_megamorphic(method):
+    layouts = [_Layout() for _ in range(INLINE_CACHE_SIZE + 1)]
+
+    for layout in layouts:
+        method.lookup_with_inline_cache(layout, "foo", SEND_IDX)
+    assert method.get_inline_cache_state(SEND_IDX) == INLINE_CACHE_MEGAMORPHIC
+
+    invokable = method.lookup_with_inline_cache(layouts[0], "foo", SEND_IDX)
+    assert invokable == (layouts[0], "foo")
+    assert method.get_inline_cache_state(SEND_IDX) == INLINE_CACHE_MEGAMORPHIC
+    assert method.get_inline_cache_layout(SEND_IDX) is None
+
+
+def test_outdated_layouts_are_dropped(method):
+    old = _Layout()
+    new = _Layout()
+    method.lookup_with_inline_cache(old, "foo", SEND_IDX)
+    method.lookup_with_inline_cache(new, "foo", SEND_IDX)
+
+    old.is_latest = False
+    method.invalidate_outdated_inline_cache_entries(SEND_IDX)
+
+    assert method.get_inline_cache_state(SEND_IDX) == 1
+    assert method.get_inline_cache_layout(SEND_IDX) is new
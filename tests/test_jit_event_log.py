@@ -0,0 +1,54 @@
+import json
+
+from som.interpreter.bc.jit_event_log import (
+    _JitEventLog,
+    EVENT_ABORT,
+    EVENT_LOOP,
+    EVENT_TIER_SHIFT,
+    json_string,
+)
+from som.interpreter.bc.sample_profile import TIER_1, TIER_2
+
+
+def _read_records(file_name):
+    with open(file_name) as log_file:
+        return [json.loads(line) for line in log_file]
+
+
+def test_json_string_escapes():
+    value = 'SEND @ 3 in Test>>\\ tstack "[1,]"\n'
+    assert json.loads(json_string(value)) == value
+    assert json.loads(json_string("\x01")) == "\x01"
+
+
+def test_records_are_json_lines(tmpdir):
+    file_name = str(tmpdir.join("jit.jsonl"))
+    log = _JitEventLog()
+    log.open(file_name)
+    log.start_compile()
+    log.log_compile(EVENT_LOOP, TIER_2, "JUMP @ 12 in Test>>run", 42, 120, 2048)
+    log.log_abort(TIER_1, "SEND_2 @ 4 in Test>>fib:", "ABORT_TOO_LONG")
+    log.log_tier_shift(TIER_2, "JUMP @ 12 in Test>>run")
+    log.close()
+
+    loop, abort, shift = _read_records(file_name)
+    assert loop["event"] == EVENT_LOOP
+    assert loop["tier"] == TIER_2
+    assert loop["greenkey"] == "JUMP @ 12 in Test>>run"
+    assert loop["loop_id"] == 42
+    assert loop["num_ops"] == 120
+    assert loop["code_size"] == 2048
+    assert loop["duration_us"] >= 0
+
+    assert abort["event"] == EVENT_ABORT
+    assert abort["reason"] == "ABORT_TOO_LONG"
+    assert shift["event"] == EVENT_TIER_SHIFT
+    assert shift["tier"] == TIER_2
+    assert shift["time_us"] >= abort["time_us"] >= loop["time_us"]
+
+
+def test_closed_log_is_disabled(tmpdir):
+    log = _JitEventLog()
+    log.open(str(tmpdir.join("jit.jsonl")))
+    log.close()
+    assert not log.enabled
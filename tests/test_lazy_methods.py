@@ -0,0 +1,114 @@
+# pylint: disable=redefined-outer-name,protected-access
+import pytest
+
+from som.compiler.parse_error import ParseError
+from som.interp_type import is_ast_interpreter
+from som.vm.current import current_universe
+from som.vmobjects.clazz import Class
+
+pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
+    is_ast_interpreter(), reason="Tests are specific to bytecode interpreter"
+)
+
+if not is_ast_interpreter():
+    from som.compiler.sourcecode_compiler import (
+        _assemble,
+        _parse_file,
+        _parse_file_lazily,
+    )
+    from som.vmobjects.method_lazy import LazyMethod
+
+SOURCE = """LazyTest = nil (
+| a b |
+a = ( ^ a )
+a: val = ( a := val )
+prim = primitive
+loop: n = ( | i | i := 0. [ i < n ] whileTrue: [ i := i + 1 ]. ^ i )
+  find: c = (
+    c do: [:e | e = 'x)' ifTrue: [ ^ e ] ].
+    "a comment with ( parens"
+    ^ #none )
+----
+| count |
+count = ( ^ count )
+nested = ( ^ [ [ count ] ] )
+)
+"""
+
+
+@pytest.fixture
+def source_file(tmpdir):
+    source = tmpdir.join("LazyTest.som")
+    source.write(SOURCE)
+    return str(source)
+
+
+def _new_system_class():
+    # without the core library, only system classes can be assembled
+    system_class = Class(0, Class(0, None))
+    system_class.set_name(current_universe.symbol_for("LazyTest"))
+    return system_class
+
+
+def _assert_same_method(expected, actual):
+    assert type(expected) is type(actual)
+    assert expected.get_signature() is actual.get_signature()
+    if not hasattr(expected, "_bytecodes"):
+        return
+
+    assert expected.get_bytecodes() == actual.get_bytecodes()
+    assert len(expected._literals) == len(actual._literals)
+    for expected_lit, actual_lit in zip(expected._literals, actual._literals):
+        if expected_lit.is_invokable():
+            _assert_same_method(expected_lit, actual_lit)
+        else:
+            assert str(expected_lit) == str(actual_lit)
+
+
+def test_methods_are_compiled_on_first_lookup(source_file):
+    eager = _assemble(_parse_file(source_file, current_universe), _new_system_class())
+
+    cgc = _parse_file_lazily(source_file, current_universe)
+    for sig, method in cgc._instance_methods.items():
+        assert isinstance(method, LazyMethod) != method.is_primitive(), sig
+    lazy = _assemble(cgc, _new_system_class())
+
+    for clazz, lazy_clazz, selectors in [
+        (eager, lazy, ["a", "a:", "prim", "loop:", "find:"]),
+        (
+            eager.get_class(current_universe),
+            lazy.get_class(current_universe),
+            ["count", "nested"],
+        ),
+    ]:
+        for sig in selectors:
+            selector = current_universe.symbol_for(sig)
+            method = lazy_clazz.lookup_invokable(selector)
+            assert not isinstance(method, LazyMethod)
+            assert method.get_holder() is lazy_clazz
+            assert lazy_clazz.lookup_invokable(selector) is method
+            _assert_same_method(clazz.lookup_invokable(selector), method)
+
+
+def test_inherited_methods_are_compiled_once(source_file):
+    lazy = _assemble(
+        _parse_file_lazily(source_file, current_universe), _new_system_class()
+    )
+    sub_class = Class(0, Class(0, None))
+    sub_class.set_super_class(lazy)
+
+    selector = current_universe.symbol_for("loop:")
+    method = sub_class.lookup_invokable(selector)
+    assert not isinstance(method, LazyMethod)
+    assert method.get_holder() is lazy
+
+    # the elidable lookups answer the compiled method from now on
+    assert sub_class._lookup_invokable(selector) is method
+    assert lazy._lookup_invokable(selector) is method
+
+
+def test_unterminated_method_is_a_parse_error(tmpdir):
+    source = tmpdir.join("LazyTest.som")
+    source.write("LazyTest = nil (\nfoo = ( ^ [ 1 ]\n")
+    with pytest.raises(ParseError):
+        _parse_file_lazily(str(source), current_universe)
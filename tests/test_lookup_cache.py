@@ -0,0 +1,56 @@
+from som.vm.current import current_universe
+from som.vmobjects.clazz import Class
+
+
+class _Invokable(object):
+    def __init__(self, signature):
+        self._signature = signature
+        self.holder = None
+
+    def get_signature(self):
+        return self._signature
+
+    def set_holder(self, holder):
+        self.holder = holder
+
+
+def _new_class():
+    clazz = Class(0)
+    clazz.set_name(current_universe.symbol_for("LookupCacheTest"))
+    return clazz
+
+
+def test_lookup_is_cached():
+    clazz = _new_class()
+    selector = current_universe.symbol_for("foo")
+    foo = _Invokable(selector)
+    clazz.set_instance_invokables({selector: foo}, False)
+    layout = clazz.get_layout_for_instances()
+
+    assert current_universe.lookup_invokable(layout, selector) is foo
+    assert current_universe.lookup_invokable(layout, selector) is foo
+
+
+def test_lookup_cache_is_invalidated_by_add_primitive():
+    clazz = _new_class()
+    selector = current_universe.symbol_for("foo")
+    clazz.set_instance_invokables({selector: _Invokable(selector)}, False)
+    layout = clazz.get_layout_for_instances()
+    current_universe.lookup_invokable(layout, selector)
+
+    prim = _Invokable(selector)
+    clazz.add_primitive(prim, False)
+
+    assert current_universe.lookup_invokable(layout, selector) is prim
+
+
+def test_lookup_cache_is_invalidated_by_new_methods():
+    clazz = _new_class()
+    selector = current_universe.symbol_for("bar")
+    layout = clazz.get_layout_for_instances()
+    assert current_universe.lookup_invokable(layout, selector) is None
+
+    bar = _Invokable(selector)
+    clazz.set_instance_invokables({selector: bar}, False)
+
+    assert current_universe.lookup_invokable(layout, selector) is bar
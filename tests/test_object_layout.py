@@ -0,0 +1,155 @@
+import pytest
+
+from som.interpreter.objectstorage.object_layout import ObjectLayout
+from som.interpreter.objectstorage.storage_location import (
+    MAX_NUMBER_OF_BOOLEAN_FIELDS,
+    Boolean,
+)
+from som.vm.globals import nilObject, trueObject, falseObject
+from som.vm.universe import Universe
+from som.vmobjects.clazz import Class
+from som.vmobjects.double import Double
+from som.vmobjects.integer import Integer
+from som.vmobjects.object_with_layout import (
+    Object,
+    Object2,
+    Object4,
+    Object8,
+    Object16,
+    get_number_of_inline_fields,
+)
+from som.vmobjects.string import String
+
+
+@pytest.mark.parametrize(
+    "number_of_fields,inline_fields",
+    [(0, 0), (1, 2), (2, 2), (3, 4), (5, 8), (8, 8), (9, 16), (16, 16), (40, 16)],
+)
+def test_number_of_inline_fields(number_of_fields, inline_fields):
+    assert get_number_of_inline_fields(number_of_fields) == inline_fields
+
+
+@pytest.mark.parametrize(
+    "number_of_fields,object_class",
+    [(1, Object2), (3, Object4), (7, Object8), (16, Object16), (17, Object16)],
+)
+def test_instances_are_allocated_for_the_layout(number_of_fields, object_class):
+    obj = Universe.new_instance(Class(number_of_fields))
+    assert type(obj) is object_class  # pylint: disable=unidiomatic-typecheck
+    assert obj.get_number_of_fields() == number_of_fields
+
+
+def test_smaller_instances_inherit_inline_fields():
+    assert issubclass(Object16, Object8)
+    assert issubclass(Object8, Object4)
+    assert issubclass(Object4, Object2)
+    assert issubclass(Object2, Object)
+    assert hasattr(Object2(None), "prim_field2")
+    assert not hasattr(Object2(None), "_field3")
+
+
+def _values(number_of_fields):
+    values = []
+    for i in range(number_of_fields):
+        if i % 3 == 0:
+            values.append(Integer(i))
+        elif i % 3 == 1:
+            values.append(Double(i + 0.5))
+        else:
+            values.append(String(str(i)))
+    return values
+
+
+def _assert_fields(obj, values):
+    for i, value in enumerate(values):
+        field = obj.get_field(i)
+        if isinstance(value, Integer):
+            assert field.get_embedded_integer() == value.get_embedded_integer()
+        elif isinstance(value, Double):
+            assert field.get_embedded_double() == value.get_embedded_double()
+        else:
+            assert field is value
+
+
+@pytest.mark.parametrize("number_of_fields", [1, 2, 3, 8, 16, 20, 40])
+def test_fields_keep_their_values_across_layout_changes(number_of_fields):
+    clazz = Class(number_of_fields)
+    obj = Universe.new_instance(clazz)
+    values = _values(number_of_fields)
+
+    for i in range(number_of_fields):
+        assert obj.get_field(i) is nilObject
+        obj.set_field(i, values[i])
+    _assert_fields(obj, values)
+
+    # generalize all fields, which moves primitives into pointer fields
+    for i in range(0, number_of_fields, 3):
+        values[i] = String("g" + str(i))
+        obj.set_field(i, values[i])
+    _assert_fields(obj, values)
+
+    other = Universe.new_instance(clazz)
+    for i in range(number_of_fields):
+        other.set_field(i, values[i])
+    _assert_fields(other, values)
+    assert other.get_object_layout(None) is obj.get_object_layout(None)
+
+
+def test_initializing_a_field_with_another_type_generalizes_it():
+    with_int = ObjectLayout(2).with_initialized_field(1, Integer)
+    generalized = with_int.with_initialized_field(1, Double)
+    assert not with_int.is_latest
+    assert generalized.is_latest
+    assert generalized.get_storage_location(1).storage_type is Object
+
+
+def _layout_storage_types(obj):
+    layout = obj.get_object_layout(None)
+    return [
+        layout.get_storage_location(i).storage_type
+        for i in range(layout.get_number_of_fields())
+    ]
+
+
+def test_booleans_are_stored_in_the_boolean_map():
+    obj = Universe.new_instance(Class(3))
+    obj.set_field(0, trueObject)
+    obj.set_field(1, falseObject)
+    obj.set_field(2, nilObject)
+    assert _layout_storage_types(obj) == [Boolean, Boolean, None]
+    assert obj.get_field(0) is trueObject
+    assert obj.get_field(1) is falseObject
+
+    obj.set_field(0, falseObject)
+    obj.set_field(1, trueObject)
+    assert obj.get_field(0) is falseObject
+    assert obj.get_field(1) is trueObject
+
+    obj.set_field(1, nilObject)
+    assert obj.get_field(1) is nilObject
+    assert _layout_storage_types(obj) == [Boolean, Boolean, None]
+
+
+def test_boolean_fields_generalize_to_objects():
+    obj = Universe.new_instance(Class(2))
+    obj.set_field(0, trueObject)
+    obj.set_field(1, falseObject)
+
+    value = String("flag")
+    obj.set_field(0, value)
+    assert _layout_storage_types(obj) == [Object, Boolean]
+    assert obj.get_field(0) is value
+    assert obj.get_field(1) is falseObject
+
+
+def test_boolean_fields_are_limited():
+    number_of_fields = MAX_NUMBER_OF_BOOLEAN_FIELDS + 2
+    obj = Universe.new_instance(Class(number_of_fields))
+    for i in range(number_of_fields):
+        obj.set_field(i, trueObject if i % 2 == 0 else falseObject)
+
+    storage_types = _layout_storage_types(obj)
+    assert storage_types.count(Boolean) == MAX_NUMBER_OF_BOOLEAN_FIELDS
+    assert storage_types[-2:] == [Object, Object]
+    for i in range(number_of_fields):
+        assert obj.get_field(i) is (trueObject if i % 2 == 0 else falseObject)
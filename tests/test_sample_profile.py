@@ -0,0 +1,76 @@
+from som.interpreter.bc import sample_profile as profile_module
+from som.interpreter.bc.sample_profile import (
+    _SampleProfiler,
+    _SAFE_POINTS_PER_CLOCK_CHECK,
+    TIER_1,
+    TIER_2,
+)
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+class _Method(object):
+    def __init__(self, name):
+        self._name = name
+
+    def merge_point_string(self):
+        return self._name
+
+
+def _profiler(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(profile_module, "time", clock)
+    profiler = _SampleProfiler()
+    profiler.enable(0.001)
+    return profiler, clock
+
+
+def _reach_clock_check(profiler, bc_idx, tier):
+    for _ in range(_SAFE_POINTS_PER_CLOCK_CHECK):
+        profiler.tick(bc_idx, tier)
+
+
+def test_no_sample_before_interval(monkeypatch):
+    profiler, _ = _profiler(monkeypatch)
+    profiler.enter(_Method("Test>>run"), TIER_1)
+    _reach_clock_check(profiler, 4, TIER_1)
+    assert profiler.format() == ""
+
+
+def test_samples_are_collapsed_stacks(monkeypatch):
+    profiler, clock = _profiler(monkeypatch)
+    profiler.enter(_Method("Test>>run"), TIER_1)
+    profiler.tick(7, TIER_1)
+    profiler.enter(_Method("Test>>fib:"), TIER_1)
+
+    clock.now = 0.0015
+    _reach_clock_check(profiler, 12, TIER_2)
+    assert profiler.format() == "Test>>run@7[tier1];Test>>fib:@12[tier2] 1\n"
+
+
+def test_elapsed_intervals_are_weighted(monkeypatch):
+    profiler, clock = _profiler(monkeypatch)
+    profiler.enter(_Method("Test>>run"), TIER_1)
+
+    clock.now = 0.0035
+    _reach_clock_check(profiler, 3, TIER_1)
+    clock.now = 0.0045
+    _reach_clock_check(profiler, 3, TIER_1)
+    assert profiler.format() == "Test>>run@3[tier1] 4\n"
+
+
+def test_leave_pops_the_method(monkeypatch):
+    profiler, clock = _profiler(monkeypatch)
+    profiler.enter(_Method("Test>>run"), TIER_1)
+    profiler.enter(_Method("Test>>helper"), TIER_1)
+    profiler.leave()
+
+    clock.now = 0.001
+    _reach_clock_check(profiler, 2, TIER_1)
+    assert profiler.format() == "Test>>run@2[tier1] 1\n"
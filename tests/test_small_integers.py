@@ -0,0 +1,66 @@
+# pylint: disable=protected-access
+import pytest
+
+from som.vm.universe import create_universe
+from som.vmobjects.integer import (
+    Integer,
+    SMALL_INTEGER_MAX,
+    SMALL_INTEGER_MIN,
+    SMALL_INTEGER_RANGE_LIMIT,
+    int_0,
+    int_1,
+    is_valid_small_integer_range,
+    make_integer,
+    small_integers,
+)
+
+
+def test_small_integers_are_shared():
+    assert make_integer(SMALL_INTEGER_MIN) is make_integer(SMALL_INTEGER_MIN)
+    assert make_integer(SMALL_INTEGER_MAX) is make_integer(SMALL_INTEGER_MAX)
+    assert make_integer(0) is int_0
+    assert make_integer(1) is int_1
+
+
+def test_other_integers_are_allocated():
+    assert make_integer(SMALL_INTEGER_MAX + 1) is not make_integer(
+        SMALL_INTEGER_MAX + 1
+    )
+    assert make_integer(SMALL_INTEGER_MIN - 1).get_embedded_integer() == (
+        SMALL_INTEGER_MIN - 1
+    )
+
+
+def test_arithmetic_results_are_shared():
+    assert Integer(40).prim_add(Integer(2)) is make_integer(42)
+    assert Integer(41).prim_inc() is make_integer(42)
+    assert Integer(0).prim_dec() is make_integer(-1)
+
+
+def test_range_is_configurable():
+    try:
+        small_integers.set_range(-4, 4)
+        assert make_integer(4) is make_integer(4)
+        assert make_integer(5) is not make_integer(5)
+
+        small_integers.set_range(0, -1)
+        assert make_integer(0) is not make_integer(0)
+    finally:
+        small_integers.set_range(SMALL_INTEGER_MIN, SMALL_INTEGER_MAX)
+
+
+def test_range_limit():
+    assert is_valid_small_integer_range(0, SMALL_INTEGER_RANGE_LIMIT - 1)
+    assert not is_valid_small_integer_range(0, SMALL_INTEGER_RANGE_LIMIT)
+    assert is_valid_small_integer_range(0, -1)
+    assert not is_valid_small_integer_range(-(2**62), 2**62)
+
+
+@pytest.mark.parametrize("min_max", ["a:b", "1", "1:2:3", "-5:x", "0:100000"])
+def test_invalid_ranges_are_rejected(min_max):
+    universe = create_universe(True)
+    universe.handle_arguments(["--small-integers", min_max, "Foo"])
+
+    assert universe._last_exit_code == 0  # usage was printed
+    assert small_integers.min_value == SMALL_INTEGER_MIN
+    assert small_integers.max_value == SMALL_INTEGER_MAX
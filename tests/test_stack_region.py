@@ -0,0 +1,83 @@
+import pytest
+
+from som.interp_type import is_ast_interpreter
+
+pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
+    is_ast_interpreter(), reason="Tests are specific to bytecode interpreter"
+)
+
+if not is_ast_interpreter():
+    from som.interpreter.bc.stack import StackRegion, detach_stack
+
+
+def test_callee_stack_is_carved_above_caller():
+    region = StackRegion(16)
+    caller = region.carve(3)
+    callee = region.carve(4)
+
+    assert callee.items is caller.items
+    assert caller.base == 0
+    assert callee.base == 3
+    assert callee.stack_ptr == 2
+
+    callee.push(1)
+    callee.push(2)
+    assert callee.pop() == 2
+    assert callee.top() == 1
+
+    region.release(callee)
+    assert caller.items[3] is None
+    assert region.carve(2).base == 3
+
+
+def test_stack_objects_are_reused_per_depth():
+    region = StackRegion(16)
+    caller = region.carve(2)
+    callee = region.carve(2)
+    region.release(callee)
+    assert region.carve(5) is callee
+    assert region.get_depth() == 2
+
+
+def test_new_chunk_when_full():
+    region = StackRegion(4)
+    caller = region.carve(3)
+    callee = region.carve(2)
+    big = region.carve(10)
+
+    assert callee.items is not caller.items
+    assert callee.base == 0
+    assert big.base == 0
+    assert len(big.items) >= 10
+
+    region.release(callee)
+    assert region.carve(1).items is callee.items
+
+    region.release(caller)
+    assert region.carve(1).items is caller.items
+
+
+def test_release_recovers_from_unreleased_callees():
+    region = StackRegion(16)
+    caller = region.carve(2)
+    region.carve(3)
+    region.carve(4)
+
+    region.release(caller)
+    assert region.get_depth() == 0
+    assert region.carve(2).base == 0
+
+
+def test_detached_stack_keeps_its_values():
+    region = StackRegion(16)
+    region.carve(2)
+    stack = region.carve(3)
+    stack.push(7)
+    stack.push(8)
+
+    detached = detach_stack(stack)
+    region.release(stack)
+
+    assert detached.items == [7, 8, None]
+    assert detached.stack_ptr == 1
+    assert detached.pop() == 8
@@ -0,0 +1,72 @@
+from som.vm import startup_profile as profile_module
+from som.vm.startup_profile import (
+    _StartupProfile,
+    PHASE_ASSEMBLE,
+    PHASE_PARSE,
+    PHASE_PRIMITIVES,
+)
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+def _profile(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(profile_module, "time", clock)
+    profile = _StartupProfile()
+    profile.enable()
+    return profile, clock
+
+
+def test_disabled_profile_records_nothing():
+    profile = _StartupProfile()
+    profile.start("Object", PHASE_PARSE)
+    profile.stop()
+    assert profile.get_classes() == []
+
+
+def test_nested_loads_are_excluded(monkeypatch):
+    profile, clock = _profile(monkeypatch)
+
+    profile.start("Integer", PHASE_PARSE)
+    clock.now = 1.0
+    # parsing Integer loads its super class
+    profile.start("Number", PHASE_PARSE)
+    clock.now = 3.0
+    profile.stop()
+    profile.start("Number", PHASE_ASSEMBLE)
+    clock.now = 4.0
+    profile.stop()
+    clock.now = 4.5
+    profile.stop()
+
+    profile.start("Integer", PHASE_PRIMITIVES)
+    clock.now = 5.0
+    profile.stop()
+
+    number, integer = profile.get_classes()
+    assert number.name == "Number"
+    assert number.times == [2.0, 1.0, 0.0]
+    assert integer.name == "Integer"
+    assert integer.times == [1.5, 0.0, 0.5]
+
+
+def test_reports(monkeypatch):
+    profile, clock = _profile(monkeypatch)
+    profile.start("Object", PHASE_PARSE)
+    clock.now = 0.002
+    profile.stop()
+
+    table = profile.format_table()
+    assert "Object" in table
+    assert "all 1 classes" in table
+
+    assert profile.format_json() == (
+        '[{"class": "Object", "parse_us": 2000, "assemble_us": 0,'
+        ' "primitives_us": 0, "total_us": 2000}]\n'
+    )
@@ -0,0 +1,122 @@
+# pylint: disable=redefined-outer-name,protected-access
+import pytest
+from rlib.string_stream import StringStream
+
+from som.compiler.bc.method_generation_context import MethodGenerationContext
+from som.compiler.bc.parser import Parser
+from som.compiler.class_generation_context import ClassGenerationContext
+from som.interp_type import is_ast_interpreter
+from som.interpreter.bc.bytecode_profile import _NgramProfile
+from som.interpreter.bc.bytecodes import (
+    Bytecodes,
+    bytecode_length,
+    first_bytecode_of,
+)
+from som.vm.current import current_universe
+
+pytestmark = pytest.mark.skipif(  # pylint: disable=invalid-name
+    is_ast_interpreter(), reason="Tests are specific to bytecode interpreter"
+)
+
+
+@pytest.fixture(autouse=True)
+def no_constant_folding():
+    # literal receivers stand in for arbitrary ones here,
+    # so they must not be folded away
+    current_universe.constant_folding = False
+    yield
+    current_universe.constant_folding = True
+
+
+@pytest.fixture
+def cgenc():
+    gen_c = ClassGenerationContext(current_universe)
+    gen_c.name = current_universe.symbol_for("Test")
+    gen_c.add_instance_field(current_universe.symbol_for("field"))
+    return gen_c
+
+
+def _compile(cgenc, source):
+    mgenc = MethodGenerationContext(current_universe, cgenc, None)
+    mgenc.add_argument("self", None, None)
+    parser = Parser(StringStream(source), "test", current_universe)
+    return parser._assemble_method(mgenc)
+
+
+def _bytecodes(method):
+    result = []
+    i = 0
+    while i < method.get_number_of_bytecodes():
+        bytecode = method.get_bytecode(i)
+        result.append(bytecode)
+        i += bytecode_length(first_bytecode_of(bytecode))
+    return result
+
+
+def test_pairs_are_fused(cgenc):
+    method = _compile(cgenc, "test = ( Foo new. field size. ^ 3 < 4 )")
+    assert _bytecodes(method) == [
+        Bytecodes.push_global_send_1,
+        Bytecodes.send_1,
+        Bytecodes.pop,
+        Bytecodes.push_field_0_send_1,
+        Bytecodes.send_1,
+        Bytecodes.pop,
+        Bytecodes.push_constant,
+        Bytecodes.push_constant_send_2,
+        Bytecodes.send_2,
+        Bytecodes.return_local,
+    ]
+    # the operands and call sites stay where they were
+    assert method.get_constant(0) is current_universe.symbol_for("Foo")
+    assert method.get_constant(2) is current_universe.symbol_for("new")
+    assert method._call_sites[2] == 0
+
+
+def test_blocks_are_fused_with_their_method(cgenc):
+    method = _compile(cgenc, "test = ( ^ [:a | a < 0 ] )")
+    block = method.get_constant(0)
+    assert Bytecodes.push_0_send_2 in _bytecodes(block)
+
+
+def test_constant_variants_are_fused(cgenc):
+    method = _compile(cgenc, "test = ( ^ 3 < 4 )")
+    assert _bytecodes(method) == [
+        Bytecodes.push_constant_0,
+        Bytecodes.push_constant_1_send_2,
+        Bytecodes.send_2,
+        Bytecodes.return_local,
+    ]
+
+
+def test_no_fusion_when_disabled(cgenc):
+    current_universe.superinstructions = False
+    try:
+        method = _compile(cgenc, "test = ( ^ 3 < 4 )")
+    finally:
+        current_universe.superinstructions = True
+    assert _bytecodes(method) == [
+        Bytecodes.push_constant_0,
+        Bytecodes.push_constant_1,
+        Bytecodes.send_2,
+        Bytecodes.return_local,
+    ]
+
+
+def test_ngram_profile(cgenc):
+    method = _compile(cgenc, "test = ( ^ 3 < 4 )")
+    profile = _NgramProfile()
+    profile.record(method, 0)
+    profile.record(method, 0)
+    # superinstructions are counted as the bytecodes they fuse
+    profile.record(method, 1)
+
+    push_0 = Bytecodes.push_constant_0
+    push_1 = Bytecodes.push_constant_1
+    assert profile.get_pair_count(push_0, push_1) == 2
+    assert profile.get_triple_count(push_0, push_1, Bytecodes.send_2) == 2
+    assert profile.get_pair_count(push_1, Bytecodes.send_2) == 1
+
+    lines = profile.format().splitlines()
+    assert lines[0] == "2\tPUSH_CONSTANT_0 PUSH_CONSTANT_1"
+    assert "1\tPUSH_CONSTANT_1 SEND_2 RETURN_LOCAL" in lines
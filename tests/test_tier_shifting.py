@@ -0,0 +1,94 @@
+from som.interpreter.bc.tier_shifting import (
+    _TierManager,
+    _TRACE_FAILURE_LIMIT,
+    _INITIAL_COOL_DOWN,
+)
+
+
+class _Method(object):
+    def __init__(self, name):
+        self._name = name
+        self.tier_up_policy = None
+        self.tier_up_policy_epoch = -1
+        self.tier2_demoted = False
+        self.tier2_cool_down = 0
+        self.counts = [42]
+
+    def reset_counts(self):
+        self.counts = [0]
+
+    def merge_point_string(self):
+        return self._name
+
+
+def test_separate_thresholds():
+    manager = _TierManager()
+    method = _Method("Foo>>bar")
+
+    manager.set_send_threshold(1)
+    manager.set_back_edge_threshold(2)
+    manager.set_return_threshold(3)
+
+    assert manager.send_threshold(method) == 1
+    assert manager.back_edge_threshold(method) == 2
+    assert manager.return_threshold(method) == 3
+
+
+def test_set_threshold_after_first_use():
+    manager = _TierManager()
+    method = _Method("Foo>>bar")
+    assert manager.send_threshold(method) == manager.get_threshold()
+
+    manager.set_threshold(1000)
+    assert manager.send_threshold(method) == 1000
+    assert manager.back_edge_threshold(method) == 1000
+    assert manager.return_threshold(method) == 1000
+
+
+def test_method_override():
+    manager = _TierManager()
+    hot = _Method("Foo>>hot")
+    cold = _Method("Foo>>cold")
+    manager.set_threshold(1000)
+    assert manager.send_threshold(hot) == 1000
+
+    manager.set_method_threshold("Foo>>hot", 5)
+
+    assert manager.send_threshold(hot) == 5
+    assert manager.back_edge_threshold(hot) == 5
+    assert manager.send_threshold(cold) == 1000
+
+
+def test_demotion_after_repeated_trace_failures():
+    manager = _TierManager()
+    method = _Method("Foo>>bar")
+    manager.set_threshold(10)
+    entry_point = "send_1 @ 3 in Foo>>bar"
+
+    for _ in range(_TRACE_FAILURE_LIMIT - 1):
+        manager.record_trace_failure(entry_point)
+    assert not manager.is_demoted(method)
+
+    manager.record_trace_failure(entry_point)
+    assert manager.get_trace_failures(entry_point) == _TRACE_FAILURE_LIMIT
+    assert manager.is_demoted(method)
+    assert method.counts == [0]
+    assert manager.send_threshold(method) == 10 + _INITIAL_COOL_DOWN
+
+    manager.promote(method)
+    assert not manager.is_demoted(method)
+
+
+def test_bridges_are_attributed_to_their_loop():
+    manager = _TierManager()
+    method = _Method("Foo>>bar")
+    manager.record_tier2_trace(1, "jump_backward @ 7 in Foo>>bar")
+
+    for _ in range(_TRACE_FAILURE_LIMIT):
+        manager.record_tier2_bridge(1)
+        manager.record_tier2_bridge(2)
+
+    assert manager.get_trace_failures("jump_backward @ 7 in Foo>>bar") == (
+        _TRACE_FAILURE_LIMIT
+    )
+    assert manager.is_demoted(method)
@@ -0,0 +1,56 @@
+import gc
+
+from som.interpreter.bc.traverse_stack import _TStackMemo, t_empty
+
+
+def test_equal_stacks_are_interned():
+    memo = _TStackMemo(16)
+    stack = memo.push(3, t_empty())
+
+    assert memo.push(3, t_empty()) is stack
+    assert memo.push(4, t_empty()) is not stack
+    assert memo.hits == 1
+    assert memo.misses == 2
+
+
+def test_size_is_bounded():
+    memo = _TStackMemo(8)
+    for i in range(100):
+        memo.push(i, t_empty())
+
+    assert memo.size() <= memo.get_max_size() == 8
+    assert memo.evictions == 100 - memo.size()
+
+
+def test_used_stacks_are_not_evicted():
+    memo = _TStackMemo(8)
+    stack = memo.push(0, t_empty())
+    for i in range(1, 100):
+        memo.push(i, t_empty())
+        assert memo.push(0, t_empty()) is stack
+
+    assert memo.misses == 100
+
+
+def test_evicted_stacks_keep_their_identity_while_referenced():
+    memo = _TStackMemo(4)
+    stack = memo.push(0, t_empty())
+    for i in range(1, 10):
+        memo.push(i, t_empty())
+    assert memo.evictions > 0
+
+    # compiled code may refer to the stack as a constant of a green key
+    assert memo.push(0, t_empty()) is stack
+    assert memo.misses == 10
+
+
+def test_unreferenced_evicted_stacks_are_recreated():
+    memo = _TStackMemo(4)
+    memo.push(0, t_empty())
+    for i in range(1, 10):
+        memo.push(i, t_empty())
+    gc.collect()
+
+    recreated = memo.push(0, t_empty())
+    assert recreated.t_pop() == (0, t_empty())
+    assert memo.misses == 11